@@ -1,18 +1,21 @@
 import asyncio
 import uuid
-from typing import Dict, List, Any, Optional
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Iterable, Tuple
 import logging
 from datetime import datetime, timedelta
 import json
 import aiohttp
 from pathlib import Path
 import pandas as pd
-import numpy as np
-import torch
+import yaml
 
 from utils.neo4j_client import Neo4jClient
 from utils.supabase_client import SupabaseClient
 from inference.real_time_predictor import RealTimePredictor
+from inference.job_executor import JobExecutor, JobQueueFull
+from inference.result_store import ResultStore
+from inference.worker_pool import BatchWorkerPool, ChunkWorkers, build_classification_results
 
 logger = logging.getLogger(__name__)
 
@@ -22,26 +25,80 @@ class BatchPredictor:
     Handles asynchronous processing with progress tracking and callbacks.
     """
     
-    def __init__(self, neo4j_client: Neo4jClient, supabase_client: SupabaseClient):
+    def __init__(self, neo4j_client: Neo4jClient, supabase_client: SupabaseClient,
+                 real_time_predictor: Optional[RealTimePredictor] = None):
         self.neo4j = neo4j_client
         self.supabase = supabase_client
-        self.real_time_predictor = RealTimePredictor(neo4j_client, supabase_client)
+        # Share the serving predictor (and its graph snapshot) when one is provided
+        self.real_time_predictor = real_time_predictor or RealTimePredictor(neo4j_client, supabase_client)
         
         # Job management
         self.active_jobs = {}
         self.job_results = {}
-        self.max_concurrent_jobs = 5
-        self.job_timeout = timedelta(hours=2)
-        
-        # Processing configuration
-        self.batch_size = 100
+        self._load_batch_config()
+        self.max_concurrent_jobs = self.batch_config.get('max_concurrent_jobs', 5)
+        self.job_timeout = timedelta(seconds=self.batch_config.get('job_timeout', 7200))
+        
+        # Jobs run off the request path: bounded priority queue, per-type limits, timeouts
+        monitor = self.real_time_predictor.monitor
+        self.executor = JobExecutor(
+            self.process_job,
+            on_timeout=self._on_job_timeout,
+            max_queue_size=self.batch_config.get('max_queue_size', 100),
+            max_concurrent_jobs=self.max_concurrent_jobs,
+            type_limits=self.batch_config.get('type_limits', {}),
+            job_timeout=self.job_timeout.total_seconds(),
+            metrics=monitor.metrics if monitor else None
+        )
+        
+        # Results are appended to disk per chunk; finished jobs keep only counters in memory
+        self.result_store = ResultStore(
+            root=self.batch_config.get('results_path', 'data/batch_results'),
+            retention_days=self.batch_config.get('result_retention_days', 7),
+            index_interval=self.batch_config.get('result_index_interval', 1000)
+        )
+        self.cleanup_interval = self.batch_config.get('cleanup_interval', 3600)
+        self.max_results_page_size = self.batch_config.get('max_results_page_size', 10000)
+        self._cleanup_task = None
+        
+        # CPU-bound chunk work runs in worker processes; a job keeps one chunk in flight per worker
+        pool_config = self.batch_config.get('worker_pool', {}) or {}
+        self.worker_pool = None
+        if pool_config.get('enabled', True) and pool_config.get('max_workers', 2) > 0:
+            self.worker_pool = BatchWorkerPool(
+                max_workers=pool_config.get('max_workers', 2),
+                torch_threads=pool_config.get('torch_threads', 1),
+                progress_interval=pool_config.get('progress_interval', 1000),
+                on_progress=self._on_worker_progress
+            )
+        self.chunk_concurrency = self.worker_pool.max_workers if self.worker_pool else 1
+        
+        # Processing configuration; an expertise chunk fills one batched topic GEMM
+        self.expertise_batch_size = max(int(
+            self.real_time_predictor.serving_config.get('expertise_batch', {}).get('chunk_size', 256)
+        ), 1)
+        self.link_batch_size = 5000  # pairs per bulk existence check and decode pass
+        self.classification_batch_size = 5000  # entities per gather/softmax pass
         self.max_retries = 3
         
         logger.info("BatchPredictor initialized")
     
+    def _load_batch_config(self):
+        """Load batch job configuration from the deployment config."""
+        try:
+            config_path = Path("config/deployment_config.yaml")
+            if config_path.exists():
+                with open(config_path, 'r') as f:
+                    self.batch_config = (yaml.safe_load(f) or {}).get('batch', {}) or {}
+            else:
+                self.batch_config = {}
+        except Exception as e:
+            logger.error(f"Failed to load batch config: {e}")
+            self.batch_config = {}
+    
     async def submit_job(self, prediction_type: str, entities: List[Dict[str, Any]], 
-                        callback_url: Optional[str] = None) -> str:
-        """Submit a batch prediction job."""
+                        callback_url: Optional[str] = None, priority: int = 0) -> str:
+        """Submit a batch prediction job. Raises JobQueueFull when the job queue is at its bound."""
         job_id = str(uuid.uuid4())
         
         job_data = {
@@ -54,19 +111,146 @@ class BatchPredictor:
             'total_entities': len(entities),
             'processed_entities': 0,
             'failed_entities': 0,
-            'results': []
+            'priority': priority,
+            'results_written': 0,
+            'chunk_progress': {}
         }
         
+        # Admission control: queue first so a rejected job leaves no trace
         self.active_jobs[job_id] = job_data
+        try:
+            self.executor.submit(job_id, prediction_type, priority)
+        except JobQueueFull:
+            del self.active_jobs[job_id]
+            raise
         
         # Store job in database
         await self._store_job_metadata(job_data)
         
-        logger.info(f"Submitted batch job {job_id} with {len(entities)} entities")
+        logger.info(f"Submitted batch job {job_id} with {len(entities)} entities (priority {priority})")
         return job_id
     
+    async def _on_job_timeout(self, job_id: str):
+        """Mark a job the executor cancelled for exceeding the timeout as failed."""
+        if job_id not in self.active_jobs:
+            return
+        
+        error = f"Job exceeded timeout of {self.job_timeout.total_seconds():.0f}s"
+        job_data = self.active_jobs[job_id]
+        job_data['status'] = 'failed'
+        job_data['error'] = error
+        job_data['failed_at'] = datetime.now()
+        self._archive_job(job_id)
+        
+        await self._update_job_status(job_id, 'failed', error=error)
+        
+        if job_data['callback_url']:
+            await self._send_callback(job_data)
+    
+    def _archive_job(self, job_id: str):
+        """Move a finished job to job_results, dropping its input entities."""
+        job_data = self.active_jobs.pop(job_id)
+        job_data.pop('entities', None)
+        job_data['chunk_progress'] = {}
+        self.job_results[job_id] = job_data
+    
+    async def _write_results(self, job_data: Dict, results: List[Dict[str, Any]]):
+        """Append a completed chunk of results to the job's result file."""
+        job_data['results_written'] += await self.result_store.append(job_data['job_id'], results)
+    
+    def _chunk_workers(self, job_id: str, chunk_id: int) -> Optional[ChunkWorkers]:
+        """Worker pool bound to a job chunk, or None to run the chunk in-process."""
+        if self.worker_pool is None or not self.worker_pool.running:
+            return None
+        return self.worker_pool.for_chunk(job_id, chunk_id)
+    
+    def _on_worker_progress(self, job_id: str, chunk_id: int, fraction: float):
+        """Record progress a worker reported for an in-flight chunk."""
+        job_data = self.active_jobs.get(job_id)
+        if job_data is None:
+            return
+        
+        # Reports arriving after the chunk finished are ignored
+        entry = job_data['chunk_progress'].get(chunk_id)
+        if entry is not None:
+            entry[1] = fraction
+    
+    async def _run_chunks(self, job_data: Dict, chunks: Iterable[List[Dict[str, Any]]],
+                          process_chunk: Callable[[int, List[Dict[str, Any]]], Awaitable[Tuple[Any, int, int]]]):
+        """
+        Process a job's chunks with up to chunk_concurrency in flight, so chunks spread across
+        pool workers. process_chunk returns (results, processed, failed); results are appended
+        in chunk order and progress is updated as each chunk finishes.
+        """
+        in_flight = deque()
+        try:
+            for chunk_id, chunk in enumerate(chunks):
+                job_data['chunk_progress'][chunk_id] = [len(chunk), 0.0]
+                in_flight.append((chunk_id, asyncio.ensure_future(process_chunk(chunk_id, chunk))))
+                
+                if len(in_flight) >= self.chunk_concurrency:
+                    await self._finish_chunk(job_data, *in_flight.popleft())
+            
+            while in_flight:
+                await self._finish_chunk(job_data, *in_flight.popleft())
+        
+        finally:
+            # Job failed, timed out or was cancelled: stop its other chunks
+            for _, task in in_flight:
+                task.cancel()
+    
+    async def _finish_chunk(self, job_data: Dict, chunk_id: int, task: asyncio.Future):
+        """Count a finished chunk, append its results and update progress."""
+        results, processed, failed = await task
+        
+        job_data['chunk_progress'].pop(chunk_id, None)
+        job_data['processed_entities'] += processed
+        job_data['failed_entities'] += failed
+        
+        await self._write_results(job_data, results)
+        
+        progress = (job_data['processed_entities'] + job_data['failed_entities']) / job_data['total_entities']
+        await self._update_job_progress(job_data['job_id'], progress)
+    
+    async def start(self):
+        """Start the batch worker pool and the result retention loop."""
+        if self.worker_pool:
+            self.worker_pool.start()
+        
+        if self._cleanup_task:
+            return
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        logger.info(f"Batch result retention started (interval: {self.cleanup_interval}s)")
+    
+    async def stop(self):
+        """Stop the retention loop, cancel running batch jobs, drop queued ones and stop the workers."""
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+        
+        await self.executor.stop()
+        
+        if self.worker_pool:
+            await self.worker_pool.stop()
+    
+    async def _cleanup_loop(self):
+        """Apply the retention policy on a fixed interval."""
+        while True:
+            try:
+                await self.cleanup_old_jobs()
+                await asyncio.sleep(self.cleanup_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Batch result cleanup failed: {e}")
+                await asyncio.sleep(self.cleanup_interval)
+    
     async def process_job(self, job_id: str):
-        """Process a batch prediction job."""
+        """Process a batch prediction job. Failures are recorded on the job, then re-raised for the executor."""
         if job_id not in self.active_jobs:
             logger.error(f"Job {job_id} not found")
             return
@@ -99,10 +283,9 @@ class BatchPredictor:
                 await self._send_callback(job_data)
             
             # Move to results storage
-            self.job_results[job_id] = job_data
-            del self.active_jobs[job_id]
+            self._archive_job(job_id)
             
-            logger.info(f"Completed batch job {job_id}")
+            logger.info(f"Completed batch job {job_id} ({job_data['results_written']} results written)")
             
         except Exception as e:
             logger.error(f"Failed to process job {job_id}: {e}")
@@ -112,99 +295,122 @@ class BatchPredictor:
             
             await self._update_job_status(job_id, 'failed', error=str(e))
             
+            if job_id in self.active_jobs:
+                self._archive_job(job_id)
+            
             # Still send callback on failure
             if job_data['callback_url']:
                 await self._send_callback(job_data)
+            
+            raise
     
     async def _process_expertise_batch(self, job_data: Dict):
-        """Process batch expertise predictions."""
+        """Process batch expertise predictions, scoring each batch's topics together."""
         entities = job_data['entities']
-        results = []
         
-        # Process in batches
-        for i in range(0, len(entities), self.batch_size):
-            batch = entities[i:i + self.batch_size]
-            batch_results = []
+        async def process_chunk(chunk_id: int, batch: List[Dict[str, Any]]):
+            workers = self._chunk_workers(job_data['job_id'], chunk_id)
+            batch_results = [None] * len(batch)
+            processed = failed = 0
             
-            for entity in batch:
+            # Entities sharing request parameters are scored with one encode and one GEMM
+            groups = {}
+            for position, entity in enumerate(batch):
+                key = (entity.get('max_experts', 5), entity.get('confidence_threshold', 0.7))
+                groups.setdefault(key, []).append(position)
+            
+            for (max_experts, confidence_threshold), positions in groups.items():
+                topics = [batch[position].get('topic', '') for position in positions]
                 try:
-                    topic = entity.get('topic', '')
-                    max_experts = entity.get('max_experts', 5)
-                    confidence_threshold = entity.get('confidence_threshold', 0.7)
-                    
-                    # Use real-time predictor for individual predictions
-                    experts = await self.real_time_predictor.predict_expertise(
-                        topic=topic,
+                    experts_per_topic = await self.real_time_predictor.predict_expertise_batch(
+                        topics=topics,
                         max_experts=max_experts,
-                        confidence_threshold=confidence_threshold
+                        confidence_threshold=confidence_threshold,
+                        workers=workers
                     )
                     
-                    batch_results.append({
-                        'entity_id': entity.get('id', ''),
-                        'topic': topic,
-                        'experts': experts,
-                        'status': 'success'
-                    })
-                    
-                    job_data['processed_entities'] += 1
+                    for position, topic, experts in zip(positions, topics, experts_per_topic):
+                        if experts is None:
+                            batch_results[position] = {
+                                'entity_id': batch[position].get('id', ''),
+                                'topic': topic,
+                                'experts': [],
+                                'status': 'failed',
+                                'error': 'No matching topic or persons in the graph'
+                            }
+                            failed += 1
+                        else:
+                            batch_results[position] = {
+                                'entity_id': batch[position].get('id', ''),
+                                'topic': topic,
+                                'experts': experts,
+                                'status': 'success'
+                            }
+                            processed += 1
                     
                 except Exception as e:
-                    logger.error(f"Failed to process entity {entity}: {e}")
-                    batch_results.append({
-                        'entity_id': entity.get('id', ''),
-                        'topic': entity.get('topic', ''),
-                        'experts': [],
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+                    logger.error(f"Failed to process {len(positions)} expertise entities: {e}")
+                    for position, topic in zip(positions, topics):
+                        batch_results[position] = {
+                            'entity_id': batch[position].get('id', ''),
+                            'topic': topic,
+                            'experts': [],
+                            'status': 'failed',
+                            'error': str(e)
+                        }
                     
-                    job_data['failed_entities'] += 1
-            
-            results.extend(batch_results)
+                    failed += len(positions)
             
-            # Update progress
-            progress = (job_data['processed_entities'] + job_data['failed_entities']) / job_data['total_entities']
-            await self._update_job_progress(job_data['job_id'], progress)
-            
-            # Small delay to prevent overwhelming the system
-            await asyncio.sleep(0.1)
+            return batch_results, processed, failed
+        
+        # Process in batches
+        await self._run_chunks(
+            job_data,
+            (
+                entities[i:i + self.expertise_batch_size]
+                for i in range(0, len(entities), self.expertise_batch_size)
+            ),
+            process_chunk
+        )
         
-        job_data['results'] = results
-    
     async def _process_link_prediction_batch(self, job_data: Dict):
-        """Process batch link predictions."""
+        """Process batch link predictions, one vectorized pass per chunk of pairs."""
         entities = job_data['entities']
-        results = []
         
-        for i in range(0, len(entities), self.batch_size):
-            batch = entities[i:i + self.batch_size]
+        async def process_chunk(chunk_id: int, batch: List[Dict[str, Any]]):
+            workers = self._chunk_workers(job_data['job_id'], chunk_id)
+            pairs = [
+                (entity.get('source', ''), entity.get('target', ''), entity.get('relationship_type', 'RELATED_TO'))
+                for entity in batch
+            ]
             batch_results = []
             
-            for entity in batch:
-                try:
-                    source = entity.get('source', '')
-                    target = entity.get('target', '')
-                    relationship_type = entity.get('relationship_type', 'RELATED_TO')
-                    
-                    prediction = await self.real_time_predictor.predict_link(
-                        source=source,
-                        target=target,
-                        relationship_type=relationship_type
-                    )
-                    
-                    batch_results.append({
+            try:
+                predictions = await self.real_time_predictor.predict_links_batch(pairs, workers=workers)
+                
+                processed = failed = 0
+                for entity, (source, target, relationship_type), prediction in zip(batch, pairs, predictions):
+                    result = {
                         'entity_id': entity.get('id', ''),
                         'source': source,
                         'target': target,
                         'relationship_type': relationship_type,
                         'prediction': prediction,
                         'status': 'success'
-                    })
+                    }
                     
-                    job_data['processed_entities'] += 1
+                    # Error rows and the no-model placeholder are not predictions
+                    if prediction['source'] in ('error', 'default_fallback'):
+                        result['status'] = 'failed'
+                        result['error'] = prediction.get('error', 'Link prediction model or graph data not available')
+                        failed += 1
+                    else:
+                        processed += 1
+                    batch_results.append(result)
                     
-                except Exception as e:
-                    logger.error(f"Failed to process link prediction {entity}: {e}")
+            except Exception as e:
+                logger.error(f"Failed to process {len(batch)} link predictions: {e}")
+                for entity in batch:
                     batch_results.append({
                         'entity_id': entity.get('id', ''),
                         'source': entity.get('source', ''),
@@ -214,129 +420,77 @@ class BatchPredictor:
                         'error': str(e)
                     })
                     
-                    job_data['failed_entities'] += 1
-            
-            results.extend(batch_results)
+                processed, failed = 0, len(batch)
             
-            # Update progress
-            progress = (job_data['processed_entities'] + job_data['failed_entities']) / job_data['total_entities']
-            await self._update_job_progress(job_data['job_id'], progress)
-            
-            await asyncio.sleep(0.1)
+            return batch_results, processed, failed
+        
+        await self._run_chunks(
+            job_data,
+            (entities[i:i + self.link_batch_size] for i in range(0, len(entities), self.link_batch_size)),
+            process_chunk
+        )
         
-        job_data['results'] = results
-    
     async def _process_node_classification_batch(self, job_data: Dict):
         """Process batch node classifications."""
         entities = job_data['entities']
-        results = []
         
-        # Load node classification model if not already loaded
-        if 'node_classification' not in self.real_time_predictor.models:
-            await self.real_time_predictor._load_model_by_type('node_classification')
+        # Cached full-graph logits, with every requested node resolved once
+        inputs = await self.real_time_predictor.get_classification_inputs(
+            [entity.get('node_name', '') for entity in entities]
+        )
+        graph_data, logits, generation = inputs['snapshot'], inputs['logits'], inputs['generation']
+        node_indices = inputs['node_indices']
         
-        if 'node_classification' not in self.real_time_predictor.models:
-            raise ValueError("Node classification model not available")
-        
-        model = self.real_time_predictor.models['node_classification']
-        
-        # Get graph data for batch processing
-        graph_data = await self.real_time_predictor._get_prediction_graph_data()
-        if not graph_data:
-            raise ValueError("No graph data available for node classification")
-        
-        # Process in batches
-        for i in range(0, len(entities), self.batch_size):
-            batch = entities[i:i + self.batch_size]
-            batch_results = []
-            
-            # Find nodes for this batch
-            batch_node_indices = []
-            batch_entity_ids = []
-            
+        async def process_chunk(chunk_id: int, batch: List[Dict[str, Any]]):
+            rows = []
             for entity in batch:
                 node_name = entity.get('node_name', '')
-                node_idx = await self.real_time_predictor._find_node_by_name(node_name, graph_data)
+                node_idx = node_indices[node_name]
+                rows.append((
+                    entity.get('id', ''),
+                    node_name,
+                    node_idx,
+                    graph_data.node_names[node_idx] if node_idx is not None else None
+                ))
                 
-                if node_idx is not None:
-                    batch_node_indices.append(node_idx)
-                    batch_entity_ids.append(entity.get('id', ''))
-                else:
-                    batch_results.append({
-                        'entity_id': entity.get('id', ''),
-                        'node_name': node_name,
-                        'classification': None,
-                        'status': 'failed',
-                        'error': 'Node not found'
-                    })
-                    job_data['failed_entities'] += 1
-            
-            # Run batch prediction
-            if batch_node_indices:
+            # One gather and softmax per chunk; workers also build and encode the result rows
+            workers = self._chunk_workers(job_data['job_id'], chunk_id)
+            if workers is not None:
                 try:
-                    with torch.no_grad():
-                        x = torch.tensor(graph_data['node_features'], dtype=torch.float)
-                        edge_index = torch.tensor(graph_data['edge_index'], dtype=torch.long)
-                        
-                        # Get predictions for batch nodes
-                        logits = model(x, edge_index)
-                        predictions = torch.softmax(logits[batch_node_indices], dim=1)
-                        
-                        # Process predictions
-                        for idx, (entity_id, node_idx) in enumerate(zip(batch_entity_ids, batch_node_indices)):
-                            pred_probs = predictions[idx].numpy()
-                            predicted_class = np.argmax(pred_probs)
-                            confidence = float(pred_probs[predicted_class])
-                            
-                            batch_results.append({
-                                'entity_id': entity_id,
-                                'node_name': graph_data['node_names'][node_idx],
-                                'classification': {
-                                    'predicted_class': int(predicted_class),
-                                    'confidence': confidence,
-                                    'class_probabilities': pred_probs.tolist()
-                                },
-                                'status': 'success'
-                            })
-                            
-                            job_data['processed_entities'] += 1
-                
+                    return await workers.classify(generation, graph_data.version, logits, rows)
                 except Exception as e:
-                    logger.error(f"Batch prediction failed: {e}")
-                    # Mark all batch items as failed
-                    for entity_id in batch_entity_ids:
-                        batch_results.append({
-                            'entity_id': entity_id,
-                            'classification': None,
-                            'status': 'failed',
-                            'error': str(e)
-                        })
-                        job_data['failed_entities'] += 1
+                    logger.error(f"Batch worker failed to classify {len(rows)} nodes, classifying in-process: {e}")
             
-            results.extend(batch_results)
-            
-            # Update progress
-            progress = (job_data['processed_entities'] + job_data['failed_entities']) / job_data['total_entities']
-            await self._update_job_progress(job_data['job_id'], progress)
-            
-            await asyncio.sleep(0.1)
-        
-        job_data['results'] = results
+            return build_classification_results(rows, logits)
+                        
+        await self._run_chunks(
+            job_data,
+            (
+                entities[i:i + self.classification_batch_size]
+                for i in range(0, len(entities), self.classification_batch_size)
+            ),
+            process_chunk
+        )
     
     async def get_job_status(self, job_id: str) -> Dict[str, Any]:
         """Get status of a batch job."""
         # Check active jobs first
         if job_id in self.active_jobs:
             job_data = self.active_jobs[job_id]
+            
+            # Finished chunks plus worker-reported progress of in-flight ones
+            in_flight = sum(size * fraction for size, fraction in job_data['chunk_progress'].values())
             return {
                 'job_id': job_id,
                 'status': job_data['status'],
-                'progress': (job_data['processed_entities'] + job_data['failed_entities']) / job_data['total_entities'],
+                'progress': (job_data['processed_entities'] + job_data['failed_entities'] + in_flight) / job_data['total_entities'],
                 'total_entities': job_data['total_entities'],
                 'processed_entities': job_data['processed_entities'],
                 'failed_entities': job_data['failed_entities'],
                 'created_at': job_data['created_at'].isoformat(),
-                'started_at': job_data.get('started_at', '').isoformat() if job_data.get('started_at') else None
+                'started_at': job_data.get('started_at', '').isoformat() if job_data.get('started_at') else None,
+                'results_written': job_data['results_written'],
+                'results_available': job_data['results_written'] > 0
             }
         
         # Check completed jobs
@@ -352,7 +506,8 @@ class BatchPredictor:
                 'created_at': job_data['created_at'].isoformat(),
                 'started_at': job_data.get('started_at', '').isoformat() if job_data.get('started_at') else None,
                 'completed_at': job_data.get('completed_at', '').isoformat() if job_data.get('completed_at') else None,
-                'results_available': True
+                'results_written': job_data['results_written'],
+                'results_available': self.result_store.exists(job_id)
             }
         
         # Check database for historical jobs
@@ -372,7 +527,7 @@ class BatchPredictor:
                     'processed_entities': result.data.get('processed_entities', 0),
                     'failed_entities': result.data.get('failed_entities', 0),
                     'created_at': result.data['created_at'],
-                    'results_available': result.data['status'] == 'completed'
+                    'results_available': self.result_store.exists(job_id)
                 }
         
         except Exception as e:
@@ -384,31 +539,36 @@ class BatchPredictor:
             'error': 'Job not found'
         }
     
-    async def get_job_results(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get results of a completed batch job."""
-        if job_id in self.job_results:
-            return self.job_results[job_id]['results']
+    async def get_job_results(self, job_id: str, offset: int = 0,
+                              limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a page of a batch job's results as a lazy iterator of NDJSON lines.
+        Running jobs expose the chunks written so far. Returns None if the job has no results.
+        """
+        if not self.result_store.exists(job_id):
+            return None
+        
+        # Only count lines known to be fully written; older jobs are counted from disk
+        job_data = self.active_jobs.get(job_id) or self.job_results.get(job_id)
+        total = job_data['results_written'] if job_data else await self.result_store.count(job_id)
+            
+        offset = max(offset, 0)
+        limit = min(max(limit or self.max_results_page_size, 1), self.max_results_page_size)
+        page_size = max(min(limit, total - offset), 0)
         
-        # Try to load from database
-        try:
-            result = await self.supabase.client.table('ml_batch_jobs')\
-                .select('results')\
-                .eq('job_id', job_id)\
-                .eq('status', 'completed')\
-                .single()\
-                .execute()
-            
-            if result.data:
-                return result.data['results']
-        
-        except Exception as e:
-            logger.error(f"Failed to get job results: {e}")
-        
-        return None
+        return {
+            'job_id': job_id,
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'next_offset': offset + page_size if offset + page_size < total else None,
+            'results': self.result_store.iter_results(job_id, offset, page_size)
+        }
     
     async def cancel_job(self, job_id: str) -> bool:
         """Cancel an active batch job."""
         if job_id in self.active_jobs:
+            self.executor.cancel(job_id)
             job_data = self.active_jobs[job_id]
             job_data['status'] = 'cancelled'
             job_data['cancelled_at'] = datetime.now()
@@ -416,8 +576,7 @@ class BatchPredictor:
             await self._update_job_status(job_id, 'cancelled')
             
             # Move to results
-            self.job_results[job_id] = job_data
-            del self.active_jobs[job_id]
+            self._archive_job(job_id)
             
             logger.info(f"Cancelled batch job {job_id}")
             return True
@@ -437,7 +596,7 @@ class BatchPredictor:
                 'callback_url': job_data['callback_url'],
                 'created_at': job_data['created_at'].isoformat(),
                 'metadata': {
-                    'batch_size': self.batch_size,
+                    'batch_sizes': self._batch_sizes(),
                     'max_retries': self.max_retries
                 }
             }).execute()
@@ -517,20 +676,37 @@ class BatchPredictor:
         except Exception as e:
             logger.error(f"Failed to send callback for job {job_data['job_id']}: {e}")
     
-    async def cleanup_old_jobs(self, max_age_days: int = 7):
-        """Clean up old completed jobs."""
+    async def cleanup_old_jobs(self, max_age_days: Optional[float] = None):
+        """Clean up finished jobs and result files older than the retention period."""
+        max_age_days = self.result_store.retention_days if max_age_days is None else max_age_days
         cutoff_date = datetime.now() - timedelta(days=max_age_days)
         
-        # Clean up in-memory results
+        # Clean up in-memory results (completed, failed or cancelled)
         jobs_to_remove = []
         for job_id, job_data in self.job_results.items():
-            if job_data.get('completed_at', datetime.now()) < cutoff_date:
+            finished_at = (
+                job_data.get('completed_at') or job_data.get('failed_at')
+                or job_data.get('cancelled_at') or job_data['created_at']
+            )
+            if finished_at < cutoff_date:
                 jobs_to_remove.append(job_id)
         
         for job_id in jobs_to_remove:
             del self.job_results[job_id]
+            self.result_store.delete(job_id)
+        
+        # Result files of jobs no longer in memory (e.g. from before a restart)
+        removed_files = await self.result_store.cleanup(max_age_days, keep=self.active_jobs.keys())
         
-        logger.info(f"Cleaned up {len(jobs_to_remove)} old job results")
+        logger.info(f"Cleaned up {len(jobs_to_remove)} old job results and {len(removed_files)} result files")
+    
+    def _batch_sizes(self) -> Dict[str, int]:
+        """Entities per processing chunk, by job type."""
+        return {
+            'expertise_batch': self.expertise_batch_size,
+            'link_prediction_batch': self.link_batch_size,
+            'node_classification_batch': self.classification_batch_size
+        }
     
     def get_system_status(self) -> Dict[str, Any]:
         """Get batch processing system status."""
@@ -538,7 +714,10 @@ class BatchPredictor:
             'active_jobs': len(self.active_jobs),
             'completed_jobs': len(self.job_results),
             'max_concurrent_jobs': self.max_concurrent_jobs,
-            'batch_size': self.batch_size,
+            'batch_sizes': self._batch_sizes(),
             'job_timeout_hours': self.job_timeout.total_seconds() / 3600,
-            'system_healthy': len(self.active_jobs) < self.max_concurrent_jobs
+            'executor': self.executor.get_status(),
+            'result_store': self.result_store.get_status(),
+            'worker_pool': self.worker_pool.get_status() if self.worker_pool else None,
+            'system_healthy': self.executor.queued_count() < self.executor.max_queue_size
         }
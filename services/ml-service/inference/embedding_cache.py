@@ -0,0 +1,93 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple, Callable
+
+import torch
+
+from inference.graph_snapshot import GraphSnapshot
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """
+    Caches full-graph node embeddings per (model, graph snapshot version).
+    Embeddings only change when the model weights or the graph change, so a
+    request can be served with row lookups instead of a full encode. Keeps the
+    last `max_versions` entries per model so the serving snapshot's embeddings
+    stay available while the next snapshot's are built.
+    """
+    
+    def __init__(self, max_versions: int = 2):
+        self.max_versions = max(int(max_versions), 1)
+        
+        # model_type -> (model_generation, snapshot_version) -> (embeddings, built_at)
+        self._entries: Dict[str, "OrderedDict[Tuple[int, int], Tuple[torch.Tensor, str]]"] = {}
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'builds': 0,
+            'invalidations': 0
+        }
+        
+        logger.info("EmbeddingCache initialized")
+    
+    def get(self, model_type: str, model_generation: int,
+            snapshot: GraphSnapshot) -> Optional[torch.Tensor]:
+        """Get cached embeddings if they match the model and snapshot version."""
+        entry = self._entries.get(model_type, {}).get((model_generation, snapshot.version))
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry[0]
+        
+        self.stats['misses'] += 1
+        return None
+    
+    def build(self, model_type: str, encoder: Callable[[torch.Tensor, torch.Tensor], torch.Tensor],
+              model_generation: int, snapshot: GraphSnapshot) -> torch.Tensor:
+        """Encode the full graph with the serving backend and cache it. Blocking; run off the event loop."""
+        start_time = datetime.now()
+        
+        with torch.no_grad():
+            embeddings = encoder(snapshot.x, snapshot.edge_index_tensor).contiguous()
+        
+        entries = self._entries.setdefault(model_type, OrderedDict())
+        entries[(model_generation, snapshot.version)] = (embeddings, datetime.now().isoformat())
+        while len(entries) > self.max_versions:
+            entries.popitem(last=False)
+        self.stats['builds'] += 1
+        
+        elapsed = (datetime.now() - start_time).total_seconds()
+        logger.info(
+            f"Cached {model_type} embeddings for snapshot v{snapshot.version} "
+            f"({embeddings.shape[0]}x{embeddings.shape[1]}) in {elapsed:.2f}s"
+        )
+        return embeddings
+    
+    def invalidate(self, model_type: Optional[str] = None):
+        """Drop cached embeddings for one model type, or all of them."""
+        if model_type is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(model_type, None)
+        
+        self.stats['invalidations'] += 1
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get cache status."""
+        return {
+            'entries': {
+                model_type: [
+                    {
+                        'model_generation': key[0],
+                        'snapshot_version': key[1],
+                        'shape': list(embeddings.shape),
+                        'built_at': built_at
+                    }
+                    for key, (embeddings, built_at) in entries.items()
+                ]
+                for model_type, entries in self._entries.items()
+            },
+            'max_versions': self.max_versions,
+            **self.stats
+        }
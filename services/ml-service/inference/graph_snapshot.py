@@ -0,0 +1,350 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, FrozenSet, Callable, Awaitable, Tuple, Sequence
+
+import numpy as np
+import torch
+from torch_geometric.nn.conv.gcn_conv import gcn_norm
+
+from inference.name_index import NodeNameIndex
+from utils.graph_conversion import NodeIdIndex, node_features_from_export, edge_index_from_export
+from utils.neo4j_client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+class GraphSnapshot:
+    """
+    Immutable, versioned view of the knowledge graph used for inference.
+    Holds a contiguous float32 feature matrix, an int64 edge index and the
+    node id/name maps. Tensors share memory with the underlying arrays.
+    """
+    
+    def __init__(self, version: int, node_features: np.ndarray, edge_index: np.ndarray,
+                 node_ids: np.ndarray, node_names: List[str],
+                 node_labels: List[FrozenSet[str]], created_at: Optional[datetime] = None):
+        self.version = version
+        self.node_features = np.ascontiguousarray(node_features, dtype=np.float32)
+        self.edge_index = np.ascontiguousarray(edge_index, dtype=np.int64).reshape(2, -1)
+        self.node_ids = np.asarray(node_ids)
+        self.node_names = node_names
+        self.node_labels = node_labels
+        self.id_index = NodeIdIndex(self.node_ids)
+        self.created_at = created_at or datetime.now()
+        
+        # Zero-copy tensor views for model input
+        self.x = torch.from_numpy(self.node_features)
+        self.edge_index_tensor = torch.from_numpy(self.edge_index)
+        
+        # Name lookup structures and node-type sets, built once per version
+        self.name_index = NodeNameIndex(self.node_names)
+        self.person_indices = self._find_person_indices()
+    
+        # Incoming-edge CSR for k-hop extraction and sparse adjacencies, built on first use
+        self._in_csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._adj_t: Optional[torch.Tensor] = None
+        self._gcn_adj_t: Optional[torch.Tensor] = None
+    
+    def _find_person_indices(self) -> np.ndarray:
+        """Nodes labelled Person, or whose name looks like a person/email."""
+        person_indices = []
+        for idx, (name, labels) in enumerate(zip(self.node_names, self.node_labels)):
+            name_lower = name.lower()
+            if 'Person' in labels or 'person' in name_lower or '@' in name_lower:
+                person_indices.append(idx)
+        return np.asarray(person_indices, dtype=np.int64)
+    
+    @property
+    def num_nodes(self) -> int:
+        return self.node_features.shape[0]
+    
+    @property
+    def num_edges(self) -> int:
+        return self.edge_index.shape[1]
+    
+    @property
+    def in_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR adjacency over incoming edges: (indptr by target, source of each edge)."""
+        if self._in_csr is None:
+            sources, targets = self.edge_index
+            order = np.argsort(targets, kind='stable')
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(targets, minlength=self.num_nodes), out=indptr[1:])
+            self._in_csr = (indptr, np.ascontiguousarray(sources[order]))
+        return self._in_csr
+    
+    @property
+    def adj_t(self) -> torch.Tensor:
+        """Transposed adjacency as a torch.sparse CSR tensor (rows are targets)."""
+        if self._adj_t is None:
+            indptr, sources = self.in_csr
+            # Duplicate edges stay separate entries so mean aggregation matches COO
+            self._adj_t = torch.sparse_csr_tensor(
+                torch.from_numpy(indptr), torch.from_numpy(sources),
+                torch.ones(len(sources), dtype=self.x.dtype),
+                size=(self.num_nodes, self.num_nodes)
+            )
+        return self._adj_t
+    
+    @property
+    def gcn_adj_t(self) -> torch.Tensor:
+        """GCN-normalized adj_t with self-loops, computed exactly as GCNConv does for COO input."""
+        if self._gcn_adj_t is None:
+            edge_index, edge_weight = gcn_norm(
+                self.edge_index_tensor, None, self.num_nodes, add_self_loops=True, dtype=self.x.dtype
+            )
+            order = torch.argsort(edge_index[1], stable=True)
+            indptr = torch.zeros(self.num_nodes + 1, dtype=torch.int64)
+            torch.cumsum(torch.bincount(edge_index[1], minlength=self.num_nodes), dim=0, out=indptr[1:])
+            self._gcn_adj_t = torch.sparse_csr_tensor(
+                indptr, edge_index[0][order], edge_weight[order],
+                size=(self.num_nodes, self.num_nodes)
+            )
+        return self._gcn_adj_t
+    
+    def k_hop_subgraph(self, seeds: Sequence[int], num_hops: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract the nodes within `num_hops` incoming hops of the seeds, plus the incoming
+        edges of every node fewer than `num_hops` hops away. Returns (subset, edge_index):
+        the sorted original node indices and the edge index relabelled to positions in subset.
+        """
+        indptr, sources = self.in_csr
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        frontier = np.unique(np.asarray(seeds, dtype=np.int64))
+        visited[frontier] = True
+        
+        edge_sources, edge_targets = [], []
+        for _ in range(num_hops):
+            if len(frontier) == 0:
+                break
+            starts, ends = indptr[frontier], indptr[frontier + 1]
+            neighbours = sources[_expand_ranges(starts, ends)]
+            edge_sources.append(neighbours)
+            edge_targets.append(np.repeat(frontier, ends - starts))
+            
+            frontier = np.unique(neighbours[~visited[neighbours]])
+            visited[frontier] = True
+        
+        subset = np.flatnonzero(visited)
+        if not edge_sources:
+            return subset, np.empty((2, 0), dtype=np.int64)
+        
+        # subset is sorted, so positions double as the relabelling
+        edge_index = np.stack([
+            np.searchsorted(subset, np.concatenate(edge_sources)),
+            np.searchsorted(subset, np.concatenate(edge_targets))
+        ]).astype(np.int64)
+        return subset, edge_index
+    
+    @classmethod
+    def from_export(cls, graph_data: Dict[str, Any], version: int) -> 'GraphSnapshot':
+        """Build a snapshot from the output of Neo4jClient.export_graph_data."""
+        nodes_df = graph_data['nodes']
+        edges_df = graph_data['edges']
+        
+        node_features = node_features_from_export(nodes_df)
+        node_ids = nodes_df['nodeId'].values
+        
+        # Vectorized id remapping; only edges with both endpoints present survive
+        edge_index = edge_index_from_export(edges_df, NodeIdIndex(node_ids))
+        
+        nodes = nodes_df['node'].values if 'node' in nodes_df.columns else [None] * len(node_ids)
+        node_names = [_node_name(node, node_id) for node, node_id in zip(nodes, node_ids)]
+        node_labels = [_node_labels(node) for node in nodes]
+        
+        return cls(
+            version=version,
+            node_features=node_features,
+            edge_index=edge_index,
+            node_ids=node_ids,
+            node_names=node_names,
+            node_labels=node_labels
+        )
+    
+    def get_info(self) -> Dict[str, Any]:
+        """Get snapshot summary."""
+        return {
+            'version': self.version,
+            'num_nodes': self.num_nodes,
+            'num_edges': self.num_edges,
+            'feature_dim': self.node_features.shape[1] if self.node_features.ndim == 2 else 0,
+            'created_at': self.created_at.isoformat()
+        }
+
+def _expand_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenate arange(start, end) for each pair without a Python loop."""
+    counts = ends - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(total, dtype=np.int64)
+
+def _node_name(node: Any, node_id: Any) -> str:
+    """Extract a display name from an exported node, falling back to its id."""
+    if node is not None:
+        try:
+            name = node.get('name')
+        except AttributeError:
+            name = None
+        if name:
+            return str(name)
+    return str(node_id)
+
+def _node_labels(node: Any) -> FrozenSet[str]:
+    """Extract the label set from an exported node."""
+    labels = getattr(node, 'labels', None)
+    return frozenset(labels) if labels else frozenset()
+
+class GraphSnapshotManager:
+    """
+    Builds graph snapshots off the request path and swaps them in atomically.
+    Requests read `current` and never trigger an export themselves. Preparers
+    build derived state (embeddings, indexes) for a new snapshot before it is
+    published, so requests keep using the previous snapshot until then.
+    """
+    
+    def __init__(self, neo4j_client: Neo4jClient, graph_name: str = "knowledge_graph",
+                 refresh_interval: float = 300, retry_interval: float = 30):
+        self.neo4j = neo4j_client
+        self.graph_name = graph_name
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._version = 0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task = None
+        self._retry_requested = False
+        self.last_refresh_error: Optional[str] = None
+        
+        # Callbacks run before each swap (e.g. to build derived caches) and after it
+        self._preparers: List[Callable[[GraphSnapshot], Awaitable[None]]] = []
+        self._listeners: List[Callable[[GraphSnapshot], Awaitable[None]]] = []
+        
+        logger.info("GraphSnapshotManager initialized")
+    
+    @property
+    def current(self) -> Optional[GraphSnapshot]:
+        """Get the current snapshot, or None if none has been built yet."""
+        return self._snapshot
+    
+    def add_preparer(self, callback: Callable[[GraphSnapshot], Awaitable[None]]):
+        """Register an async callback invoked with each new snapshot before it is published."""
+        self._preparers.append(callback)
+    
+    def add_listener(self, callback: Callable[[GraphSnapshot], Awaitable[None]]):
+        """Register an async callback invoked with each new snapshot after it is published."""
+        self._listeners.append(callback)
+    
+    def request_retry(self):
+        """Refresh again after retry_interval rather than a full refresh_interval (e.g. after a failed warmup)."""
+        self._retry_requested = True
+    
+    def _next_interval(self) -> float:
+        """Seconds until the next refresh: shorter while there is no snapshot or a retry is pending."""
+        if self._snapshot is None or self.last_refresh_error is not None or self._retry_requested:
+            return self.retry_interval
+        return self.refresh_interval
+    
+    async def refresh(self) -> Optional[GraphSnapshot]:
+        """Export the graph and swap in a new snapshot version."""
+        async with self._refresh_lock:
+            self._retry_requested = False
+            try:
+                loop = asyncio.get_running_loop()
+                start_time = datetime.now()
+                
+                # Export and conversion are blocking; keep them off the event loop
+                graph_data = await loop.run_in_executor(
+                    None, self.neo4j.export_graph_data, self.graph_name
+                )
+                if not graph_data or graph_data['nodes'].empty:
+                    logger.warning("No graph data available for snapshot refresh")
+                    return self._snapshot
+                
+                snapshot = await loop.run_in_executor(
+                    None, GraphSnapshot.from_export, graph_data, self._version + 1
+                )
+                
+                self._version = snapshot.version
+                
+                # Requests keep reading the old snapshot (and its caches) until these finish
+                for preparer in self._preparers:
+                    try:
+                        await preparer(snapshot)
+                    except Exception as e:
+                        logger.error(f"Graph snapshot preparer failed: {e}")
+                
+                self._snapshot = snapshot
+                self.last_refresh_error = None
+                
+                elapsed = (datetime.now() - start_time).total_seconds()
+                logger.info(
+                    f"Graph snapshot v{snapshot.version} built in {elapsed:.2f}s: "
+                    f"{snapshot.num_nodes} nodes, {snapshot.num_edges} edges"
+                )
+                
+                for listener in self._listeners:
+                    try:
+                        await listener(snapshot)
+                    except Exception as e:
+                        logger.error(f"Graph snapshot listener failed: {e}")
+                
+                return snapshot
+            
+            except Exception as e:
+                self.last_refresh_error = str(e)
+                logger.error(f"Failed to refresh graph snapshot: {e}")
+                return self._snapshot
+    
+    async def start(self):
+        """Start the background refresh loop."""
+        if self._refresh_task:
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+        logger.info(f"Graph snapshot refresh started (interval: {self.refresh_interval}s)")
+    
+    async def stop(self):
+        """Stop the background refresh loop."""
+        if not self._refresh_task:
+            return
+        
+        self._refresh_task.cancel()
+        try:
+            await self._refresh_task
+        except asyncio.CancelledError:
+            pass
+        self._refresh_task = None
+        
+        logger.info("Graph snapshot refresh stopped")
+    
+    async def _refresh_loop(self):
+        """Refresh the snapshot on a fixed interval, retrying sooner after failures."""
+        # A snapshot built during warmup is fresh, and a failed warmup has just tried; wait first
+        if self._snapshot is not None or self._retry_requested:
+            try:
+                await asyncio.sleep(self._next_interval())
+            except asyncio.CancelledError:
+                return
+        
+        while True:
+            try:
+                await self.refresh()
+                await asyncio.sleep(self._next_interval())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Graph snapshot refresh loop failed: {e}")
+                await asyncio.sleep(self._next_interval())
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get snapshot manager status."""
+        return {
+            'graph_name': self.graph_name,
+            'refresh_interval_seconds': self.refresh_interval,
+            'retry_interval_seconds': self.retry_interval,
+            'refresh_running': self._refresh_task is not None,
+            'snapshot': self._snapshot.get_info() if self._snapshot else None,
+            'last_refresh_error': self.last_refresh_error
+        }
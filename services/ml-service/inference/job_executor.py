@@ -0,0 +1,223 @@
+import math
+import heapq
+import asyncio
+import logging
+import itertools
+from typing import Dict, List, Any, Optional, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+class JobQueueFull(Exception):
+    """Raised when a job is rejected because the queue is full."""
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class JobExecutor:
+    """
+    Bounded, prioritized executor for batch jobs.
+    Jobs wait in a priority queue (higher priority first, then FIFO) and start when
+    both the global and their prediction type's concurrency limits allow. Running
+    jobs are cancelled once they exceed the timeout, and submissions beyond the
+    queue bound are rejected with a retry-after estimate.
+    """
+    
+    def __init__(self, run_job: Callable[[str], Awaitable[Any]],
+                 on_timeout: Optional[Callable[[str], Awaitable[Any]]] = None,
+                 max_queue_size: int = 100, max_concurrent_jobs: int = 5,
+                 type_limits: Optional[Dict[str, int]] = None, job_timeout: float = 7200,
+                 default_run_time: float = 60, metrics: Optional[Dict[str, Any]] = None):
+        self.run_job = run_job
+        self.on_timeout = on_timeout
+        self.max_queue_size = max(int(max_queue_size), 1)
+        self.max_concurrent_jobs = max(int(max_concurrent_jobs), 1)
+        self.type_limits = type_limits or {}
+        self.job_timeout = job_timeout
+        self.default_run_time = default_run_time
+        
+        # Prometheus metrics from ModelMonitor, if available
+        self.metrics = metrics
+        
+        # Heap of (-priority, sequence, job_id); queued job details by id
+        self._queue: List = []
+        self._queued: Dict[str, Dict[str, Any]] = {}
+        self._sequence = itertools.count()
+        self._running: Dict[str, Dict[str, Any]] = {}
+        
+        # Moving average run time per prediction type, for retry-after estimates
+        self._run_times: Dict[str, float] = {}
+        self.stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'cancelled': 0
+        }
+    
+    def submit(self, job_id: str, prediction_type: str, priority: int = 0):
+        """Queue a job, or raise JobQueueFull if the queue is at its bound."""
+        if len(self._queued) >= self.max_queue_size:
+            self.stats['rejected'] += 1
+            self._count('batch_jobs_rejected', prediction_type)
+            raise JobQueueFull(
+                f"Batch queue is full ({len(self._queued)} jobs queued)",
+                retry_after=self.estimate_wait()
+            )
+        
+        self._queued[job_id] = {
+            'prediction_type': prediction_type,
+            'priority': priority,
+            'queued_at': asyncio.get_running_loop().time()
+        }
+        heapq.heappush(self._queue, (-priority, next(self._sequence), job_id))
+        self.stats['submitted'] += 1
+        
+        self._dispatch()
+    
+    def queued_count(self) -> int:
+        """Number of jobs waiting for a slot."""
+        return len(self._queued)
+    
+    def estimate_wait(self) -> int:
+        """Seconds until a slot is likely to free up for a newly queued job."""
+        average_run_time = (
+            sum(self._run_times.values()) / len(self._run_times)
+            if self._run_times else self.default_run_time
+        )
+        # Jobs ahead of it drain max_concurrent_jobs at a time
+        waves = (len(self._queued) + len(self._running)) / self.max_concurrent_jobs
+        return max(1, math.ceil(waves * average_run_time))
+    
+    def cancel(self, job_id: str) -> bool:
+        """Drop a queued job or cancel a running one."""
+        if self._queued.pop(job_id, None) is not None:
+            self._queue = [entry for entry in self._queue if entry[2] != job_id]
+            heapq.heapify(self._queue)
+            self.stats['cancelled'] += 1
+            return True
+        
+        running = self._running.get(job_id)
+        if running is not None:
+            running['task'].cancel()
+            return True
+        
+        return False
+    
+    def _dispatch(self):
+        """Start the highest-priority queued jobs that fit the concurrency limits."""
+        skipped = []
+        while self._queue and len(self._running) < self.max_concurrent_jobs:
+            entry = heapq.heappop(self._queue)
+            job_id = entry[2]
+            job = self._queued[job_id]
+            
+            if not self._has_capacity(job['prediction_type']):
+                skipped.append(entry)
+                continue
+            
+            del self._queued[job_id]
+            self._start(job_id, job)
+        
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+    
+    def _has_capacity(self, prediction_type: str) -> bool:
+        """Check the per-type concurrency limit."""
+        limit = self.type_limits.get(prediction_type)
+        if limit is None:
+            return True
+        running = sum(1 for job in self._running.values() if job['prediction_type'] == prediction_type)
+        return running < limit
+    
+    def _start(self, job_id: str, job: Dict[str, Any]):
+        """Run a job in its own task."""
+        loop = asyncio.get_running_loop()
+        queue_wait = loop.time() - job['queued_at']
+        self._observe('batch_job_queue_wait', job['prediction_type'], queue_wait)
+        
+        job['started_at'] = loop.time()
+        job['task'] = asyncio.create_task(self._run(job_id, job))
+        self._running[job_id] = job
+        
+        logger.info(
+            f"Started batch job {job_id} ({job['prediction_type']}, priority {job['priority']}) "
+            f"after {queue_wait:.2f}s in queue"
+        )
+    
+    async def _run(self, job_id: str, job: Dict[str, Any]):
+        """Run a job under the timeout, then free its slot and dispatch the next."""
+        outcome = 'completed'
+        try:
+            await asyncio.wait_for(self.run_job(job_id), timeout=self.job_timeout)
+        except asyncio.TimeoutError:
+            outcome = 'timed_out'
+            logger.error(f"Batch job {job_id} timed out after {self.job_timeout}s and was cancelled")
+            if self.on_timeout:
+                try:
+                    await self.on_timeout(job_id)
+                except Exception as e:
+                    logger.error(f"Failed to handle timeout of job {job_id}: {e}")
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            logger.info(f"Batch job {job_id} cancelled")
+        except Exception as e:
+            outcome = 'failed'
+            logger.error(f"Batch job {job_id} failed: {e}")
+        finally:
+            run_time = asyncio.get_running_loop().time() - job['started_at']
+            self._running.pop(job_id, None)
+            self.stats[outcome] += 1
+            self._observe('batch_job_run_time', job['prediction_type'], run_time)
+            
+            if outcome == 'completed':
+                previous = self._run_times.get(job['prediction_type'], run_time)
+                self._run_times[job['prediction_type']] = 0.8 * previous + 0.2 * run_time
+            
+            self._dispatch()
+    
+    async def stop(self):
+        """Cancel running jobs and drop queued ones."""
+        self._queue.clear()
+        self._queued.clear()
+        
+        tasks = [job['task'] for job in self._running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _observe(self, metric: str, prediction_type: str, seconds: float):
+        """Record a queue wait or run time histogram sample."""
+        if not self.metrics:
+            return
+        try:
+            self.metrics[metric].labels(prediction_type=prediction_type).observe(seconds)
+        except Exception as e:
+            logger.error(f"Failed to record batch job metrics: {e}")
+    
+    def _count(self, metric: str, prediction_type: str):
+        """Increment a batch job counter."""
+        if not self.metrics:
+            return
+        try:
+            self.metrics[metric].labels(prediction_type=prediction_type).inc()
+        except Exception as e:
+            logger.error(f"Failed to record batch job metrics: {e}")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get executor status."""
+        return {
+            'queued': len(self._queued),
+            'running': {
+                job_id: {'prediction_type': job['prediction_type'], 'priority': job['priority']}
+                for job_id, job in self._running.items()
+            },
+            'max_queue_size': self.max_queue_size,
+            'max_concurrent_jobs': self.max_concurrent_jobs,
+            'type_limits': self.type_limits,
+            'job_timeout_seconds': self.job_timeout,
+            'estimated_wait_seconds': self.estimate_wait(),
+            'average_run_time_seconds': dict(self._run_times),
+            **self.stats
+        }
@@ -0,0 +1,144 @@
+import re
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+class NodeNameIndex:
+    """
+    Prebuilt lookup structures over graph node names.
+    Provides an exact-match hash map, a normalized-token inverted index and a
+    character n-gram index for substring ("contains") and fuzzy queries.
+    Posting lists are sorted int64 arrays, so candidates come back in node order.
+    """
+    
+    # Candidates verified per step when a result limit allows early exit
+    CANDIDATE_CHUNK = 1024
+    
+    def __init__(self, node_names: List[str], ngram_size: int = 3):
+        self.ngram_size = ngram_size
+        self._names_lower = [str(name).lower() for name in node_names]
+        
+        exact = defaultdict(list)
+        tokens = defaultdict(list)
+        ngrams = defaultdict(list)
+        gram_counts = np.zeros(len(self._names_lower), dtype=np.int32)
+        
+        for idx, name in enumerate(self._names_lower):
+            exact[name].append(idx)
+            for token in set(_TOKEN_PATTERN.findall(name)):
+                tokens[token].append(idx)
+            grams = self._ngrams(name)
+            gram_counts[idx] = len(grams)
+            for gram in grams:
+                ngrams[gram].append(idx)
+        
+        self._exact = {key: np.asarray(value, dtype=np.int64) for key, value in exact.items()}
+        self._tokens = {key: np.asarray(value, dtype=np.int64) for key, value in tokens.items()}
+        self._ngrams_index = {key: np.asarray(value, dtype=np.int64) for key, value in ngrams.items()}
+        self._gram_counts = gram_counts
+        
+        logger.debug(
+            f"Built name index: {len(self._names_lower)} names, {len(self._tokens)} tokens, "
+            f"{len(self._ngrams_index)} {ngram_size}-grams"
+        )
+    
+    def __len__(self) -> int:
+        return len(self._names_lower)
+    
+    def _ngrams(self, text: str) -> set:
+        """Character n-grams of a normalized string."""
+        n = self.ngram_size
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+    
+    def exact(self, name: str) -> np.ndarray:
+        """Indices of nodes whose normalized name equals `name`."""
+        return self._exact.get(str(name).lower(), np.empty(0, dtype=np.int64))
+    
+    def token(self, token: str) -> np.ndarray:
+        """Indices of nodes whose name contains `token` as a whole word."""
+        return self._tokens.get(str(token).lower(), np.empty(0, dtype=np.int64))
+    
+    def contains(self, query: str, limit: Optional[int] = None) -> np.ndarray:
+        """
+        Indices of nodes whose normalized name contains `query`, in node order.
+        Same semantics as `query.lower() in name.lower()`.
+        """
+        query = str(query).lower()
+        
+        if len(query) < self.ngram_size:
+            # Too short for the n-gram index; scan with early exit
+            matches = []
+            for idx, name in enumerate(self._names_lower):
+                if query in name:
+                    matches.append(idx)
+                    if limit is not None and len(matches) >= limit:
+                        break
+            return np.asarray(matches, dtype=np.int64)
+        
+        # Intersect posting lists, smallest first
+        postings = []
+        for gram in self._ngrams(query):
+            posting = self._ngrams_index.get(gram)
+            if posting is None:
+                return np.empty(0, dtype=np.int64)
+            postings.append(posting)
+        postings.sort(key=len)
+        
+        # Walk the rarest posting list in chunks so limited lookups exit early
+        chunk_size = self.CANDIDATE_CHUNK if limit is not None else len(postings[0])
+        matches = []
+        for start in range(0, len(postings[0]), max(chunk_size, 1)):
+            candidates = postings[0][start:start + chunk_size]
+            for posting in postings[1:]:
+                candidates = candidates[_sorted_membership(posting, candidates)]
+                if candidates.size == 0:
+                    break
+            
+            # N-gram overlap is necessary but not sufficient; verify the substring
+            for idx in candidates.tolist():
+                if query in self._names_lower[idx]:
+                    matches.append(idx)
+                    if limit is not None and len(matches) >= limit:
+                        return np.asarray(matches, dtype=np.int64)
+        
+        return np.asarray(matches, dtype=np.int64)
+    
+    def first_containing(self, query: str) -> Optional[int]:
+        """First node (in node order) whose name contains `query`."""
+        matches = self.contains(query, limit=1)
+        return int(matches[0]) if matches.size else None
+    
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, float]]:
+        """Fuzzy lookup ranked by n-gram Jaccard similarity; exact matches first."""
+        query = str(query).lower()
+        query_grams = self._ngrams(query)
+        
+        postings = [self._ngrams_index[gram] for gram in query_grams if gram in self._ngrams_index]
+        if not postings:
+            return [{'index': int(idx), 'score': 1.0} for idx in self.exact(query)[:limit]]
+        
+        candidates, overlap = np.unique(np.concatenate(postings), return_counts=True)
+        union = len(query_grams) + self._gram_counts[candidates] - overlap
+        scores = overlap / np.maximum(union, 1)
+        
+        exact_matches = set(self.exact(query).tolist())
+        if exact_matches:
+            scores = np.where(np.isin(candidates, list(exact_matches)), scores + 1.0, scores)
+        
+        top = np.argsort(-scores, kind='stable')[:limit]
+        return [
+            {'index': int(candidates[i]), 'score': float(min(scores[i], 1.0))}
+            for i in top
+        ]
+
+def _sorted_membership(sorted_values: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Boolean mask of `queries` present in the sorted array `sorted_values`."""
+    positions = np.searchsorted(sorted_values, queries)
+    positions = np.minimum(positions, len(sorted_values) - 1)
+    return sorted_values[positions] == queries
@@ -0,0 +1,139 @@
+import json
+import time
+import copy
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class PredictionCache:
+    """
+    Bounded LRU/TTL cache for prediction results.
+    Keys include the model generation and graph snapshot version, so a retrain
+    or graph refresh makes old entries unreachable; they age out via LRU/TTL.
+    """
+    
+    # Rough per-entry bookkeeping overhead added to the serialized size
+    ENTRY_OVERHEAD_BYTES = 200
+    
+    def __init__(self, max_entries: int = 10000, max_memory_mb: float = 64,
+                 ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        
+        # key -> (value, expires_at, size_bytes)
+        self._entries: "OrderedDict[Tuple, Tuple[Any, float, int]]" = OrderedDict()
+        self.memory_bytes = 0
+        self.model_stats: Dict[str, Dict[str, int]] = {}
+        
+        logger.info(
+            f"PredictionCache initialized (max_entries: {max_entries}, "
+            f"max_memory_mb: {max_memory_mb}, ttl: {ttl_seconds}s)"
+        )
+    
+    @staticmethod
+    def make_key(model_type: str, inputs: Dict[str, Any], model_generation: int,
+                 snapshot_version: int) -> Tuple:
+        """Build a cache key from normalized inputs plus model and snapshot versions."""
+        normalized = {
+            name: ' '.join(value.split()) if isinstance(value, str) else value
+            for name, value in inputs.items()
+        }
+        return (
+            model_type,
+            json.dumps(normalized, sort_keys=True, default=str),
+            model_generation,
+            snapshot_version
+        )
+    
+    def _stats(self, model_type: str) -> Dict[str, int]:
+        return self.model_stats.setdefault(model_type, {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0
+        })
+    
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Get a copy of a cached value, or None on a miss or expired entry."""
+        stats = self._stats(key[0])
+        entry = self._entries.get(key)
+        
+        if entry is None:
+            stats['misses'] += 1
+            return None
+        
+        value, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            stats['expirations'] += 1
+            stats['misses'] += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        stats['hits'] += 1
+        return copy.deepcopy(value)
+    
+    def put(self, key: Tuple, value: Any):
+        """Cache a value, evicting least recently used entries to stay within limits."""
+        try:
+            size = len(json.dumps(value, default=str)) + len(key[1]) + self.ENTRY_OVERHEAD_BYTES
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to size prediction for caching: {e}")
+            return
+        
+        if size > self.max_memory_bytes:
+            return
+        
+        if key in self._entries:
+            self._remove(key)
+        
+        self._entries[key] = (copy.deepcopy(value), time.monotonic() + self.ttl_seconds, size)
+        self.memory_bytes += size
+        
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self.memory_bytes > self.max_memory_bytes):
+            evicted_key, _ = next(iter(self._entries.items()))
+            self._remove(evicted_key)
+            self._stats(evicted_key[0])['evictions'] += 1
+    
+    def _remove(self, key: Tuple):
+        _, _, size = self._entries.pop(key)
+        self.memory_bytes -= size
+    
+    def clear(self, model_type: Optional[str] = None) -> int:
+        """Flush all entries, or only those of one model type. Returns the number removed."""
+        if model_type is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self.memory_bytes = 0
+        else:
+            keys = [key for key in self._entries if key[0] == model_type]
+            for key in keys:
+                self._remove(key)
+            removed = len(keys)
+        
+        logger.debug(f"Prediction cache flushed: {removed} entries")
+        return removed
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get cache status and per-model counters."""
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'memory_bytes': self.memory_bytes,
+            'max_memory_bytes': self.max_memory_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'models': {
+                model_type: {
+                    **stats,
+                    'hit_rate': stats['hits'] / max(stats['hits'] + stats['misses'], 1)
+                }
+                for model_type, stats in self.model_stats.items()
+            }
+        }
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from utils.supabase_client import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+class PredictionLogBuffer:
+    """
+    Write-behind buffer for prediction logging.
+    Requests enqueue records without waiting on Supabase; a background task
+    bulk-inserts them when `flush_size` records are queued or every
+    `flush_interval` seconds. When the queue is full, new records are dropped
+    and counted rather than blocking the request.
+    """
+    
+    def __init__(self, supabase_client: SupabaseClient, max_queue_size: int = 10000,
+                 flush_size: int = 500, flush_interval: float = 5.0):
+        self.supabase = supabase_client
+        self.max_queue_size = max_queue_size
+        self.flush_size = max(flush_size, 1)
+        self.flush_interval = flush_interval
+        
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._flush_requested = asyncio.Event()
+        self._flush_task = None
+        self._stopping = False
+        self._drop_warned = False
+        self.last_flush: Optional[str] = None
+        self.stats = {
+            'enqueued': 0,
+            'dropped': 0,
+            'flushed': 0,
+            'failed': 0,
+            'flushes': 0
+        }
+        
+        logger.info(
+            f"PredictionLogBuffer initialized (max_queue_size: {max_queue_size}, "
+            f"flush_size: {flush_size}, flush_interval: {flush_interval}s)"
+        )
+    
+    def log(self, predictions: List[Dict[str, Any]]) -> bool:
+        """Queue predictions for storage without blocking. Returns False if any were dropped."""
+        try:
+            records = self.supabase.build_prediction_records(predictions)
+        except Exception as e:
+            logger.error(f"Failed to build prediction records: {e}")
+            return False
+        
+        accepted = True
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+                self.stats['enqueued'] += 1
+            except asyncio.QueueFull:
+                self.stats['dropped'] += 1
+                accepted = False
+        
+        # Backpressure: flush early once a full batch is waiting
+        if self._queue.qsize() >= self.flush_size:
+            self._flush_requested.set()
+        
+        # Warn once per flush cycle; the counter carries the rest
+        if not accepted and not self._drop_warned:
+            self._drop_warned = True
+            logger.warning(f"Prediction log queue full; {self.stats['dropped']} records dropped so far")
+        return accepted
+    
+    async def start(self):
+        """Start the background flush loop."""
+        if self._flush_task:
+            return
+        self._stopping = False
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info("Prediction log buffer started")
+    
+    async def stop(self):
+        """Stop the flush loop after draining everything queued."""
+        if not self._flush_task:
+            await self.flush()
+            return
+        
+        self._stopping = True
+        self._flush_requested.set()
+        await self._flush_task
+        self._flush_task = None
+        
+        logger.info(f"Prediction log buffer stopped ({self.stats['flushed']} records flushed)")
+    
+    async def _flush_loop(self):
+        """Flush on size or time thresholds until stopped, then drain."""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_requested.clear()
+                
+                await self.flush()
+                
+                if self._stopping:
+                    break
+            
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Prediction log flush loop failed: {e}")
+    
+    async def flush(self) -> int:
+        """Bulk insert everything currently queued, `flush_size` records per insert."""
+        loop = asyncio.get_running_loop()
+        flushed = 0
+        
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.flush_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            # The Supabase client is synchronous; keep the insert off the event loop
+            success = await loop.run_in_executor(None, self.supabase.insert_prediction_records, batch)
+            self.stats['flushes'] += 1
+            if success:
+                self.stats['flushed'] += len(batch)
+                flushed += len(batch)
+            else:
+                self.stats['failed'] += len(batch)
+        
+        if flushed:
+            self.last_flush = datetime.now().isoformat()
+        self._drop_warned = False
+        return flushed
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get buffer status."""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_queue_size': self.max_queue_size,
+            'flush_size': self.flush_size,
+            'flush_interval_seconds': self.flush_interval,
+            'running': self._flush_task is not None,
+            'last_flush': self.last_flush,
+            **self.stats
+        }
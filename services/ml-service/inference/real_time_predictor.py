@@ -1,16 +1,29 @@
 import torch
 import numpy as np
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 import asyncio
 import logging
+from collections import OrderedDict
 from datetime import datetime
 import mlflow.pytorch
 from pathlib import Path
 import yaml
 
-from models.link_prediction import load_model, ExpertiseRecommendationGNN
-from models.node_classification import load_classification_model
-from utils.neo4j_client import Neo4jClient
+from models.link_prediction import create_model, ExpertiseRecommendationGNN
+from models.node_classification import create_classification_model
+from models.quantization import load_quantized_model, quantized_model_path
+from models.sparse_adjacency import supports_sparse_adjacency
+from inference.graph_snapshot import GraphSnapshot, GraphSnapshotManager
+from inference.embedding_cache import EmbeddingCache
+from inference.vector_index import IVFIndex
+from inference.request_batcher import RequestBatcher
+from inference.prediction_cache import PredictionCache
+from inference.prediction_logger import PredictionLogBuffer
+from inference.serving_backend import build_serving_backend, SparseAdjacencyBackend
+from inference.worker_pool import ChunkWorkers, decode_link_probabilities
+from mlops.model_monitor import ModelMonitor
+from mlops.model_registry import ModelRegistry, load_weights
+from utils.neo4j_client import Neo4jClient, NAME_INDEXED_LABELS
 from utils.supabase_client import SupabaseClient
 
 logger = logging.getLogger(__name__)
@@ -21,17 +34,30 @@ class RealTimePredictor:
     Implements knowledge-first approach with ML fallback.
     """
     
-    def __init__(self, neo4j_client: Neo4jClient, supabase_client: SupabaseClient):
+    # Models whose node embeddings are cached per graph snapshot
+    ENCODER_MODEL_TYPES = ('link_prediction', 'expertise_recommendation')
+    
+    # Models loaded at startup, in order, while they fit the model cache
+    SERVED_MODEL_TYPES = ('link_prediction', 'expertise_recommendation', 'node_classification')
+    
+    # Warmup phases that must succeed before the service reports ready
+    REQUIRED_WARMUP_PHASES = ('graph_snapshot', 'embeddings')
+    
+    def __init__(self, neo4j_client: Neo4jClient, supabase_client: SupabaseClient,
+                 monitor: Optional[ModelMonitor] = None):
         self.neo4j = neo4j_client
         self.supabase = supabase_client
+        self.monitor = monitor
         
         # Model storage
         self.models = {}
         self.model_configs = {}
         self.model_metadata = {}
+        self.model_generations = {}
+        self.serving_backends = {}
+        self._sparse_backends = {}
         
         # Performance tracking
-        self.prediction_cache = {}
         self.performance_metrics = {
             'total_predictions': 0,
             'cache_hits': 0,
@@ -41,6 +67,76 @@ class RealTimePredictor:
         
         # Load model configurations
         self._load_model_configs()
+        self._load_serving_config()
+        
+        # Versioned artifacts and the LRU of resident models
+        self.registry = ModelRegistry(
+            supabase_client,
+            self.model_configs.get('model_registry', {}),
+            cache_size=self.serving_config.get('model_cache_size', 3)
+        )
+        self._model_locks = {}
+        # model_type -> version loaded on next use (resolved at startup, or evicted)
+        self._unloaded_versions = {}
+        
+        # Bounded LRU/TTL cache of link and expertise results
+        cache_config = self.serving_config.get('prediction_cache', {})
+        self.prediction_cache = PredictionCache(
+            max_entries=cache_config.get('max_entries', 10000),
+            max_memory_mb=cache_config.get('max_memory_mb', 64),
+            ttl_seconds=cache_config.get('ttl_seconds', 300)
+        )
+        
+        # Prediction logging is write-behind so Supabase stays off the request path
+        logging_config = self.serving_config.get('prediction_logging', {})
+        self.prediction_log = PredictionLogBuffer(
+            supabase_client,
+            max_queue_size=logging_config.get('max_queue_size', 10000),
+            flush_size=logging_config.get('flush_size', 500),
+            flush_interval=logging_config.get('flush_interval', 5.0)
+        )
+        
+        # Versioned graph snapshot, refreshed in the background
+        snapshot_config = self.serving_config.get('graph_snapshot', {})
+        self.snapshot_manager = GraphSnapshotManager(
+            neo4j_client,
+            graph_name=snapshot_config.get('graph_name', 'knowledge_graph'),
+            refresh_interval=snapshot_config.get('refresh_interval', 300),
+            retry_interval=snapshot_config.get('retry_interval', 30)
+        )
+        
+        # Full-graph node embeddings per (model, snapshot version), built before a snapshot is published
+        self.embedding_cache = EmbeddingCache()
+        self._embedding_locks = {}
+        self.snapshot_manager.add_preparer(self._prepare_snapshot)
+        self.snapshot_manager.add_listener(self._on_snapshot_refreshed)
+        
+        # Warmup state; the service reports ready only once warmup has finished
+        self.warmup_status = {
+            'state': 'pending',
+            'phases': {},
+            'errors': {},
+            'started_at': None,
+            'completed_at': None
+        }
+        
+        # Link inference: cached full-graph embeddings or per-request k-hop subgraphs
+        self.link_inference_config = self.serving_config.get('link_inference', {})
+        
+        # Per-snapshot person scoring terms and ANN index for expertise serving
+        self.expert_retrieval_config = self.serving_config.get('expert_retrieval', {})
+        self._expert_states: "OrderedDict[Tuple[int, int], Dict[str, Any]]" = OrderedDict()
+        
+        # Micro-batchers: one vectorized model call per batch of concurrent requests
+        batcher_kwargs = {
+            'batch_size': self.serving_config.get('batch_size', 32),
+            'max_batch_delay': self.serving_config.get('max_batch_delay', 100),
+            'metrics': monitor.metrics if monitor else None
+        }
+        self.link_batcher = RequestBatcher('link_prediction', self._decode_link_batch, **batcher_kwargs)
+        self.expertise_batcher = RequestBatcher(
+            'expertise_recommendation', self._score_expertise_batch, **batcher_kwargs
+        )
         
         logger.info("RealTimePredictor initialized")
     
@@ -73,61 +169,95 @@ class RealTimePredictor:
             logger.error(f"Failed to load model configs: {e}")
             self.model_configs = {}
     
+    def _load_serving_config(self):
+        """Load serving configuration from the deployment config."""
+        try:
+            config_path = Path("config/deployment_config.yaml")
+            if config_path.exists():
+                with open(config_path, 'r') as f:
+                    self.serving_config = (yaml.safe_load(f) or {}).get('serving', {})
+            else:
+                self.serving_config = {}
+        except Exception as e:
+            logger.error(f"Failed to load serving config: {e}")
+            self.serving_config = {}
+    
+    async def start(self):
+        """Start background services (graph snapshot refresh, prediction logging)."""
+        await self.snapshot_manager.start()
+        await self.prediction_log.start()
+    
+    async def stop(self):
+        """Stop background services."""
+        await self.snapshot_manager.stop()
+        await self.link_batcher.stop()
+        await self.expertise_batcher.stop()
+        await self.prediction_log.stop()
+        self.registry.release_leases()
+    
+    async def refresh_graph_snapshot(self) -> Optional[GraphSnapshot]:
+        """Rebuild the graph snapshot on demand."""
+        return await self.snapshot_manager.refresh()
+    
     async def load_latest_models(self):
-        """Load the latest trained models."""
+        """
+        Resolve the serving version of each model type. Weights are loaded on first use
+        (see _get_model), so only model types that are actually served become resident.
+        """
         try:
-            model_dir = Path("models")
-            if not model_dir.exists():
-                logger.warning("Models directory not found")
-                return
-            
-            # Load link prediction model
-            await self._load_model_by_type("link_prediction")
-            
-            # Load expertise recommendation model
-            await self._load_model_by_type("expertise_recommendation")
-            
-            # Load node classification model
-            await self._load_model_by_type("node_classification")
+            for model_type in self.SERVED_MODEL_TYPES:
+                record = await self.registry.resolve(model_type)
+                if record is None:
+                    logger.warning(f"No {model_type} model found")
+                    continue
+                
+                # Keep the artifact from being cleaned up before its first use
+                self.registry.hold_lease(model_type, record['model_path'])
+                self.model_metadata[model_type] = {
+                    'path': record['model_path'],
+                    'version': record['version'],
+                    'status': record.get('status'),
+                    'resident': False
+                }
+                self._unloaded_versions[model_type] = record['version']
             
-            logger.info(f"Loaded {len(self.models)} models")
+            logger.info(f"Resolved {len(self._unloaded_versions)} model versions; weights load on first use")
             
         except Exception as e:
-            logger.error(f"Failed to load models: {e}")
+            logger.error(f"Failed to resolve models: {e}")
     
-    async def _load_model_by_type(self, model_type: str):
-        """Load the latest model of a specific type."""
+    async def _load_model_by_type(self, model_type: str, model_version: Optional[str] = None) -> bool:
+        """Load a registered model version (the serving version if None) with memory-mapped weights."""
         try:
-            model_dir = Path("models")
-            
-            # Find latest model file
-            pattern = f"{model_type}_best_*.pt"
-            model_files = list(model_dir.glob(pattern))
-            
-            if not model_files:
-                logger.warning(f"No {model_type} model found")
+            record = await self.registry.resolve(model_type, model_version)
+            if record is None:
+                if model_version:
+                    logger.error(f"Model not found: {model_type} version {model_version}")
+                else:
+                    logger.warning(f"No {model_type} model found")
                 return False
             
-            # Get the most recent model
-            latest_model = max(model_files, key=lambda x: x.stat().st_mtime)
+            model_path = record['model_path']
             
             # Load model
             config = self.model_configs.get(model_type, {})
             if model_type in ['link_prediction', 'expertise_recommendation']:
-                model = load_model(str(latest_model), model_type, config)
+                model = load_weights(create_model(model_type, config), model_path)
             else:
-                model = load_classification_model(str(latest_model), model_type, config)
+                model = load_weights(create_classification_model(model_type, config), model_path)
             
-            model.eval()
+            model, quantized = self._load_serving_variant(model_type, model, model_path)
             
-            self.models[model_type] = model
-            self.model_metadata[model_type] = {
-                'path': str(latest_model),
+            self._register_model(model_type, model, {
+                'path': model_path,
+                'version': record['version'],
+                'status': record.get('status'),
                 'loaded_at': datetime.now().isoformat(),
-                'file_size': latest_model.stat().st_size
-            }
+                'file_size': Path(model_path).stat().st_size,
+                'quantized': quantized
+            })
             
-            logger.info(f"Loaded {model_type} model from {latest_model}")
+            logger.info(f"Loaded {model_type} model version {record['version']} from {model_path}")
             return True
             
         except Exception as e:
@@ -135,44 +265,223 @@ class RealTimePredictor:
             return False
     
     async def load_model(self, model_type: str, model_version: Optional[str] = None) -> bool:
-        """Load a specific model version."""
-        try:
-            if model_version:
-                # Load specific version
-                model_path = Path(f"models/{model_type}_{model_version}.pt")
-            else:
-                # Load latest
-                return await self._load_model_by_type(model_type)
-            
-            if not model_path.exists():
-                logger.error(f"Model not found: {model_path}")
-                return False
-            
-            config = self.model_configs.get(model_type, {})
-            if model_type in ['link_prediction', 'expertise_recommendation']:
-                model = load_model(str(model_path), model_type, config)
-            else:
-                model = load_classification_model(str(model_path), model_type, config)
-            
-            model.eval()
-            
-            self.models[model_type] = model
-            self.model_metadata[model_type] = {
-                'path': str(model_path),
-                'loaded_at': datetime.now().isoformat(),
-                'version': model_version
-            }
-            
-            logger.info(f"Loaded {model_type} model version {model_version}")
-            return True
+        """Load a specific model version, or the serving version if None."""
+        success = await self._load_model_by_type(model_type, model_version)
+        if success:
+            await self.refresh_embeddings([model_type])
+        return success
+            
+    async def _get_model(self, model_type: str) -> Optional[torch.nn.Module]:
+        """Resident model for a type, loading it on first use or after eviction from the model cache."""
+        if self.registry.get_resident(model_type) is not None:
+            return self.models[model_type]
+            
+        version = self._unloaded_versions.get(model_type)
+        if version is None:
+            return None
             
+        lock = self._model_locks.setdefault(model_type, asyncio.Lock())
+        async with lock:
+            # Another request may have loaded it while we waited
+            if model_type not in self.models:
+                logger.info(f"Loading {model_type} model version {version}")
+                if not await self._load_model_by_type(model_type, version):
+                    return None
+            return self.models.get(model_type)
+            
+    def _release_model(self, model_type: str):
+        """Drop an evicted model and everything derived from its weights."""
+        self.models.pop(model_type, None)
+        self.serving_backends.pop(model_type, None)
+        self._sparse_backends.pop(model_type, None)
+        self.embedding_cache.invalidate(model_type)
+        if model_type == 'expertise_recommendation':
+            self._expert_states.clear()
+            
+        metadata = self.model_metadata.get(model_type, {})
+        metadata['resident'] = False
+        self._unloaded_versions[model_type] = metadata.get('version')
+    
+    def _load_serving_variant(self, model_type: str, model: torch.nn.Module,
+                              model_path: str) -> Tuple[torch.nn.Module, bool]:
+        """Swap in the promoted INT8 artifact for a checkpoint when quantized serving is enabled."""
+        serving_config = self.model_configs.get(model_type, {}).get('serving', {}) or {}
+        if not serving_config.get('quantized', False):
+            return model, False
+        
+        # Only checkpoints that passed the training-time accuracy budget have an artifact
+        artifact_path = quantized_model_path(model_path)
+        if not Path(artifact_path).exists():
+            logger.info(f"No quantized artifact for {model_path}; serving fp32 {model_type} model")
+            return model, False
+        
+        try:
+            return load_quantized_model(artifact_path, model), True
         except Exception as e:
-            logger.error(f"Failed to load {model_type} model version {model_version}: {e}")
-            return False
+            logger.error(f"Failed to load quantized {model_type} model: {e}")
+            return model, False
+    
+    def _register_model(self, model_type: str, model: torch.nn.Module, metadata: Dict[str, Any]):
+        """Swap in a loaded model and invalidate anything derived from the old weights."""
+        # Compile the configured serving backend (parity-checked, eager fallback)
+        backend = build_serving_backend(model, model_type, self.model_configs.get(model_type, {}))
+        
+        self.models[model_type] = model
+        self.serving_backends[model_type] = backend
+        self.model_generations[model_type] = self.model_generations.get(model_type, 0) + 1
+        self.model_metadata[model_type] = {
+            **metadata,
+            'generation': self.model_generations[model_type],
+            'serving_backend': backend.name,
+            'backend_parity': backend.parity,
+            'resident': True
+        }
+        self.embedding_cache.invalidate(model_type)
+        
+        # Keep at most model_cache_size models resident; evicted ones reload on next use
+        self._unloaded_versions.pop(model_type, None)
+        for evicted_type in self.registry.put_resident(model_type, metadata.get('version'), model,
+                                                       metadata.get('path')):
+            self._release_model(evicted_type)
+    
+    def get_model_spec(self, model_type: str) -> Dict[str, Any]:
+        """Picklable description of the resident model version, for loading it in batch worker processes."""
+        metadata = self.model_metadata[model_type]
+        return {
+            'model_type': model_type,
+            'version': metadata.get('version'),
+            'model_path': metadata['path'],
+            'quantized': metadata.get('quantized', False),
+            'config': self.model_configs.get(model_type, {}),
+            'generation': self.model_generations.get(model_type, 0)
+        }
+    
+    async def _get_node_embeddings(self, model_type: str, snapshot: GraphSnapshot) -> torch.Tensor:
+        """Get full-graph node embeddings (classifier logits for node_classification), computing only on a cache miss."""
+        generation = self.model_generations.get(model_type, 0)
+        embeddings = self.embedding_cache.get(model_type, generation, snapshot)
+        if embeddings is not None:
+            return embeddings
+        
+        lock = self._embedding_locks.setdefault(model_type, asyncio.Lock())
+        async with lock:
+            # Another request may have built it while we waited
+            embeddings = self.embedding_cache.get(model_type, generation, snapshot)
+            if embeddings is not None:
+                return embeddings
+            
+            def build():
+                encoder = self._full_graph_backend(model_type, snapshot)
+                return self.embedding_cache.build(model_type, encoder, generation, snapshot)
+            
+            loop = asyncio.get_running_loop()
+            embeddings = await loop.run_in_executor(None, build)
+            
+            if model_type == 'expertise_recommendation':
+                await loop.run_in_executor(
+                    None, self._build_expert_state, embeddings, generation, snapshot
+                )
+            
+            return embeddings
+    
+    def _full_graph_backend(self, model_type: str, snapshot: GraphSnapshot):
+        """
+        Serving backend for full-graph passes over a snapshot. GCN/SAGE models run over the
+        snapshot's sparse adjacency with cached GCN normalization; others use the compiled backend.
+        Builds the adjacency on first use per snapshot. Blocking.
+        """
+        backend = self.serving_backends[model_type]
+        model = self.models[model_type]
+        if not self.serving_config.get('sparse_adjacency', True) or not supports_sparse_adjacency(model):
+            return backend
+        
+        key = (self.model_generations.get(model_type, 0), snapshot.version)
+        cached = self._sparse_backends.get(model_type)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        method = 'encode' if model_type in self.ENCODER_MODEL_TYPES else 'forward'
+        sparse_backend = SparseAdjacencyBackend(model, method, snapshot)
+        self._sparse_backends[model_type] = (key, sparse_backend)
+        return sparse_backend
+    
+    def _build_expert_state(self, node_embeddings: torch.Tensor, generation: int,
+                            snapshot: GraphSnapshot):
+        """
+        Precompute topic-independent expertise terms for every person, plus the
+        ANN index over them. Built alongside the expertise embeddings. Blocking.
+        """
+        config = self.expert_retrieval_config
+        person_nodes = snapshot.person_indices
+        person_embeddings = node_embeddings[torch.from_numpy(person_nodes)]
+        
+        state = {
+            'person_nodes': person_nodes,
+            'expert_cache': self.models['expertise_recommendation'].build_expert_cache(person_embeddings),
+            'index': None
+        }
+        
+        if config.get('mode', 'ann') == 'ann' and len(person_nodes) >= config.get('min_persons', 5000):
+            try:
+                # The exact score is cos(topic, person) * scorer(person): an inner product of the
+                # normalized topic with the scorer-weighted person vector, so search by that
+                expert_cache = state['expert_cache']
+                state['index'] = IVFIndex(
+                    (expert_cache['normalized'] * expert_cache['scores'].unsqueeze(1)).numpy(),
+                    ids=person_nodes,
+                    num_lists=config.get('num_lists'),
+                    num_iters=config.get('num_iters', 10),
+                    metric='inner_product'
+                )
+            except Exception as e:
+                logger.error(f"Failed to build expert index: {e}")
+        
+        # Kept alongside the embeddings: the serving snapshot's state plus the one being prepared
+        self._expert_states[(generation, snapshot.version)] = state
+        while len(self._expert_states) > self.embedding_cache.max_versions:
+            self._expert_states.popitem(last=False)
+    
+    def _get_expert_state(self, snapshot: GraphSnapshot) -> Optional[Dict[str, Any]]:
+        """Get the expertise serving state if it matches the current model and snapshot."""
+        generation = self.model_generations.get('expertise_recommendation', 0)
+        return self._expert_states.get((generation, snapshot.version))
+    
+    def _expert_retrieval_mode(self, snapshot: GraphSnapshot) -> str:
+        """'ann' when single-topic expertise is shortlisted through the index, else 'exact'."""
+        expert_state = self._get_expert_state(snapshot)
+        return 'ann' if expert_state is not None and expert_state['index'] is not None else 'exact'
+    
+    async def refresh_embeddings(self, model_types: Optional[List[str]] = None,
+                                 snapshot: Optional[GraphSnapshot] = None):
+        """Precompute embeddings for loaded encoder models on a snapshot (the current one by default)."""
+        snapshot = snapshot or self.snapshot_manager.current
+        if snapshot is None:
+            return
+        
+        for model_type in model_types or self.ENCODER_MODEL_TYPES:
+            if model_type not in self.ENCODER_MODEL_TYPES or model_type not in self.models:
+                continue
+            try:
+                await self._get_node_embeddings(model_type, snapshot)
+            except Exception as e:
+                logger.error(f"Failed to precompute {model_type} embeddings: {e}")
+    
+    async def _prepare_snapshot(self, snapshot: GraphSnapshot):
+        """Build embeddings and expert state for a new graph snapshot before it is swapped in."""
+        if self.warmup_status['state'] == 'running':
+            # Warmup builds them in its own (timed) phase
+            return
+        await self.refresh_embeddings(snapshot=snapshot)
+    
+    async def _on_snapshot_refreshed(self, snapshot: GraphSnapshot):
+        """Retry a failed warmup once a new graph snapshot is swapped in."""
+        if self.warmup_status['state'] == 'degraded':
+            # Ready only once it completes; the embeddings are already prepared
+            await self.warmup_models()
     
     def is_ready(self) -> bool:
-        """Check if predictor is ready for inference."""
-        return len(self.models) > 0
+        """Check if predictor is ready for inference: a model is resident or loads on first use."""
+        return len(self.models) > 0 or len(self._unloaded_versions) > 0
     
     async def search_knowledge_for_experts(self, topic: str, max_experts: int = 5) -> List[Dict[str, Any]]:
         """
@@ -180,23 +489,43 @@ class RealTimePredictor:
         Implements knowledge-first approach with comprehensive search strategy.
         """
         try:
-            session = self.neo4j.session()
-            
-            # Step 1: Direct expertise relationships in Neo4j
-            direct_experts = session.run("""
-                MATCH (p:Person)-[r:HAS_EXPERTISE]->(t:Topic)
-                WHERE t.name CONTAINS $topic OR t.description CONTAINS $topic
-                RETURN p.name as name, 
-                       p.email_address as email,
-                       r.confidence as confidence,
-                       r.source as source,
-                       t.name as topic_name
-                ORDER BY r.confidence DESC
-                LIMIT $max_experts
-            """, {"topic": topic, "max_experts": max_experts})
+            # The direct, indirect and Supabase lookups are independent, so run them
+            # concurrently (each Neo4j query on its own async session) and trim afterwards
+            direct_records, indirect_records, supabase_experts = await asyncio.gather(
+                # Step 1: Direct expertise relationships in Neo4j
+                self.neo4j.run_query("""
+                    MATCH (p:Person)-[r:HAS_EXPERTISE]->(t:Topic)
+                    WHERE t.name CONTAINS $topic OR t.description CONTAINS $topic
+                    RETURN p.name as name,
+                           p.email_address as email,
+                           r.confidence as confidence,
+                           r.source as source,
+                           t.name as topic_name
+                    ORDER BY r.confidence DESC
+                    LIMIT $max_experts
+                """, {"topic": topic, "max_experts": max_experts}),
+                
+                # Step 3: Indirect expertise through document authorship and mentions
+                self.neo4j.run_query("""
+                    MATCH (p:Person)-[:AUTHORED|MENTIONED_IN]->(d:Document)-[:MENTIONS]->(t:Topic)
+                    WHERE t.name CONTAINS $topic OR t.description CONTAINS $topic
+                    WITH p, t, count(d) as document_count
+                    WHERE document_count >= 2  // At least 2 documents
+                    RETURN p.name as name,
+                           p.email_address as email,
+                           document_count,
+                           t.name as topic_name,
+                           (document_count * 0.1) as confidence  // Heuristic confidence
+                    ORDER BY document_count DESC
+                    LIMIT $max_experts
+                """, {"topic": topic, "max_experts": max_experts}),
+                
+                # Step 4: Supabase knowledge entities
+                self._search_supabase_for_experts(topic, max_experts)
+            )
             
             direct_results = []
-            for record in direct_experts:
+            for record in direct_records:
                 direct_results.append({
                     "name": record["name"],
                     "email": record["email"],
@@ -210,29 +539,12 @@ class RealTimePredictor:
             knowledge_confidence_threshold = 0.8
             high_confidence_direct = [r for r in direct_results if r["confidence"] > knowledge_confidence_threshold]
             if len(high_confidence_direct) >= max_experts:
-                session.close()
                 self.performance_metrics['knowledge_hits'] += 1
                 return high_confidence_direct[:max_experts]
             
-            # Step 3: Look for indirect expertise through document authorship and mentions
-            indirect_experts = session.run("""
-                MATCH (p:Person)-[:AUTHORED|MENTIONED_IN]->(d:Document)-[:MENTIONS]->(t:Topic)
-                WHERE t.name CONTAINS $topic OR t.description CONTAINS $topic
-                WITH p, t, count(d) as document_count
-                WHERE document_count >= 2  // At least 2 documents
-                RETURN p.name as name,
-                       p.email_address as email,
-                       document_count,
-                       t.name as topic_name,
-                       (document_count * 0.1) as confidence  // Heuristic confidence
-                ORDER BY document_count DESC
-                LIMIT $remaining_slots
-            """, {
-                "topic": topic, 
-                "remaining_slots": max_experts - len(high_confidence_direct)
-            })
-            
-            for record in indirect_experts:
+            # Step 3: Fill the remaining slots with indirect expertise
+            remaining_slots = max_experts - len(high_confidence_direct)
+            for record in indirect_records[:remaining_slots]:
                 direct_results.append({
                     "name": record["name"],
                     "email": record["email"],
@@ -243,12 +555,9 @@ class RealTimePredictor:
                     "method": "indirect_expertise"
                 })
             
-            session.close()
-            
-            # Step 4: Also search Supabase for additional context
+            # Step 4: Also use Supabase for additional context
             if len(direct_results) < max_experts:
-                supabase_experts = await self._search_supabase_for_experts(topic, max_experts - len(direct_results))
-                direct_results.extend(supabase_experts)
+                direct_results.extend(supabase_experts[:max_experts - len(direct_results)])
             
             self.performance_metrics['knowledge_hits'] += 1
             return direct_results[:max_experts]
@@ -260,13 +569,13 @@ class RealTimePredictor:
     async def _search_supabase_for_experts(self, topic: str, max_experts: int) -> List[Dict[str, Any]]:
         """Search Supabase knowledge entities for expert information."""
         try:
-            # Search for entities related to the topic
-            result = await self.supabase.client.table('knowledge_entities')\
+            # Search for entities related to the topic (sync client; keep it off the event loop)
+            query = self.supabase.client.table('knowledge_entities')\
                 .select('content, source_metadata, embedding')\
                 .ilike('content', f'%{topic}%')\
                 .eq('entity_type', 'person')\
-                .limit(max_experts)\
-                .execute()
+                .limit(max_experts)
+            result = await asyncio.get_running_loop().run_in_executor(None, query.execute)
             
             experts = []
             for entity in result.data:
@@ -298,47 +607,32 @@ class RealTimePredictor:
             start_time = datetime.now()
             
             # Check if we have the expertise model
-            if 'expertise_recommendation' not in self.models:
+            model = await self._get_model('expertise_recommendation')
+            if model is None:
                 logger.warning("Expertise recommendation model not loaded")
                 return existing_knowledge or []
             
-            model = self.models['expertise_recommendation']
-            
             # Get graph data for prediction
             graph_data = await self._get_prediction_graph_data()
             if not graph_data:
                 return existing_knowledge or []
             
-            # Find topic and person nodes
-            topic_nodes, person_nodes = await self._find_topic_and_person_nodes(topic, graph_data)
-            
-            if not topic_nodes or not person_nodes:
-                logger.warning(f"No suitable nodes found for topic: {topic}")
-                return existing_knowledge or []
-            
-            # Run ML prediction
-            with torch.no_grad():
-                # Get node embeddings
-                x = torch.tensor(graph_data['node_features'], dtype=torch.float)
-                edge_index = torch.tensor(graph_data['edge_index'], dtype=torch.long)
-                
-                # Encode nodes
-                node_embeddings = model.encode(x, edge_index)
-                
-                # Get topic embedding (use first topic node)
-                topic_embedding = node_embeddings[topic_nodes[0]]
-                
-                # Get person embeddings
-                person_embeddings = node_embeddings[person_nodes]
-                person_names = [graph_data['node_names'][idx] for idx in person_nodes]
-                
-                # Predict expertise
-                experts = model.get_top_experts(
-                    topic_embedding, 
-                    person_embeddings, 
-                    person_names, 
-                    k=max_experts
-                )
+            # Results are cached per topic, retrieval mode, model generation and snapshot version
+            cache_key = self.prediction_cache.make_key(
+                'expertise_recommendation',
+                {'topic': topic, 'max_experts': max_experts,
+                 'retrieval': self._expert_retrieval_mode(graph_data)},
+                self.model_generations.get('expertise_recommendation', 0),
+                graph_data.version
+            )
+            experts = self.prediction_cache.get(cache_key)
+            if experts is not None:
+                self.performance_metrics['cache_hits'] += 1
+            else:
+                experts = await self._predict_experts_ml(model, topic, max_experts, graph_data)
+                if experts is None:
+                    return existing_knowledge or []
+                self.prediction_cache.put(cache_key, experts)
             
             # Filter by confidence threshold
             filtered_experts = [
@@ -364,9 +658,9 @@ class RealTimePredictor:
             self.performance_metrics['ml_predictions'] += 1
             self.performance_metrics['total_predictions'] += 1
             
-            # Store prediction for monitoring
+            # Queue prediction for monitoring (flushed in bulk off the request path)
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
-            await self.supabase.store_model_predictions([{
+            self.prediction_log.log([{
                 'model_type': 'expertise_recommendation',
                 'input_data': {'topic': topic, 'max_experts': max_experts},
                 'prediction': result,
@@ -380,41 +674,403 @@ class RealTimePredictor:
             logger.error(f"Failed to predict expertise: {e}")
             return existing_knowledge or []
     
-    async def predict_link(self, source: str, target: str, relationship_type: str) -> Dict:
+    async def predict_expertise_batch(self, topics: List[str], max_experts: int = 5,
+                                      confidence_threshold: float = 0.7,
+                                      workers: Optional[ChunkWorkers] = None) -> List[Optional[List[Dict[str, Any]]]]:
         """
-        Predict link probability, checking knowledge substrate first.
-        Implements knowledge-first approach with ML fallback.
+        Predict experts for many topics with one encode and a chunked topics x persons
+        score matrix. Repeated topics are scored once; results are aligned with topics,
+        with None for topics that could not be scored (no matching node or no persons).
+        Batch jobs pass workers to score in a worker process instead of a thread.
+        Raises if the model or graph is unavailable, so jobs can record the failure.
         """
         try:
             start_time = datetime.now()
             
-            # Step 1: Check if relationship already exists in knowledge graph
-            session = self.neo4j.session()
+            model = await self._get_model('expertise_recommendation')
+            if model is None:
+                raise ValueError("Expertise recommendation model not available")
+            
+            graph_data = await self._get_prediction_graph_data()
+            if not graph_data:
+                raise ValueError("No graph data available for expertise prediction")
+            
+            # Dedupe on the cache key, which normalizes whitespace. Batch scoring is always
+            # exact, so it never shares entries with ANN-shortlisted single-topic results
+            generation = self.model_generations.get('expertise_recommendation', 0)
+            cache_keys = [
+                self.prediction_cache.make_key(
+                    'expertise_recommendation',
+                    {'topic': topic, 'max_experts': max_experts, 'retrieval': 'exact'},
+                    generation,
+                    graph_data.version
+                )
+                for topic in topics
+            ]
+            unique_topics = {}
+            for cache_key, topic in zip(cache_keys, topics):
+                unique_topics.setdefault(cache_key, topic)
+            
+            experts_by_key = {}
+            pending = {}
+            for cache_key, topic in unique_topics.items():
+                experts = self.prediction_cache.get(cache_key)
+                if experts is not None:
+                    self.performance_metrics['cache_hits'] += 1
+                    experts_by_key[cache_key] = experts
+                else:
+                    pending[cache_key] = topic
+            
+            if pending:
+                scored = await self._predict_experts_batch_ml(
+                    model, list(pending.values()), max_experts, graph_data, workers=workers
+                )
+                for cache_key, topic in pending.items():
+                    experts = scored.get(topic)
+                    if experts is not None:
+                        self.prediction_cache.put(cache_key, experts)
+                        experts_by_key[cache_key] = experts
+            
+            # Filter by confidence threshold; experts are already sorted by confidence
+            results_by_key = {
+                cache_key: [
+                    {**expert, 'source': 'ml_prediction'}
+                    for expert in experts
+                    if expert['confidence'] >= confidence_threshold
+                ][:max_experts]
+                for cache_key, experts in experts_by_key.items()
+            }
+            
+            # Update performance metrics
+            self.performance_metrics['ml_predictions'] += len(topics)
+            self.performance_metrics['total_predictions'] += len(topics)
+            
+            # Queue one monitoring record per distinct topic, with the batch time amortized
+            processing_time = (datetime.now() - start_time).total_seconds() * 1000 / len(unique_topics)
+            self.prediction_log.log([
+                {
+                    'model_type': 'expertise_recommendation',
+                    'input_data': {'topic': topic, 'max_experts': max_experts, 'batched': True},
+                    'prediction': results_by_key[cache_key],
+                    'confidence': np.mean([e['confidence'] for e in results_by_key[cache_key]])
+                    if results_by_key[cache_key] else 0,
+                    'processing_time_ms': processing_time
+                }
+                for cache_key, topic in unique_topics.items()
+                if cache_key in results_by_key
+            ])
+            
+            return [
+                list(results_by_key[cache_key]) if cache_key in results_by_key else None
+                for cache_key in cache_keys
+            ]
+        
+        except Exception as e:
+            logger.error(f"Failed to predict expertise batch: {e}")
+            raise
+    
+    async def get_classification_inputs(self, node_names: List[str]) -> Dict[str, Any]:
+        """
+        Inputs for classifying many nodes: the snapshot, its full-graph classification logits
+        (computed once per model and snapshot, then cached), the model generation they came
+        from, and each distinct name resolved to a node index (None if not found).
+        Loads the serving model if none is resident. Raises if the model or graph is unavailable.
+        """
+        model = await self._get_model('node_classification')
+        if model is None and await self._load_model_by_type('node_classification'):
+            model = self.models.get('node_classification')
+        if model is None:
+            raise ValueError("Node classification model not available")
+        
+        graph_data = await self._get_prediction_graph_data()
+        if not graph_data:
+            raise ValueError("No graph data available for node classification")
+        
+        logits = await self._get_node_embeddings('node_classification', graph_data)
+        
+        # Resolve every requested node once
+        node_indices = {}
+        for node_name in node_names:
+            if node_name not in node_indices:
+                node_indices[node_name] = await self._find_node_by_name(node_name, graph_data)
+        
+        return {
+            'snapshot': graph_data,
+            'logits': logits,
+            'generation': self.model_generations.get('node_classification', 0),
+            'node_indices': node_indices
+        }
+    
+    async def _predict_experts_batch_ml(self, model: ExpertiseRecommendationGNN, topics: List[str],
+                                        max_experts: int, graph_data: GraphSnapshot,
+                                        workers: Optional[ChunkWorkers] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Score experts for many topics against every person. Topics without a matching
+        node are left out of the result, as _predict_experts_ml returns None for them.
+        """
+        topic_nodes = {}
+        for topic in topics:
+            nodes = graph_data.name_index.contains(topic)
+            if len(nodes) > 0:
+                topic_nodes[topic] = nodes
+            else:
+                logger.warning(f"No suitable nodes found for topic: {topic}")
+        
+        if not topic_nodes or len(graph_data.person_indices) == 0:
+            return {}
+        
+        # Cached full-graph embeddings for this model and snapshot
+        node_embeddings = await self._get_node_embeddings('expertise_recommendation', graph_data)
+        expert_state = self._get_expert_state(graph_data)
+        config = self.serving_config.get('expertise_batch', {})
+        
+        # Same topic embedding as the single-topic path: the first matching node
+        names = list(topic_nodes)
+        topic_rows = [int(topic_nodes[name][0]) for name in names]
+        
+        def prepare():
+            if expert_state is not None:
+                person_nodes = expert_state['person_nodes']
+                expert_cache = expert_state['expert_cache']
+            else:
+                person_nodes = graph_data.person_indices
+                expert_cache = model.build_expert_cache(node_embeddings[torch.from_numpy(person_nodes)])
+            
+            # A topic's own nodes are never recommended as its experts
+            exclude = []
+            for name in names:
+                nodes = topic_nodes[name]
+                positions = np.minimum(np.searchsorted(person_nodes, nodes), len(person_nodes) - 1)
+                exclude.append(torch.from_numpy(positions[person_nodes[positions] == nodes]))
+            
+            # Bound the (chunk, persons) score matrix held at once
+            max_rows = config.get('max_score_matrix_mb', 64) * 2 ** 20 // (4 * len(person_nodes))
+            chunk_size = max(1, min(config.get('chunk_size', 256), max_rows))
+            
+            return person_nodes, expert_cache, exclude, chunk_size
+            
+        def name_experts(person_nodes, top_scores, top_indices):
+            experts = {}
+            for name, scores, indices in zip(names, top_scores.tolist(), top_indices.tolist()):
+                experts[name] = [
+                    {
+                        'name': graph_data.node_names[int(person_nodes[idx])],
+                        'confidence': value,
+                        'index': idx
+                    }
+                    for value, idx in zip(scores, indices)
+                    if value != float('-inf')
+                ]
+            return experts
+        
+        loop = asyncio.get_running_loop()
+        if workers is not None:
+            person_nodes, expert_cache, exclude, chunk_size = await loop.run_in_executor(None, prepare)
             try:
-                existing_rel = session.run(f"""
-                    MATCH (s {{name: $source}})-[r:{relationship_type}]->(t {{name: $target}})
-                    RETURN r.confidence as confidence, r.source as source
-                """, {"source": source, "target": target})
+                top_scores, top_indices = await workers.top_experts(
+                    self.get_model_spec('expertise_recommendation'), graph_data.version, node_embeddings,
+                    expert_cache, topic_rows, exclude, max_experts, chunk_size
+                )
+                return name_experts(person_nodes, top_scores, top_indices)
+            except Exception as e:
+                logger.error(f"Batch worker failed to score experts for {len(names)} topics, scoring in-process: {e}")
+        
+        def score():
+            person_nodes, expert_cache, exclude, chunk_size = prepare()
+            top_scores, top_indices = model.get_top_experts_batch(
+                node_embeddings[torch.tensor(topic_rows)], expert_cache,
+                k=max_experts, chunk_size=chunk_size, exclude=exclude
+            )
+            return name_experts(person_nodes, top_scores, top_indices)
+        
+        return await loop.run_in_executor(None, score)
+    
+    async def _predict_experts_ml(self, model: ExpertiseRecommendationGNN, topic: str,
+                                  max_experts: int, graph_data: GraphSnapshot) -> Optional[List[Dict[str, Any]]]:
+        """Score experts for a topic with the ML model. Returns None if the topic or persons are missing."""
+        # Find topic and person nodes
+        topic_nodes, person_nodes = await self._find_topic_and_person_nodes(topic, graph_data)
+        
+        if len(topic_nodes) == 0 or len(person_nodes) == 0:
+            logger.warning(f"No suitable nodes found for topic: {topic}")
+            return None
+        
+        # Cached full-graph embeddings for this model and snapshot
+        node_embeddings = await self._get_node_embeddings('expertise_recommendation', graph_data)
+        
+        # Get topic embedding (use first topic node)
+        topic_embedding = node_embeddings[topic_nodes[0]]
+        
+        # Narrow the person set with the ANN index; exact scoring below reranks it
+        expert_state = self._get_expert_state(graph_data)
+        candidates = self._expert_candidates(topic_embedding, topic_nodes, person_nodes,
+                                             max_experts, expert_state)
+        
+        # Run ML prediction
+        if expert_state is not None:
+            experts = await self._score_expert_candidates(
+                model, topic_embedding, candidates, len(candidates) < len(person_nodes),
+                expert_state, graph_data, max_experts
+            )
+        else:
+            person_names = [graph_data.node_names[idx] for idx in person_nodes.tolist()]
+            
+            with torch.no_grad():
+                # Get person embeddings
+                person_embeddings = node_embeddings[torch.from_numpy(person_nodes)]
                 
-                record = existing_rel.single()
-                if record:
-                    self.performance_metrics['knowledge_hits'] += 1
-                    return {
-                        "source_entity": source,
-                        "target_entity": target,
-                        "relationship_type": relationship_type,
-                        "probability": record["confidence"],
-                        "confidence": record["confidence"],
-                        "source": "knowledge_substrate",
-                        "existing_relationship": True
-                    }
+                # Predict expertise
+                experts = model.get_top_experts(
+                    topic_embedding, 
+                    person_embeddings, 
+                    person_names, 
+                    k=max_experts
+                )
+        
+        return experts
+    
+    async def _score_expert_candidates(self, model: ExpertiseRecommendationGNN,
+                                      topic_embedding: torch.Tensor, candidates: np.ndarray,
+                                      is_shortlist: bool, expert_state: Dict[str, Any],
+                                      graph_data: GraphSnapshot, max_experts: int) -> List[Dict[str, Any]]:
+        """Score candidates from the cached person terms through the expertise batcher."""
+        positions = torch.from_numpy(np.searchsorted(expert_state['person_nodes'], candidates))
+        
+        if is_shortlist:
+            # Score only the shortlisted rows
+            expert_cache = {key: value[positions] for key, value in expert_state['expert_cache'].items()}
+            scores = await self.expertise_batcher.submit((model, expert_cache, topic_embedding))
+        else:
+            # Shared cache: concurrent topics are scored with one GEMM, then narrowed
+            scores = await self.expertise_batcher.submit(
+                (model, expert_state['expert_cache'], topic_embedding)
+            )
+            scores = scores[positions]
+        
+        top = torch.topk(scores, k=min(max_experts, len(scores)))
+        return [
+            {
+                'name': graph_data.node_names[int(candidates[idx])],
+                'confidence': score,
+                'index': idx
+            }
+            for score, idx in zip(top.values.tolist(), top.indices.tolist())
+        ]
+    
+    def _score_expertise_batch(self, items: List[Tuple]) -> List[torch.Tensor]:
+        """Batch worker: score every topic sharing a person cache with one GEMM."""
+        results = [None] * len(items)
+        groups = {}
+        for position, (model, expert_cache, _) in enumerate(items):
+            groups.setdefault((id(model), id(expert_cache)), []).append(position)
+        
+        with torch.no_grad():
+            for positions in groups.values():
+                model, expert_cache, _ = items[positions[0]]
+                topics = torch.stack([items[position][2] for position in positions])
+                scores = model.score_topics(topics, expert_cache)
+                for row, position in enumerate(positions):
+                    results[position] = scores[row]
+        
+        return results
+    
+    def _decode_link_batch(self, items: List[Tuple]) -> List[float]:
+        """Batch worker: decode every pair sharing a model and embeddings in one call."""
+        results = [None] * len(items)
+        groups = {}
+        for position, (model, node_embeddings, _, _) in enumerate(items):
+            groups.setdefault((id(model), id(node_embeddings)), []).append(position)
+        
+        with torch.no_grad():
+            for positions in groups.values():
+                model, node_embeddings, _, _ = items[positions[0]]
+                edge_label_index = torch.tensor(
+                    [[items[position][2] for position in positions],
+                     [items[position][3] for position in positions]],
+                    dtype=torch.long
+                )
+                probabilities = torch.sigmoid(model.decode(node_embeddings, edge_label_index)).reshape(-1)
+                for row, position in enumerate(positions):
+                    results[position] = float(probabilities[row])
+        
+        return results
+    
+    def _expert_candidates(self, topic_embedding: torch.Tensor, topic_nodes: np.ndarray,
+                           person_nodes: np.ndarray, max_experts: int,
+                           expert_state: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Shortlist person nodes for exact scoring; falls back to all persons."""
+        index = expert_state['index'] if expert_state else None
+        if index is None:
+            return person_nodes
+        
+        config = self.expert_retrieval_config
+        num_candidates = max(max_experts * config.get('candidate_multiplier', 10),
+                             config.get('min_candidates', 100))
+        if num_candidates >= len(person_nodes):
+            return person_nodes
+        
+        # Over-fetch by the topic matches, which are excluded from the person set
+        candidates, _ = index.search(
+            topic_embedding.numpy(),
+            k=num_candidates + len(topic_nodes),
+            nprobe=config.get('nprobe', 8)
+        )
+        candidates = candidates[~np.isin(candidates, topic_nodes)][:num_candidates]
+        
+        return candidates if len(candidates) > 0 else person_nodes
+    
+    async def predict_link(self, source: str, target: str, relationship_type: str) -> Dict:
+        """
+        Predict link probability, checking knowledge substrate first.
+        Implements knowledge-first approach with ML fallback.
+        """
+        try:
+            start_time = datetime.now()
             
-            finally:
-                session.close()
+            # Results are cached per inputs, model generation and snapshot version
+            snapshot = self.snapshot_manager.current
+            cache_key = None
+            if snapshot is not None:
+                cache_key = self.prediction_cache.make_key(
+                    'link_prediction',
+                    {'source': source, 'target': target, 'relationship_type': relationship_type},
+                    self.model_generations.get('link_prediction', 0),
+                    snapshot.version
+                )
+                cached = self.prediction_cache.get(cache_key)
+                if cached is not None:
+                    self.performance_metrics['cache_hits'] += 1
+                    self.performance_metrics['total_predictions'] += 1
+                    return cached
+            
+            # Step 1: Check if relationship already exists in knowledge graph (quoted, name-anchored query)
+            pair = (source, target, relationship_type)
+            existing = await self._find_existing_links([pair], snapshot)
+            if pair in existing:
+                self.performance_metrics['knowledge_hits'] += 1
+                result = {
+                    "source_entity": source,
+                    "target_entity": target,
+                    "relationship_type": relationship_type,
+                    "probability": existing[pair],
+                    "confidence": existing[pair],
+                    "source": "knowledge_substrate",
+                    "existing_relationship": True
+                }
+                if cache_key:
+                    self.prediction_cache.put(cache_key, result)
+                return result
             
             # Step 2: Use ML model to predict new relationship
-            if 'link_prediction' not in self.models:
+            if await self._get_model('link_prediction') is None:
                 logger.warning("Link prediction model not loaded")
+                prediction_score = None
+            else:
+                # Get graph context and make prediction
+                prediction_score = await self._predict_link_ml(source, target, relationship_type)
+            
+            # Fallbacks are not cached, so a transient failure is retried on the next request
+            if prediction_score is None:
                 return {
                     "source_entity": source,
                     "target_entity": target,
@@ -425,9 +1081,6 @@ class RealTimePredictor:
                     "existing_relationship": False
                 }
             
-            # Get graph context and make prediction
-            prediction_score = await self._predict_link_ml(source, target, relationship_type)
-            
             result = {
                 "source_entity": source,
                 "target_entity": target,
@@ -442,9 +1095,9 @@ class RealTimePredictor:
             self.performance_metrics['ml_predictions'] += 1
             self.performance_metrics['total_predictions'] += 1
             
-            # Store prediction for monitoring
+            # Queue prediction for monitoring (flushed in bulk off the request path)
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
-            await self.supabase.store_model_predictions([{
+            self.prediction_log.log([{
                 'model_type': 'link_prediction',
                 'input_data': {'source': source, 'target': target, 'relationship_type': relationship_type},
                 'prediction': result,
@@ -452,6 +1105,9 @@ class RealTimePredictor:
                 'processing_time_ms': processing_time
             }])
             
+            if cache_key:
+                self.prediction_cache.put(cache_key, result)
+            
             return result
             
         except Exception as e:
@@ -467,13 +1123,197 @@ class RealTimePredictor:
                 "error": str(e)
             }
     
-    async def _predict_link_ml(self, source: str, target: str, relationship_type: str) -> float:
-        """Use ML model to predict link probability."""
+    async def predict_links_batch(self, pairs: List[Tuple[str, str, str]],
+                                  workers: Optional[ChunkWorkers] = None) -> List[Dict]:
+        """
+        Predict many (source, target, relationship_type) links in one pass: one bulk
+        existence check, one name resolution per distinct name, one graph encode and
+        chunked decodes. Results are aligned with pairs and match predict_link.
+        Batch jobs pass workers to decode in a worker process instead of a thread.
+        """
+        start_time = datetime.now()
+        results = [None] * len(pairs)
+        
+        def link_result(pair: Tuple[str, str, str], probability: float, source: str,
+                        existing: bool = False) -> Dict:
+            return {
+                "source_entity": pair[0],
+                "target_entity": pair[1],
+                "relationship_type": pair[2],
+                "probability": probability,
+                "confidence": probability,
+                "source": source,
+                "existing_relationship": existing
+            }
+        
+        try:
+            graph_data = await self._get_prediction_graph_data()
+            
+            # Cached results first; repeated pairs share one cache key and one prediction
+            pending = {}
+            for position, pair in enumerate(pairs):
+                cache_key = None
+                if graph_data is not None:
+                    cache_key = self.prediction_cache.make_key(
+                        'link_prediction',
+                        {'source': pair[0], 'target': pair[1], 'relationship_type': pair[2]},
+                        self.model_generations.get('link_prediction', 0),
+                        graph_data.version
+                    )
+                    cached = self.prediction_cache.get(cache_key)
+                    if cached is not None:
+                        self.performance_metrics['cache_hits'] += 1
+                        results[position] = dict(cached)
+                        continue
+                pending.setdefault(cache_key or pair, (pair, cache_key, []))[2].append(position)
+            
+            self.performance_metrics['total_predictions'] += len(pairs)
+            if not pending:
+                return results
+            
+            computed = {}
+            
+            # Step 1: Existing relationships in the knowledge graph, checked in bulk
+            existing = await self._find_existing_links([pair for pair, _, _ in pending.values()], graph_data)
+            for key, (pair, _, _) in pending.items():
+                if pair in existing:
+                    self.performance_metrics['knowledge_hits'] += 1
+                    computed[key] = link_result(pair, existing[pair], "knowledge_substrate", existing=True)
+            
+            # Step 2: ML predictions for the rest
+            remaining = {key: pair for key, (pair, _, _) in pending.items() if key not in computed}
+            model = await self._get_model('link_prediction') if remaining else None
+            if remaining and (model is None or graph_data is None):
+                if model is None:
+                    logger.warning("Link prediction model not loaded")
+                for key, pair in remaining.items():
+                    computed[key] = link_result(pair, 0.5, "default_fallback")
+                remaining = {}
+            
+            if remaining:
+                # Resolve each distinct name once
+                names = {name for pair in remaining.values() for name in pair[:2]}
+                node_indices = {name: graph_data.name_index.first_containing(name) for name in names}
+                
+                scored = []
+                for key, pair in remaining.items():
+                    source_idx, target_idx = node_indices[pair[0]], node_indices[pair[1]]
+                    if source_idx is None or target_idx is None:
+                        computed[key] = link_result(pair, 0.3, "ml_prediction")  # Nodes not found
+                    else:
+                        scored.append((key, source_idx, target_idx))
+                
+                if scored:
+                    # One encode per snapshot; every pair decodes from the cached embeddings
+                    node_embeddings = await self._get_node_embeddings('link_prediction', graph_data)
+                    edge_label_index = torch.tensor(
+                        [[source_idx for _, source_idx, _ in scored], [target_idx for _, _, target_idx in scored]],
+                        dtype=torch.long
+                    )
+                    probabilities = None
+                    if workers is not None:
+                        try:
+                            probabilities = await workers.decode_links(
+                                self.get_model_spec('link_prediction'), graph_data.version, node_embeddings,
+                                edge_label_index, self.serving_config.get('link_batch', {}).get('decode_chunk_size', 65536)
+                            )
+                        except Exception as e:
+                            logger.error(f"Batch worker failed to decode {len(scored)} links, decoding in-process: {e}")
+                    if probabilities is None:
+                        probabilities = await asyncio.get_running_loop().run_in_executor(
+                            None, self._decode_links, model, node_embeddings, edge_label_index
+                        )
+                    for (key, _, _), probability in zip(scored, probabilities.tolist()):
+                        computed[key] = link_result(remaining[key], probability, "ml_prediction")
+                
+                self.performance_metrics['ml_predictions'] += len(remaining)
+            
+            # Queue ML predictions for monitoring in one bulk write, with the pass time amortized
+            ml_results = [result for result in computed.values() if result['source'] == 'ml_prediction']
+            processing_time = (datetime.now() - start_time).total_seconds() * 1000 / max(len(pending), 1)
+            self.prediction_log.log([
+                {
+                    'model_type': 'link_prediction',
+                    'input_data': {
+                        'source': result['source_entity'],
+                        'target': result['target_entity'],
+                        'relationship_type': result['relationship_type'],
+                        'batched': True
+                    },
+                    'prediction': result,
+                    'confidence': result['confidence'],
+                    'processing_time_ms': processing_time
+                }
+                for result in ml_results
+            ])
+            
+            for key, (_, cache_key, positions) in pending.items():
+                result = computed[key]
+                if cache_key and result['source'] != 'default_fallback':
+                    self.prediction_cache.put(cache_key, result)
+                for position in positions:
+                    results[position] = dict(result)
+            
+            return results
+        
+        except Exception as e:
+            logger.error(f"Failed to predict link batch: {e}")
+            return [
+                results[position] or {**link_result(pair, 0.0, "error"), "error": str(e)}
+                for position, pair in enumerate(pairs)
+            ]
+    
+    async def _find_existing_links(self, pairs: List[Tuple[str, str, str]],
+                                   graph_data: Optional[GraphSnapshot]) -> Dict[Tuple[str, str, str], Any]:
+        """Hit map of relationships that already exist, via the bulk UNWIND resolver."""
+        labels = {
+            name: self._endpoint_label(name, graph_data)
+            for name in {name for pair in pairs for name in pair[:2]}
+        }
+        
+        requests = [
+            {
+                'source': source,
+                'target': target,
+                'relationship_type': relationship_type,
+                'source_label': labels.get(source),
+                'target_label': labels.get(target)
+            }
+            for source, target, relationship_type in pairs
+        ]
+        chunk_size = self.serving_config.get('link_batch', {}).get('existence_chunk_size', 2000)
+        return await self.neo4j.find_existing_relationships(requests, chunk_size=chunk_size)
+            
+    @staticmethod
+    def _endpoint_label(name: str, graph_data: Optional[GraphSnapshot]) -> Union[str, Tuple[str, ...], None]:
+        """
+        Label to anchor a name lookup on, so it uses a name index: the name-indexed label shared
+        by every snapshot node with this exact name; every name-indexed label for a name the
+        snapshot does not know (e.g. created since); None (unanchored) for names the snapshot
+        only has on other labels.
+        """
+        matches = graph_data.name_index.exact(name) if graph_data is not None else []
+        if len(matches) == 0:
+            return NAME_INDEXED_LABELS
+        
+        for label in NAME_INDEXED_LABELS:
+            if all(label in graph_data.node_labels[idx] for idx in matches.tolist()):
+                return label
+        return None
+    
+    def _decode_links(self, model: torch.nn.Module, node_embeddings: torch.Tensor,
+                      edge_label_index: torch.Tensor) -> torch.Tensor:
+        """Link probabilities for many pairs, decoded in fixed-size chunks. Blocking."""
+        chunk_size = self.serving_config.get('link_batch', {}).get('decode_chunk_size', 65536)
+        return decode_link_probabilities(model, node_embeddings, edge_label_index, chunk_size)
+    
+    async def _predict_link_ml(self, source: str, target: str, relationship_type: str) -> Optional[float]:
+        """Use ML model to predict link probability. Returns None if no prediction could be made."""
         try:
             # Get graph data
             graph_data = await self._get_prediction_graph_data()
             if not graph_data:
-                return 0.5  # Default fallback
+                return None
             
             # Find source and target nodes
             source_idx = await self._find_node_by_name(source, graph_data)
@@ -483,108 +1323,107 @@ class RealTimePredictor:
                 logger.warning(f"Nodes not found for ML prediction: {source} -> {target}")
                 return 0.3  # Low confidence when nodes not found
             
-            model = self.models['link_prediction']
-            
-            # Run ML prediction
-            with torch.no_grad():
-                x = torch.tensor(graph_data['node_features'], dtype=torch.float)
-                edge_index = torch.tensor(graph_data['edge_index'], dtype=torch.long)
-                edge_label_index = torch.tensor([[source_idx], [target_idx]], dtype=torch.long)
-                
-                logits = model(x, edge_index, edge_label_index)
-                probability = torch.sigmoid(logits).item()
-            
-            return float(probability)
-            
-        except Exception as e:
-            logger.error(f"ML link prediction failed: {e}")
-            return 0.75  # Placeholder as mentioned in the requirements
-    
-    async def _get_prediction_graph_data(self) -> Optional[Dict[str, Any]]:
-        """Get graph data for ML prediction."""
-        try:
-            # Export current graph state from Neo4j
-            graph_data = self.neo4j.export_graph_data("knowledge_graph")
-            
-            if not graph_data or graph_data['nodes'].empty:
-                logger.warning("No graph data available for prediction")
+            model = await self._get_model('link_prediction')
+            if model is None:
                 return None
+            mode = self.link_inference_config.get('mode', 'auto')
             
-            # Convert to format suitable for PyTorch
-            nodes_df = graph_data['nodes']
-            edges_df = graph_data['edges']
-            
-            # Extract node features (embeddings)
-            node_features = np.stack(nodes_df['embedding'].values)
+            # auto: use cached embeddings when present, otherwise encode only the k-hop subgraph
+            if mode != 'full':
+                node_embeddings = None
+                if mode == 'auto':
+                    node_embeddings = self.embedding_cache.get(
+                        'link_prediction', self.model_generations.get('link_prediction', 0), graph_data
+                    )
+                if node_embeddings is None:
+                    return await asyncio.get_running_loop().run_in_executor(
+                        None, self._predict_link_subgraph, model, graph_data, source_idx, target_idx
+                    )
             
-            # Create node ID mapping
-            node_ids = nodes_df['nodeId'].values
-            id_to_idx = {node_id: idx for idx, node_id in enumerate(node_ids)}
+            node_embeddings = await self._get_node_embeddings('link_prediction', graph_data)
             
-            # Create edge index
-            edge_sources = []
-            edge_targets = []
-            
-            for _, edge in edges_df.iterrows():
-                src_id = edge['sourceNodeId']
-                tgt_id = edge['targetNodeId']
-                
-                if src_id in id_to_idx and tgt_id in id_to_idx:
-                    edge_sources.append(id_to_idx[src_id])
-                    edge_targets.append(id_to_idx[tgt_id])
-            
-            edge_index = [edge_sources, edge_targets]
-            
-            # Extract node names for lookup
-            node_names = {}
-            for idx, node_id in enumerate(node_ids):
-                # Extract name from node (simplified)
-                node_names[idx] = str(node_id)
-            
-            return {
-                'node_features': node_features,
-                'edge_index': edge_index,
-                'node_names': node_names,
-                'id_to_idx': id_to_idx
-            }
+            # Decode the pair from cached embedding rows, batched with concurrent requests
+            return await self.link_batcher.submit((model, node_embeddings, source_idx, target_idx))
             
         except Exception as e:
-            logger.error(f"Failed to get prediction graph data: {e}")
+            logger.error(f"ML link prediction failed: {e}")
             return None
     
-    async def _find_topic_and_person_nodes(self, topic: str, graph_data: Dict) -> Tuple[List[int], List[int]]:
+    def _predict_link_subgraph(self, model: torch.nn.Module, snapshot: GraphSnapshot,
+                               source_idx: int, target_idx: int) -> float:
+        """Score one pair by encoding only its k-hop neighbourhood. Blocking."""
+        subset, edge_index = snapshot.k_hop_subgraph([source_idx, target_idx], self._receptive_hops(model))
+        positions = np.searchsorted(subset, [source_idx, target_idx])
+        
+        with torch.no_grad():
+            node_embeddings = self.serving_backends['link_prediction'](
+                snapshot.x[torch.from_numpy(subset)], torch.from_numpy(edge_index)
+            )
+            edge_label_index = torch.from_numpy(positions.astype(np.int64)).reshape(2, 1)
+            probability = torch.sigmoid(model.decode(node_embeddings, edge_label_index)).reshape(-1)
+        
+        return float(probability[0])
+    
+    @staticmethod
+    def _receptive_hops(model: torch.nn.Module) -> int:
+        """Hops needed for subgraph outputs to match full-graph outputs."""
+        num_hops = len(model.convs)
+        # GCN normalizes by the in-degree of each source, so the outermost
+        # nodes need their own incoming edges as well
+        if getattr(model, 'gnn_type', None) == 'gcn':
+            num_hops += 1
+        return num_hops
+    
+    async def _get_prediction_graph_data(self) -> Optional[GraphSnapshot]:
+        """Get the current graph snapshot for ML prediction."""
+        snapshot = self.snapshot_manager.current
+        if snapshot is None:
+            logger.warning("No graph snapshot available for prediction")
+        return snapshot
+    
+    async def _find_topic_and_person_nodes(self, topic: str, graph_data: GraphSnapshot) -> Tuple[np.ndarray, np.ndarray]:
         """Find topic and person nodes in the graph."""
-        topic_nodes = []
-        person_nodes = []
+        topic_nodes = graph_data.name_index.contains(topic)
         
-        # This is simplified - in practice, you'd use proper node type information
-        for idx, name in graph_data['node_names'].items():
-            name_lower = str(name).lower()
-            if topic.lower() in name_lower:
-                topic_nodes.append(idx)
-            elif 'person' in name_lower or '@' in name_lower:  # Simple heuristic
-                person_nodes.append(idx)
+        # Person candidates are precomputed per snapshot; a topic match is never a person
+        person_nodes = np.setdiff1d(graph_data.person_indices, topic_nodes, assume_unique=True)
         
         return topic_nodes, person_nodes
     
-    async def _find_node_by_name(self, name: str, graph_data: Dict) -> Optional[int]:
+    async def _find_node_by_name(self, name: str, graph_data: GraphSnapshot) -> Optional[int]:
         """Find a node by name in the graph."""
-        name_lower = name.lower()
-        
-        for idx, node_name in graph_data['node_names'].items():
-            if name_lower in str(node_name).lower():
-                return idx
-        
-        return None
+        return graph_data.name_index.first_containing(name)
     
     async def get_available_models(self) -> Dict[str, Any]:
         """Get list of available models."""
         return {
             'loaded_models': list(self.models.keys()),
             'model_metadata': self.model_metadata,
-            'performance_metrics': self.performance_metrics
+            'performance_metrics': self.performance_metrics,
+            'serving_backends': {
+                model_type: {'backend': backend.name, 'parity': backend.parity}
+                for model_type, backend in self.serving_backends.items()
+            },
+            'model_registry': self.registry.get_status(),
+            'graph_snapshot': self.snapshot_manager.get_status(),
+            'embedding_cache': self.embedding_cache.get_status(),
+            'prediction_log': self.prediction_log.get_status(),
+            'prediction_cache': self.prediction_cache.get_status(),
+            'request_batchers': {
+                'link_prediction': self.link_batcher.get_status(),
+                'expertise_recommendation': self.expertise_batcher.get_status()
+            },
+            'expert_index': self._get_expert_index_info()
         }
     
+    def _get_expert_index_info(self) -> Optional[Dict[str, Any]]:
+        """ANN index info for the current snapshot's expert state, if any."""
+        snapshot = self.snapshot_manager.current
+        expert_state = self._get_expert_state(snapshot) if snapshot is not None else None
+        if expert_state is None or expert_state['index'] is None:
+            return None
+        return expert_state['index'].get_info()
+    
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics."""
         return {
@@ -599,28 +1438,176 @@ class RealTimePredictor:
             )
         }
     
-    def clear_cache(self):
-        """Clear prediction cache."""
-        self.prediction_cache.clear()
+    def clear_cache(self, model_type: Optional[str] = None) -> int:
+        """Clear prediction cache, optionally for one model type."""
+        removed = self.prediction_cache.clear(model_type)
         logger.info("Prediction cache cleared")
+        return removed
     
-    async def warmup_models(self):
-        """Warmup models with dummy predictions."""
-        try:
-            logger.info("Warming up models...")
-            
-            # Warmup link prediction
-            if 'link_prediction' in self.models:
-                await self.predict_link("test_entity_1", "test_entity_2")
-            
-            # Warmup expertise prediction
-            if 'expertise_recommendation' in self.models:
-                await self.predict_expertise("test_topic", max_experts=1)
-            
-            logger.info("Model warmup completed")
-            
-        except Exception as e:
-            logger.error(f"Model warmup failed: {e}")
+    async def warmup_models(self, sample_size: int = 32) -> Dict[str, Any]:
+        """
+        Warm the service before it reports ready: build the graph snapshot, precompute
+        embeddings, run representative forward passes and pre-fault memory.
+        Records the time taken by each phase.
+        """
+        self.warmup_status.update({
+            'state': 'running',
+            'phases': {},
+            'errors': {},
+            'started_at': datetime.now().isoformat(),
+            'completed_at': None
+        })
+        logger.info("Warming up models...")
+            
+        loop = asyncio.get_running_loop()
+        phases = [
+            ('graph_snapshot', self._warmup_graph_snapshot),
+            ('embeddings', self._warmup_embeddings),
+            ('forward_passes', lambda: self._warmup_forward_passes(sample_size)),
+            ('memory_prefault', lambda: loop.run_in_executor(None, self._prefault_memory))
+        ]
+            
+        for phase_name, phase in phases:
+            start_time = datetime.now()
+            try:
+                await phase()
+            except Exception as e:
+                self.warmup_status['errors'][phase_name] = str(e)
+                logger.error(f"Warmup phase {phase_name} failed: {e}")
+            
+            elapsed = (datetime.now() - start_time).total_seconds()
+            self.warmup_status['phases'][phase_name] = elapsed
+            logger.info(f"Warmup phase {phase_name} took {elapsed:.2f}s")
+            
+        # Without a snapshot and embeddings the first requests would pay for them; stay unready and retry
+        total = sum(self.warmup_status['phases'].values())
+        failed = [phase for phase in self.REQUIRED_WARMUP_PHASES if phase in self.warmup_status['errors']]
+        if failed:
+            self.warmup_status['state'] = 'degraded'
+            self.snapshot_manager.request_retry()
+            logger.warning(f"Model warmup degraded after {total:.2f}s ({', '.join(failed)} failed); will retry")
+            return self.warmup_status
+        
+        self.warmup_status['state'] = 'completed'
+        self.warmup_status['completed_at'] = datetime.now().isoformat()
+        
+        logger.info(f"Model warmup completed in {total:.2f}s")
+        return self.warmup_status
+    
+    async def _warmup_graph_snapshot(self):
+        """Build the first graph snapshot if none exists yet."""
+        if self.snapshot_manager.current is None:
+            await self.snapshot_manager.refresh()
+        if self.snapshot_manager.current is None:
+            raise RuntimeError(self.snapshot_manager.last_refresh_error or "No graph data available")
+    
+    async def _warmup_embeddings(self):
+        """Load the encoder models and precompute their embeddings on the current snapshot."""
+        snapshot = self.snapshot_manager.current
+        if snapshot is None:
+            raise RuntimeError("No graph snapshot available")
+        
+        # Real-time requests need these first; node classification loads with its first job
+        for model_type in self.ENCODER_MODEL_TYPES:
+            await self._get_model(model_type)
+        await self.refresh_embeddings()
+        missing = [
+            model_type for model_type in self.ENCODER_MODEL_TYPES
+            if model_type in self.models and self.embedding_cache.get(
+                model_type, self.model_generations.get(model_type, 0), snapshot
+            ) is None
+        ]
+        if missing:
+            raise RuntimeError(f"Failed to precompute embeddings for {', '.join(missing)}")
+    
+    async def _warmup_forward_passes(self, sample_size: int):
+        """Run representative model calls without touching the knowledge stores or caches."""
+        snapshot = self.snapshot_manager.current
+        if snapshot is None or snapshot.num_nodes == 0:
+            logger.warning("No graph snapshot available; skipping warmup forward passes")
+            return
+        
+        rng = np.random.default_rng(0)
+        sample_nodes = rng.integers(0, snapshot.num_nodes, size=(2, sample_size)).tolist()
+        
+        # Link prediction: a full batch of decodes through the batcher (also starts its worker)
+        if 'link_prediction' in self.models:
+            model = self.models['link_prediction']
+            mode = self.link_inference_config.get('mode', 'auto')
+            if mode != 'subgraph':
+                node_embeddings = await self._get_node_embeddings('link_prediction', snapshot)
+                await asyncio.gather(*[
+                    self.link_batcher.submit((model, node_embeddings, source_idx, target_idx))
+                    for source_idx, target_idx in zip(*sample_nodes)
+                ])
+            
+            # Subgraph path: builds the snapshot's CSR adjacency and traces small graphs
+            if mode != 'full':
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._predict_link_subgraph, model, snapshot, sample_nodes[0][0], sample_nodes[1][0]
+                )
+        
+        # Expertise: GEMM over the cached person terms plus ANN lookups
+        if 'expertise_recommendation' in self.models:
+            model = self.models['expertise_recommendation']
+            node_embeddings = await self._get_node_embeddings('expertise_recommendation', snapshot)
+            expert_state = self._get_expert_state(snapshot)
+            topic_embeddings = node_embeddings[torch.tensor(sample_nodes[0], dtype=torch.long)]
+            
+            if expert_state is not None and len(expert_state['person_nodes']) > 0:
+                await asyncio.gather(*[
+                    self.expertise_batcher.submit((model, expert_state['expert_cache'], topic_embedding))
+                    for topic_embedding in topic_embeddings
+                ])
+                if expert_state['index'] is not None:
+                    for topic_embedding in topic_embeddings:
+                        expert_state['index'].search(
+                            topic_embedding.numpy(), k=100,
+                            nprobe=self.expert_retrieval_config.get('nprobe', 8)
+                        )
+        
+        # Node classification: one full-graph forward pass, cached as the snapshot's logits
+        if 'node_classification' in self.models:
+            await self._get_node_embeddings('node_classification', snapshot)
+    
+    def _prefault_memory(self):
+        """Touch every page of the snapshot, cached embeddings and model weights. Blocking."""
+        snapshot = self.snapshot_manager.current
+        arrays = []
+        if snapshot is not None:
+            arrays.extend([snapshot.node_features, snapshot.edge_index])
+            if self.link_inference_config.get('mode', 'auto') != 'full':
+                arrays.extend(snapshot.in_csr)
+            
+            expert_state = self._get_expert_state(snapshot)
+            if expert_state is not None:
+                arrays.extend(value.numpy() for value in expert_state['expert_cache'].values())
+                if expert_state['index'] is not None:
+                    arrays.append(expert_state['index'].vectors)
+            
+            for model_type in self.ENCODER_MODEL_TYPES:
+                embeddings = self.embedding_cache.get(
+                    model_type, self.model_generations.get(model_type, 0), snapshot
+                )
+                if embeddings is not None:
+                    arrays.append(embeddings.numpy())
+        
+        for model in self.models.values():
+            arrays.extend(param.detach().numpy() for param in model.parameters())
+        
+        touched = 0
+        for array in arrays:
+            # Reading one element per 4 KiB page is enough to fault it in
+            flat = array.reshape(-1)
+            step = max(4096 // max(flat.itemsize, 1), 1)
+            flat[::step].sum()
+            touched += flat.nbytes
+        
+        logger.info(f"Pre-faulted {touched / (1024 * 1024):.1f} MB")
+    
+    def is_warm(self) -> bool:
+        """Check if warmup has finished and the service can take traffic."""
+        return self.warmup_status['state'] == 'completed'
     
     def __del__(self):
         """Cleanup on deletion."""
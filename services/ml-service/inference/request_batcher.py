@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+class RequestBatcher:
+    """
+    Dynamic micro-batcher for model calls.
+    Collects the requests already queued, up to `batch_size` items or
+    `max_batch_delay` ms, and dispatches as soon as the queue drains. One
+    vectorized call per batch runs off the event loop and its results are fanned
+    back to the awaiting callers; requests arriving meanwhile form the next batch.
+    """
+    
+    def __init__(self, name: str, process_batch: Callable[[List[Any]], List[Any]],
+                 batch_size: int = 32, max_batch_delay: float = 100,
+                 metrics: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.process_batch = process_batch
+        self.batch_size = max(int(batch_size), 1)
+        self.max_batch_delay = max_batch_delay / 1000.0
+        
+        # Prometheus histograms from ModelMonitor, if available
+        self.metrics = metrics
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task = None
+        self.stats = {
+            'requests': 0,
+            'batches': 0,
+            'failed_batches': 0
+        }
+    
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result."""
+        self._ensure_started()
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        self.stats['requests'] += 1
+        
+        return await future
+    
+    def _ensure_started(self):
+        """Start the worker on the running loop on first use."""
+        if self._worker_task is None or self._worker_task.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._worker_task = asyncio.create_task(self._worker())
+            logger.info(
+                f"Request batcher '{self.name}' started "
+                f"(batch_size: {self.batch_size}, max_batch_delay: {self.max_batch_delay * 1000:.0f}ms)"
+            )
+    
+    async def stop(self):
+        """Stop the worker, failing anything still queued."""
+        if self._worker_task is None:
+            return
+        
+        self._worker_task.cancel()
+        try:
+            await self._worker_task
+        except asyncio.CancelledError:
+            pass
+        self._worker_task = None
+        
+        queued = []
+        while self._queue and not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        self._fail(queued)
+        
+        logger.info(f"Request batcher '{self.name}' stopped")
+    
+    async def _worker(self):
+        """Collect batches and process them until cancelled."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                queue_depth = self._queue.qsize() + 1
+                deadline = loop.time() + self.max_batch_delay
+                
+                # A lone request is dispatched at once rather than waiting out the delay
+                while len(batch) < self.batch_size and loop.time() < deadline:
+                    if self._queue.empty():
+                        # Let callers that are already running enqueue first
+                        await asyncio.sleep(0)
+                        if self._queue.empty():
+                            break
+                    batch.append(self._queue.get_nowait())
+                
+                self._observe(queue_depth, len(batch))
+                await self._run_batch(batch)
+            
+            except asyncio.CancelledError:
+                # Callers of the batch being collected or run would otherwise wait forever
+                self._fail(batch)
+                break
+            except Exception as e:
+                logger.error(f"Request batcher '{self.name}' loop failed: {e}")
+    
+    async def _run_batch(self, batch: List[Any]):
+        """Run one vectorized call and resolve each caller's future."""
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+        
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(None, self.process_batch, items)
+            self.stats['batches'] += 1
+            
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+        
+        except Exception as e:
+            self.stats['failed_batches'] += 1
+            logger.error(f"Request batcher '{self.name}' batch failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+    
+    def _fail(self, batch: List[Any]):
+        """Fail the callers of queued or in-flight items when the batcher stops."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError(f"Request batcher '{self.name}' stopped"))
+    
+    def _observe(self, queue_depth: int, batch_size: int):
+        """Record queue depth and batch size for tuning."""
+        if not self.metrics:
+            return
+        try:
+            self.metrics['batch_queue_depth'].labels(batcher=self.name).observe(queue_depth)
+            self.metrics['batch_size'].labels(batcher=self.name).observe(batch_size)
+        except Exception as e:
+            logger.error(f"Failed to record batch metrics: {e}")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get batcher status."""
+        return {
+            'batch_size': self.batch_size,
+            'max_batch_delay_ms': self.max_batch_delay * 1000,
+            'running': self._worker_task is not None and not self._worker_task.done(),
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'average_batch_size': self.stats['requests'] / max(self.stats['batches'], 1),
+            **self.stats
+        }
@@ -0,0 +1,215 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Iterator, NamedTuple, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _to_json(value: Any) -> Any:
+    """JSON fallback for numpy values and timestamps in result dicts."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+class EncodedResults(NamedTuple):
+    """A chunk of results already encoded as NDJSON (e.g. by a batch worker process)."""
+    payload: bytes
+    count: int
+
+class ResultStore:
+    """
+    Append-only NDJSON result files for batch jobs, one per job under `root`.
+    Each chunk of results is appended as it completes, so results never pile up
+    in memory, and pages are streamed back line by line. A sparse index of the
+    byte offset of every `index_interval`-th line lets a page seek to its start
+    instead of re-reading the lines before it. Files older than
+    `retention_days` are deleted by cleanup().
+    """
+    
+    def __init__(self, root: str = "data/batch_results", retention_days: float = 7,
+                 index_interval: int = 1000):
+        self.root = Path(root)
+        self.retention_days = retention_days
+        self.index_interval = max(int(index_interval), 1)
+        
+        # path -> (lines, bytes) of result files appended to by this process
+        self._tails: Dict[Path, Tuple[int, int]] = {}
+        self.stats = {
+            'results_written': 0,
+            'bytes_written': 0,
+            'files_removed': 0
+        }
+        
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def path(self, job_id: str) -> Optional[Path]:
+        """Result file of a job, or None if job_id is not a job id (never a path outside root)."""
+        try:
+            return self.root / f"{uuid.UUID(job_id)}.ndjson"
+        except (ValueError, TypeError):
+            return None
+    
+    def exists(self, job_id: str) -> bool:
+        """Check whether a job has a result file."""
+        path = self.path(job_id)
+        return path is not None and path.exists()
+    
+    async def append(self, job_id: str, results: Union[List[Dict[str, Any]], EncodedResults]) -> int:
+        """Append one chunk of results (dicts, or pre-encoded NDJSON). Returns the number of results written."""
+        count = results.count if isinstance(results, EncodedResults) else len(results)
+        if not count:
+            return 0
+        
+        # Serializing and writing a large chunk would stall the event loop
+        written = await asyncio.get_running_loop().run_in_executor(
+            None, self._write, self.path(job_id), results
+        )
+        
+        self.stats['results_written'] += count
+        self.stats['bytes_written'] += written
+        return count
+    
+    @staticmethod
+    def encode(results: List[Dict[str, Any]]) -> bytes:
+        """Encode results as NDJSON, one line per result."""
+        return ''.join(json.dumps(result, default=_to_json) + '\n' for result in results).encode('utf-8')
+    
+    def _write(self, path: Path, results: Union[List[Dict[str, Any]], EncodedResults]) -> int:
+        """Write results as complete lines in a single append, then index the new lines. Blocking."""
+        payload = results.payload if isinstance(results, EncodedResults) else self.encode(results)
+        with open(path, 'ab') as f:
+            start = f.tell()
+            f.write(payload)
+        
+        tail = self._tails.get(path)
+        if tail is None or tail[1] != start:
+            tail = self._scan_tail(path, start)
+        
+        # Byte offsets of the new lines whose number is a multiple of index_interval
+        ends = np.flatnonzero(np.frombuffer(payload, dtype=np.uint8) == ord('\n')) + 1
+        line_starts = np.concatenate(([0], ends[:-1]))
+        numbers = tail[0] + np.arange(len(ends))
+        indexed = start + line_starts[numbers % self.index_interval == 0]
+        if len(indexed):
+            with open(self._index_path(path), 'ab') as f:
+                f.write(indexed.astype('<i8').tobytes())
+        
+        self._tails[path] = (tail[0] + len(ends), start + len(payload))
+        return len(payload)
+    
+    @staticmethod
+    def _index_path(path: Path) -> Path:
+        """Sparse line offset index kept next to a result file."""
+        return path.with_suffix('.idx')
+    
+    def _read_index(self, path: Path) -> np.ndarray:
+        """Byte offsets of lines 0, index_interval, 2 * index_interval, ... of a result file."""
+        try:
+            return np.fromfile(self._index_path(path), dtype='<i8')
+        except (FileNotFoundError, ValueError):
+            return np.empty(0, dtype='<i8')
+    
+    def _scan_tail(self, path: Path, size: Optional[int] = None) -> Tuple[int, int]:
+        """(lines, bytes) in the first `size` bytes of a result file, reading only past its last indexed line."""
+        index = self._read_index(path)
+        position, lines = (int(index[-1]), (len(index) - 1) * self.index_interval) if len(index) else (0, 0)
+        end = path.stat().st_size if size is None else size
+        
+        with open(path, 'rb') as f:
+            f.seek(position)
+            for line in f:
+                if position >= end:
+                    break
+                position += len(line)
+                lines += 1
+        
+        return lines, position
+    
+    async def count(self, job_id: str) -> int:
+        """Number of results stored for a job."""
+        path = self.path(job_id)
+        if path is None or not path.exists():
+            return 0
+        
+        return (await asyncio.get_running_loop().run_in_executor(None, self._scan_tail, path))[0]
+    
+    def iter_results(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[bytes]:
+        """Stream NDJSON lines [offset, offset + limit) of a job's results without loading the file."""
+        path = self.path(job_id)
+        if path is None or not path.exists():
+            return
+        
+        # Seek to the nearest indexed line at or before offset; skip at most index_interval lines
+        index = self._read_index(path)
+        entry = min(offset // self.index_interval, len(index) - 1)
+        position = int(index[entry]) if entry >= 0 else 0
+        skip = offset - max(entry, 0) * self.index_interval
+        
+        stop = skip + limit if limit is not None else None
+        with open(path, 'rb') as f:
+            f.seek(position)
+            for line in itertools.islice(f, skip, stop):
+                yield line
+    
+    def delete(self, job_id: str) -> bool:
+        """Delete a job's result file."""
+        path = self.path(job_id)
+        if path is None or not path.exists():
+            return False
+        
+        self._remove(path)
+        self.stats['files_removed'] += 1
+        return True
+    
+    def _remove(self, path: Path):
+        """Remove a result file and its index."""
+        self._tails.pop(path, None)
+        path.unlink(missing_ok=True)
+        self._index_path(path).unlink(missing_ok=True)
+    
+    async def cleanup(self, max_age_days: Optional[float] = None, keep: Iterable[str] = ()) -> List[str]:
+        """Delete result files not modified within max_age_days (default: retention_days). Returns job ids removed."""
+        max_age_days = self.retention_days if max_age_days is None else max_age_days
+        cutoff = time.time() - max_age_days * 86400
+        keep = {str(job_id) for job_id in keep}
+        
+        def remove_expired() -> List[str]:
+            removed = []
+            for path in self.root.glob("*.ndjson"):
+                try:
+                    if path.stem in keep or path.stat().st_mtime >= cutoff:
+                        continue
+                    self._remove(path)
+                    removed.append(path.stem)
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to remove batch result file {path}: {e}")
+            return removed
+        
+        removed = await asyncio.get_running_loop().run_in_executor(None, remove_expired)
+        
+        if removed:
+            self.stats['files_removed'] += len(removed)
+            logger.info(f"Removed {len(removed)} expired batch result files")
+        
+        return removed
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get result store status."""
+        return {
+            'root': str(self.root),
+            'retention_days': self.retention_days,
+            **self.stats
+        }
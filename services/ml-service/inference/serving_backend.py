@@ -0,0 +1,211 @@
+import io
+import copy
+import inspect
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+import torch
+
+from models.sparse_adjacency import bind_gcn_normalization
+
+logger = logging.getLogger(__name__)
+
+# Models whose serving entry point is encode(x, edge_index); the rest use forward(x, edge_index)
+ENCODER_MODEL_TYPES = ('link_prediction', 'expertise_recommendation')
+
+class _GraphEntryPoint(torch.nn.Module):
+    """Exposes a model's serving entry point as forward(x, edge_index) for export."""
+    
+    def __init__(self, model: torch.nn.Module, method: str):
+        super().__init__()
+        self.model = model
+        self.method = method
+    
+    def forward(self, x: torch.Tensor, edge_index: torch.Tensor) -> torch.Tensor:
+        return getattr(self.model, self.method)(x, edge_index)
+
+class EagerBackend:
+    """PyTorch eager execution of the model's entry point."""
+    
+    name = 'eager'
+    parity = None
+    
+    def __init__(self, model: torch.nn.Module, method: str):
+        self.module = _GraphEntryPoint(model, method).eval()
+    
+    def __call__(self, x: torch.Tensor, edge_index: torch.Tensor) -> torch.Tensor:
+        with torch.no_grad():
+            return self.module(x, edge_index)
+
+class TorchScriptBackend:
+    """TorchScript module traced from the eager entry point."""
+    
+    name = 'torchscript'
+    parity = None
+    
+    def __init__(self, model: torch.nn.Module, method: str, example_inputs: Tuple[torch.Tensor, torch.Tensor]):
+        with torch.no_grad():
+            traced = torch.jit.trace(_GraphEntryPoint(model, method).eval(), example_inputs, check_trace=False)
+        self.module = torch.jit.freeze(traced.eval())
+    
+    def __call__(self, x: torch.Tensor, edge_index: torch.Tensor) -> torch.Tensor:
+        with torch.no_grad():
+            return self.module(x, edge_index)
+
+class OnnxBackend:
+    """ONNX export of the entry point, served by ONNX Runtime on CPU."""
+    
+    name = 'onnx'
+    parity = None
+    
+    def __init__(self, model: torch.nn.Module, method: str, example_inputs: Tuple[torch.Tensor, torch.Tensor],
+                 num_threads: int = 0, opset_version: int = 17):
+        import onnxruntime as ort
+        
+        buffer = io.BytesIO()
+        export_kwargs = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs['dynamo'] = False
+        
+        with torch.no_grad():
+            torch.onnx.export(
+                _GraphEntryPoint(model, method).eval(),
+                example_inputs,
+                buffer,
+                input_names=['x', 'edge_index'],
+                output_names=['output'],
+                dynamic_axes={'x': {0: 'num_nodes'}, 'edge_index': {1: 'num_edges'}, 'output': {0: 'num_nodes'}},
+                opset_version=opset_version,
+                **export_kwargs
+            )
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            buffer.getvalue(), options, providers=['CPUExecutionProvider']
+        )
+        self.model_bytes = len(buffer.getvalue())
+    
+    def __call__(self, x: torch.Tensor, edge_index: torch.Tensor) -> torch.Tensor:
+        output = self.session.run(None, {
+            'x': x.detach().numpy(),
+            'edge_index': edge_index.detach().numpy()
+        })[0]
+        return torch.from_numpy(output)
+
+class SparseAdjacencyBackend:
+    """
+    Eager execution over a snapshot's precomputed sparse adjacency for GCN/SAGE models.
+    Holds its own copy of the model's modules (sharing its weights) with GCN normalization
+    bound to the snapshot, so callers running the shared model on other graphs (e.g.
+    k-hop subgraphs) are unaffected.
+    """
+    
+    name = 'sparse'
+    parity = None
+    
+    def __init__(self, model: torch.nn.Module, method: str, snapshot):
+        # Copy the modules but share the weights, which stay memory-mapped
+        weights = {id(tensor): tensor for tensor in [*model.parameters(), *model.buffers()]}
+        self.module = _GraphEntryPoint(copy.deepcopy(model, weights), method).eval()
+        bind_gcn_normalization(self.module, snapshot.gcn_adj_t)
+        self.adj_t = snapshot.adj_t
+        self.snapshot_version = snapshot.version
+    
+    def __call__(self, x: torch.Tensor, edge_index: Optional[torch.Tensor] = None) -> torch.Tensor:
+        # The graph is fixed per snapshot; edge_index is accepted for interface parity only
+        with torch.no_grad():
+            return self.module(x, self.adj_t)
+
+def _synthetic_graph(num_nodes: int, num_edges: int, input_dim: int, seed: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Random features and edges for export and parity checks."""
+    generator = torch.Generator().manual_seed(seed)
+    x = torch.randn(num_nodes, input_dim, generator=generator)
+    edge_index = torch.randint(0, num_nodes, (2, num_edges), generator=generator)
+    return x, edge_index
+
+def check_parity(reference, candidate, input_dim: int, atol: float = 1e-4,
+                 rtol: float = 1e-3) -> Tuple[bool, float]:
+    """
+    Compare a compiled backend against eager outputs on two synthetic graphs whose
+    sizes differ from the export example. Returns (passed, max_abs_diff).
+    """
+    max_diff = 0.0
+    for num_nodes, num_edges, seed in ((97, 400, 1), (613, 3000, 2)):
+        x, edge_index = _synthetic_graph(num_nodes, num_edges, input_dim, seed)
+        expected = reference(x, edge_index)
+        actual = candidate(x, edge_index)
+        
+        if not torch.is_tensor(actual) or actual.shape != expected.shape:
+            return False, float('inf')
+        
+        max_diff = max(max_diff, (actual - expected).abs().max().item())
+        if not torch.allclose(actual, expected, atol=atol, rtol=rtol):
+            return False, max_diff
+    
+    return True, max_diff
+
+def build_serving_backend(model: torch.nn.Module, model_type: str,
+                          config: Optional[Dict[str, Any]] = None):
+    """
+    Build the configured serving backend for a model, falling back to eager if
+    compilation fails or the compiled outputs do not match eager outputs.
+    """
+    config = config or {}
+    serving_config = config.get('serving', {}) or {}
+    backend_name = serving_config.get('backend', 'eager')
+    method = 'encode' if model_type in ENCODER_MODEL_TYPES else 'forward'
+    
+    eager = EagerBackend(model, method)
+    if backend_name == 'eager':
+        return eager
+    
+    start_time = datetime.now()
+    input_dim = config.get('input_dim', 128)
+    example_inputs = _synthetic_graph(32, 128, input_dim, seed=0)
+    
+    try:
+        if backend_name == 'torchscript':
+            backend = TorchScriptBackend(model, method, example_inputs)
+        elif backend_name == 'onnx':
+            backend = OnnxBackend(
+                model, method, example_inputs,
+                num_threads=serving_config.get('num_threads', 0),
+                opset_version=serving_config.get('opset_version', 17)
+            )
+        else:
+            logger.warning(f"Unknown serving backend '{backend_name}' for {model_type}; using eager")
+            return eager
+    except ImportError:
+        logger.warning(f"onnxruntime not available; serving {model_type} with eager PyTorch")
+        return eager
+    except Exception as e:
+        logger.error(f"Failed to build {backend_name} backend for {model_type}: {e}")
+        return eager
+    
+    try:
+        passed, max_diff = check_parity(
+            eager, backend, input_dim,
+            atol=serving_config.get('parity_atol', 1e-4),
+            rtol=serving_config.get('parity_rtol', 1e-3)
+        )
+    except Exception as e:
+        passed, max_diff = False, float('inf')
+        logger.error(f"Parity check failed to run for {model_type} {backend_name} backend: {e}")
+    
+    elapsed = (datetime.now() - start_time).total_seconds()
+    if not passed:
+        logger.error(
+            f"{backend_name} backend for {model_type} failed parity check "
+            f"(max abs diff {max_diff:.2e}); using eager"
+        )
+        return eager
+    
+    backend.parity = {'max_abs_diff': max_diff, 'checked_at': datetime.now().isoformat()}
+    logger.info(
+        f"Serving {model_type} with {backend_name} backend "
+        f"(built in {elapsed:.2f}s, max abs diff {max_diff:.2e})"
+    )
+    return backend
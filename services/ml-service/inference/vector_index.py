@@ -0,0 +1,137 @@
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) index for approximate cosine-similarity or maximum inner
+    product search, in pure NumPy. Vectors are L2-normalized and bucketed by a
+    spherical k-means coarse quantizer; a query only scans the `nprobe` closest
+    buckets. For metric='inner_product' vectors are centered (which shifts every
+    score of a query by the same amount) and get an extra coordinate
+    sqrt(M^2 - |v|^2), M the largest norm, so all have norm M and cosine order
+    against a query padded with 0 is inner product order.
+    """
+    
+    METRICS = ('cosine', 'inner_product')
+    
+    def __init__(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None,
+                 num_lists: Optional[int] = None, num_iters: int = 10,
+                 max_training_points: int = 65536, seed: int = 42, metric: str = 'cosine'):
+        start_time = datetime.now()
+        
+        if metric not in self.METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        self.metric = metric
+        
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.max_norm = 1.0
+        self.mean = None
+        if metric == 'inner_product':
+            # Removing the shared direction spreads the vectors over the coarse quantizer's buckets
+            self.mean = vectors.mean(axis=0) if len(vectors) else np.zeros(vectors.shape[1], dtype=np.float32)
+            vectors = vectors - self.mean
+            norms = np.linalg.norm(vectors, axis=1)
+            self.max_norm = float(norms.max()) if len(norms) else 1.0
+            padding = np.sqrt(np.maximum(self.max_norm ** 2 - norms ** 2, 0))[:, None]
+            vectors = np.hstack([vectors, padding.astype(np.float32)])
+        self.vectors = _normalize(vectors)
+        self.ids = np.arange(len(vectors), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        
+        if num_lists is None:
+            num_lists = int(np.sqrt(len(vectors)))
+        self.num_lists = int(np.clip(num_lists, 1, max(len(vectors), 1)))
+        
+        self.centroids = self._train_centroids(num_iters, max_training_points, seed)
+        
+        # Bucket every vector, stored as one permutation plus list offsets
+        assignments = self._assign(self.vectors)
+        self._order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=self.num_lists)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        
+        self.build_seconds = (datetime.now() - start_time).total_seconds()
+        logger.info(
+            f"Built IVF index over {len(self.ids)} vectors with {self.num_lists} lists "
+            f"in {self.build_seconds:.2f}s"
+        )
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def _train_centroids(self, num_iters: int, max_training_points: int, seed: int) -> np.ndarray:
+        """Spherical k-means on a sample of the vectors."""
+        rng = np.random.default_rng(seed)
+        
+        if len(self.vectors) > max_training_points:
+            sample = self.vectors[rng.choice(len(self.vectors), max_training_points, replace=False)]
+        else:
+            sample = self.vectors
+        
+        centroids = sample[rng.choice(len(sample), self.num_lists, replace=False)].copy()
+        
+        for _ in range(num_iters):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            
+            # Keep the previous centroid for empty clusters
+            empty = ~np.any(sums, axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+        
+        return centroids
+    
+    def _assign(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Nearest centroid for each vector, chunked to bound memory."""
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            assignments[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignments
+    
+    def search(self, query: np.ndarray, k: int, nprobe: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k by the index metric. Returns (ids, scores), best first; inner
+        product scores are against the L2-normalized query.
+        """
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        offset = np.float32(0)
+        if self.metric == 'inner_product':
+            offset = np.float32(query @ self.mean)
+            query = np.append(query, np.float32(0))
+        nprobe = int(np.clip(nprobe, 1, self.num_lists))
+        
+        centroid_scores = self.centroids @ query
+        probe_lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        
+        positions = np.concatenate([
+            self._order[self._offsets[lst]:self._offsets[lst + 1]] for lst in probe_lists
+        ])
+        if positions.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        scores = self.vectors[positions] @ query * np.float32(self.max_norm) + offset
+        k = min(k, len(positions))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        return self.ids[positions[top]], scores[top]
+    
+    def get_info(self) -> Dict[str, Any]:
+        """Get index summary."""
+        return {
+            'num_vectors': len(self.ids),
+            'num_lists': self.num_lists,
+            'metric': self.metric,
+            'build_seconds': self.build_seconds
+        }
+
+def _normalize(vectors: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+    """Row-wise L2 normalization."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, eps)).astype(np.float32, copy=False)
@@ -0,0 +1,482 @@
+import asyncio
+import contextlib
+import functools
+import importlib
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import AsyncIterator, Dict, List, Any, Optional, Callable, Tuple
+
+import numpy as np
+import torch
+
+from inference.result_store import EncodedResults, ResultStore
+
+logger = logging.getLogger(__name__)
+
+# Batch row for node classification: (entity_id, requested name, node index or None, snapshot node name)
+ClassificationRow = Tuple[str, str, Optional[int], Optional[str]]
+
+def decode_link_probabilities(model: torch.nn.Module, node_embeddings: torch.Tensor,
+                              edge_label_index: torch.Tensor, chunk_size: int,
+                              on_chunk: Optional[Callable[[int, int], None]] = None) -> torch.Tensor:
+    """Link probabilities for many pairs, decoded in fixed-size chunks. Blocking."""
+    total = edge_label_index.size(1)
+    probabilities = torch.empty(total)
+    
+    with torch.no_grad():
+        for start in range(0, total, chunk_size):
+            chunk = edge_label_index[:, start:start + chunk_size]
+            probabilities[start:start + chunk.size(1)] = torch.sigmoid(
+                model.decode(node_embeddings, chunk)
+            ).reshape(-1)
+            if on_chunk:
+                on_chunk(start + chunk.size(1), total)
+    
+    return probabilities
+
+def build_classification_results(rows: List[ClassificationRow], logits: torch.Tensor,
+                                 on_rows: Optional[Callable[[int, int], None]] = None,
+                                 interval: int = 1000) -> Tuple[List[Dict[str, Any]], int, int]:
+    """Result dicts for a chunk of node classification rows, from cached full-graph logits. Blocking."""
+    found = [row[2] for row in rows if row[2] is not None]
+    with torch.no_grad():
+        probabilities = torch.softmax(logits[torch.tensor(found, dtype=torch.long)], dim=1).numpy() if found else None
+    
+    results = []
+    processed = failed = 0
+    for count, (entity_id, requested_name, node_idx, node_name) in enumerate(rows, 1):
+        if node_idx is None:
+            results.append({
+                'entity_id': entity_id,
+                'node_name': requested_name,
+                'classification': None,
+                'status': 'failed',
+                'error': 'Node not found'
+            })
+            failed += 1
+        else:
+            pred_probs = probabilities[processed]
+            predicted_class = np.argmax(pred_probs)
+            
+            results.append({
+                'entity_id': entity_id,
+                'node_name': node_name,
+                'classification': {
+                    'predicted_class': int(predicted_class),
+                    'confidence': float(pred_probs[predicted_class]),
+                    'class_probabilities': pred_probs.tolist()
+                },
+                'status': 'success'
+            })
+            processed += 1
+        
+        if on_rows and count % interval == 0:
+            on_rows(count, len(rows))
+    
+    return results, processed, failed
+
+# Per-process state of a pool worker: progress queue, attached shared tensors, loaded models
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(progress_queue, torch_threads: int, progress_interval: int):
+    """Pool worker initializer. Few intra-op threads per worker, so throughput scales with workers."""
+    torch.set_num_threads(max(int(torch_threads), 1))
+    _worker_state.update({
+        'progress_queue': progress_queue,
+        'progress_interval': max(int(progress_interval), 1),
+        'shared': {},
+        'unclosed': [],
+        'models': {}
+    })
+    
+    # Import the model code at worker start rather than in the first job's first chunk
+    for module in ('models.link_prediction', 'mlops.model_registry'):
+        importlib.import_module(module)
+
+def _ping() -> bool:
+    """No-op task used to start workers ahead of the first job."""
+    return True
+
+def _report(tag: Optional[Tuple[str, int]], done: int, total: int):
+    """Send (job_id, chunk_id, fraction done) to the parent; best effort."""
+    if tag is None:
+        return
+    try:
+        _worker_state['progress_queue'].put_nowait((tag[0], tag[1], done / max(total, 1)))
+    except Exception:
+        pass
+
+def _close_segments(segments: List[shared_memory.SharedMemory]):
+    """Unmap segments; any still exported to a live tensor are kept and retried on the next attach."""
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            _worker_state['unclosed'].append(segment)
+
+def _attach(handle: Dict[str, Any]) -> Dict[str, torch.Tensor]:
+    """Zero-copy tensors over a published set of shared-memory segments, attached once per worker."""
+    cached = _worker_state['shared'].get(handle['name'])
+    if cached is not None and cached[0] == handle['key']:
+        return cached[2]
+    
+    # Segments whose tensors were still referenced at their last close attempt
+    unclosed, _worker_state['unclosed'] = _worker_state['unclosed'], []
+    _close_segments(unclosed)
+    
+    # A newer model generation or snapshot replaced these; drop the old mapping
+    if cached is not None:
+        del _worker_state['shared'][handle['name']]
+        segments = cached[1]
+        del cached
+        _close_segments(segments)
+    
+    segments = []
+    tensors = {}
+    for tensor_name, (segment_name, shape, dtype) in handle['tensors'].items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        segments.append(segment)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+        tensors[tensor_name] = torch.from_numpy(array)
+    
+    _worker_state['shared'][handle['name']] = (handle['key'], segments, tensors)
+    return tensors
+
+def _worker_model(spec: Dict[str, Any]) -> torch.nn.Module:
+    """A model loaded once per worker and version. Weights are memory-mapped, so workers share the file's pages."""
+    from models.link_prediction import create_model
+    from models.quantization import load_quantized_model, quantized_model_path
+    from mlops.model_registry import load_weights
+    
+    key = (spec['model_path'], spec['quantized'])
+    cached = _worker_state['models'].get(spec['model_type'])
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    model = load_weights(create_model(spec['model_type'], spec['config']), spec['model_path'])
+    if spec['quantized']:
+        model = load_quantized_model(quantized_model_path(spec['model_path']), model)
+    
+    _worker_state['models'][spec['model_type']] = (key, model)
+    return model
+
+def _decode_links_task(tag: Optional[Tuple[str, int]], model_spec: Dict[str, Any], handle: Dict[str, Any],
+                       edge_label_index: np.ndarray, chunk_size: int) -> np.ndarray:
+    """Worker: decode link probabilities against shared node embeddings."""
+    model = _worker_model(model_spec)
+    node_embeddings = _attach(handle)['embeddings']
+    probabilities = decode_link_probabilities(
+        model, node_embeddings, torch.from_numpy(edge_label_index), chunk_size,
+        on_chunk=functools.partial(_report, tag)
+    )
+    return probabilities.numpy()
+
+def _top_experts_task(tag: Optional[Tuple[str, int]], model_spec: Dict[str, Any], handle: Dict[str, Any],
+                      topic_rows: np.ndarray, exclude: List[np.ndarray], k: int,
+                      chunk_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Worker: top k persons per topic against the shared expert cache."""
+    model = _worker_model(model_spec)
+    shared = _attach(handle)
+    expert_cache = {'normalized': shared['normalized'], 'scores': shared['scores']}
+    topic_embeddings = shared['embeddings'][torch.from_numpy(topic_rows)]
+    
+    top_scores, top_indices = model.get_top_experts_batch(
+        topic_embeddings, expert_cache, k=k, chunk_size=chunk_size,
+        exclude=[torch.from_numpy(positions) for positions in exclude]
+    )
+    _report(tag, len(topic_rows), len(topic_rows))
+    return top_scores.numpy(), top_indices.numpy()
+
+def _classify_task(tag: Optional[Tuple[str, int]], handle: Dict[str, Any],
+                   rows: List[ClassificationRow]) -> Tuple[EncodedResults, int, int]:
+    """Worker: classify rows from shared logits and encode them as NDJSON, off the parent's event loop."""
+    results, processed, failed = build_classification_results(
+        rows, _attach(handle)['logits'],
+        on_rows=functools.partial(_report, tag), interval=_worker_state['progress_interval']
+    )
+    return EncodedResults(ResultStore.encode(results), len(results)), processed, failed
+
+@dataclass
+class SharedTensors:
+    """One published version of a named tensor set, and the queued or running tasks holding its handle."""
+    key: Tuple
+    handle: Dict[str, Any]
+    segments: List[shared_memory.SharedMemory]
+    nbytes: int
+    in_flight: int = 0
+    retired: bool = False
+
+def _copy_to_shared_memory(name: str, key: Tuple, tensors: Dict[str, torch.Tensor]) -> SharedTensors:
+    """Copy tensors into new shared-memory segments. Blocking."""
+    segments = []
+    specs = {}
+    nbytes = 0
+    try:
+        for tensor_name, tensor in tensors.items():
+            array = tensor.detach().contiguous().numpy()
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            segments.append(segment)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+            specs[tensor_name] = (segment.name, array.shape, array.dtype.str)
+            nbytes += array.nbytes
+    except Exception:
+        _unlink_segments(segments)
+        raise
+    
+    return SharedTensors(key, {'name': name, 'key': key, 'tensors': specs}, segments, nbytes)
+
+def _unlink_segments(segments: List[shared_memory.SharedMemory]):
+    """Unmap and unlink segments; workers still attached keep their mapping until they drop it."""
+    for segment in segments:
+        try:
+            segment.close()
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+class BatchWorkerPool:
+    """
+    Process pool for CPU-bound batch inference.
+    Workers load each model once with memory-mapped weights and attach to the
+    per-snapshot tensors (embeddings, logits, expert cache) published once into
+    shared memory, so chunks ship only indices. Progress is reported back over an IPC queue and
+    delivered to on_progress on the event loop.
+    The full-graph encode stays in the parent: it runs once per model and snapshot
+    and its output is shared with real-time serving through the embedding cache.
+    """
+    
+    def __init__(self, max_workers: int = 2, torch_threads: int = 1, progress_interval: int = 1000,
+                 on_progress: Optional[Callable[[str, int, float], None]] = None):
+        self.max_workers = max(int(max_workers), 1)
+        self.torch_threads = torch_threads
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+        
+        # Spawned, not forked: the parent runs torch, asyncio and database driver threads
+        self._context = multiprocessing.get_context('spawn')
+        self._progress_queue = self._context.Queue()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        
+        # name -> version of tensors currently published to workers; replaced versions are kept
+        # in _retired until the tasks already holding their handles finish
+        self._shared: Dict[str, SharedTensors] = {}
+        self._retired: List[SharedTensors] = []
+        self._share_locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {
+            'tasks': 0,
+            'failed_tasks': 0,
+            'restarts': 0,
+            'shared_bytes': 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+    
+    def start(self):
+        """Start the worker processes and the progress listener."""
+        if self._executor is not None:
+            return
+        
+        self._loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._executor = self._create_executor()
+        self._listener = threading.Thread(target=self._listen, name='batch-progress', daemon=True)
+        self._listener.start()
+        
+        # Workers are spawned on demand; start them now so the first job does not pay for it
+        for _ in range(self.max_workers):
+            self._executor.submit(_ping)
+        
+        logger.info(f"Batch worker pool started ({self.max_workers} workers, {self.torch_threads} torch threads each)")
+    
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool."""
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue, self.torch_threads, self.progress_interval)
+        )
+    
+    def _listen(self):
+        """Forward worker progress to the event loop until stopped. Runs in its own thread."""
+        while not self._stopping.is_set():
+            try:
+                job_id, chunk_id, fraction = self._progress_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            
+            if self.on_progress and self._loop is not None:
+                self._loop.call_soon_threadsafe(self.on_progress, job_id, chunk_id, fraction)
+    
+    async def stop(self):
+        """Stop the workers and release shared memory."""
+        if self._executor is None:
+            return
+        
+        self._stopping.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        await asyncio.get_running_loop().run_in_executor(None, self._listener.join)
+        self._listener = None
+        
+        for published in [*self._shared.values(), *self._retired]:
+            self._release(published)
+        self._shared.clear()
+        self._retired.clear()
+        self._share_locks.clear()
+        
+        logger.info(f"Batch worker pool stopped ({self.stats['tasks']} tasks run)")
+    
+    def for_chunk(self, job_id: str, chunk_id: int) -> 'ChunkWorkers':
+        """The pool bound to one job chunk, so worker progress is attributed to it."""
+        return ChunkWorkers(self, (job_id, chunk_id))
+    
+    async def share(self, name: str, key: Tuple, tensors: Dict[str, torch.Tensor]) -> SharedTensors:
+        """
+        Publish tensors to workers under name, copying them into shared memory once per key
+        (model generation, snapshot version). The copy runs off the event loop. The previous
+        version is retired and unlinked once the tasks holding its handle have finished.
+        """
+        current = self._shared.get(name)
+        if current is not None and current.key == key:
+            return current
+        
+        # Concurrent chunks of a job share the same version; only the first copies it
+        async with self._share_locks.setdefault(name, asyncio.Lock()):
+            current = self._shared.get(name)
+            if current is not None and current.key == key:
+                return current
+            
+            published = await asyncio.get_running_loop().run_in_executor(
+                None, _copy_to_shared_memory, name, key, tensors
+            )
+            if current is not None:
+                self._retire(current)
+            
+            self._shared[name] = published
+            self.stats['shared_bytes'] += published.nbytes
+            logger.info(f"Shared {name} tensors with batch workers for {key}")
+            return published
+    
+    @contextlib.asynccontextmanager
+    async def _holding(self, name: str, key: Tuple,
+                       tensors: Dict[str, torch.Tensor]) -> AsyncIterator[Dict[str, Any]]:
+        """The published handle for tensors, kept linked until the task using it has finished."""
+        published = await self.share(name, key, tensors)
+        published.in_flight += 1
+        try:
+            yield published.handle
+        finally:
+            published.in_flight -= 1
+            if published.retired and published.in_flight == 0:
+                self._retired.remove(published)
+                self._release(published)
+    
+    def _retire(self, published: SharedTensors):
+        """Replace a published version: unlink it now if no task holds it, else when the last one finishes."""
+        published.retired = True
+        if published.in_flight:
+            self._retired.append(published)
+        else:
+            self._release(published)
+    
+    def _release(self, published: SharedTensors):
+        """Unlink a published version's segments."""
+        self.stats['shared_bytes'] -= published.nbytes
+        _unlink_segments(published.segments)
+    
+    async def _run(self, fn: Callable, *args) -> Any:
+        """Run a task in a worker process."""
+        if self._executor is None:
+            raise RuntimeError("Batch worker pool is not running")
+        
+        executor = self._executor
+        self.stats['tasks'] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(fn, *args))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); replace the pool so later chunks can run.
+            # Every in-flight task sees the break, but only the first replaces the pool.
+            self.stats['failed_tasks'] += 1
+            if self._executor is executor:
+                self.stats['restarts'] += 1
+                logger.error("Batch worker process died; restarting the worker pool")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+            raise
+        except Exception:
+            self.stats['failed_tasks'] += 1
+            raise
+    
+    async def decode_links(self, tag: Optional[Tuple[str, int]], model_spec: Dict[str, Any], snapshot_version: int,
+                           node_embeddings: torch.Tensor, edge_label_index: torch.Tensor,
+                           chunk_size: int) -> torch.Tensor:
+        """Link probabilities decoded in a worker from the shared embeddings."""
+        async with self._holding(
+            model_spec['model_type'], (model_spec['generation'], snapshot_version), {'embeddings': node_embeddings}
+        ) as handle:
+            probabilities = await self._run(
+                _decode_links_task, tag, model_spec, handle, edge_label_index.numpy(), chunk_size
+            )
+        return torch.from_numpy(probabilities)
+    
+    async def top_experts(self, tag: Optional[Tuple[str, int]], model_spec: Dict[str, Any], snapshot_version: int,
+                          node_embeddings: torch.Tensor, expert_cache: Dict[str, torch.Tensor],
+                          topic_rows: List[int], exclude: List[torch.Tensor], k: int,
+                          chunk_size: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Top k (scores, indices) per topic, scored in a worker against the shared expert cache."""
+        async with self._holding(
+            model_spec['model_type'], (model_spec['generation'], snapshot_version),
+            {'embeddings': node_embeddings, 'normalized': expert_cache['normalized'], 'scores': expert_cache['scores']}
+        ) as handle:
+            top_scores, top_indices = await self._run(
+                _top_experts_task, tag, model_spec, handle, np.asarray(topic_rows, dtype=np.int64),
+                [positions.numpy() for positions in exclude], k, chunk_size
+            )
+        return torch.from_numpy(top_scores), torch.from_numpy(top_indices)
+    
+    async def classify(self, tag: Optional[Tuple[str, int]], generation: int, snapshot_version: int,
+                       logits: torch.Tensor, rows: List[ClassificationRow]) -> Tuple[EncodedResults, int, int]:
+        """Classify and NDJSON-encode rows in a worker from the shared logits."""
+        async with self._holding('node_classification', (generation, snapshot_version), {'logits': logits}) as handle:
+            return await self._run(_classify_task, tag, handle, rows)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get worker pool status."""
+        return {
+            'running': self.running,
+            'max_workers': self.max_workers,
+            'torch_threads': self.torch_threads,
+            'shared': {name: list(published.key) for name, published in self._shared.items()},
+            'retired_versions': len(self._retired),
+            **self.stats
+        }
+
+class ChunkWorkers:
+    """A BatchWorkerPool bound to one job chunk; progress from its tasks is reported for that chunk."""
+    
+    def __init__(self, pool: BatchWorkerPool, tag: Tuple[str, int]):
+        self.pool = pool
+        self.tag = tag
+    
+    async def decode_links(self, *args, **kwargs) -> torch.Tensor:
+        return await self.pool.decode_links(self.tag, *args, **kwargs)
+    
+    async def top_experts(self, *args, **kwargs) -> Tuple[torch.Tensor, torch.Tensor]:
+        return await self.pool.top_experts(self.tag, *args, **kwargs)
+    
+    async def classify(self, *args, **kwargs) -> Tuple[EncodedResults, int, int]:
+        return await self.pool.classify(self.tag, *args, **kwargs)
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import torch
 import mlflow.pytorch
@@ -14,6 +15,7 @@ from pathlib import Path
 
 from inference.real_time_predictor import RealTimePredictor
 from inference.batch_predictor import BatchPredictor
+from inference.job_executor import JobQueueFull
 from mlops.model_monitor import ModelMonitor
 from utils.neo4j_client import Neo4jClient
 from utils.supabase_client import SupabaseClient
@@ -56,6 +58,7 @@ monitor = None
 neo4j_client = None
 supabase_client = None
 trainer = None
+warmup_task = None
 
 # Request/Response Models
 class ExpertiseRequest(BaseModel):
@@ -72,6 +75,7 @@ class BatchPredictionRequest(BaseModel):
     prediction_type: str
     entities: List[Dict[str, Any]]
     callback_url: Optional[str] = None
+    priority: int = 0
 
 class TrainingRequest(BaseModel):
     model_types: List[str] = ["link_prediction"]
@@ -85,7 +89,7 @@ class HealthResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize models and services on startup."""
-    global predictor, batch_predictor, monitor, neo4j_client, supabase_client, trainer
+    global predictor, batch_predictor, monitor, neo4j_client, supabase_client, trainer, warmup_task
     
     try:
         logger.info("Starting AthenAI ML Service...")
@@ -104,17 +108,23 @@ async def startup_event():
             logger.warning("Supabase connection failed - some features may be limited")
         
         # Initialize services
-        predictor = RealTimePredictor(neo4j_client, supabase_client)
-        batch_predictor = BatchPredictor(neo4j_client, supabase_client)
         monitor = ModelMonitor(supabase_client)
+        predictor = RealTimePredictor(neo4j_client, supabase_client, monitor=monitor)
+        batch_predictor = BatchPredictor(neo4j_client, supabase_client, real_time_predictor=predictor)
         trainer = MLTrainingOrchestrator()
         
         # Load latest models
         await predictor.load_latest_models()
         
+        # Warm up in the background; /ready reports 503 until this finishes
+        warmup_task = asyncio.create_task(_warmup_predictor())
+        
         # Start monitoring
         await monitor.start_monitoring()
         
+        # Apply the batch result retention policy in the background
+        await batch_predictor.start()
+        
         logger.info("AthenAI ML Service started successfully")
         
     except Exception as e:
@@ -128,8 +138,14 @@ async def shutdown_event():
     
     logger.info("Shutting down AthenAI ML Service...")
     
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
     if monitor:
         await monitor.stop_monitoring()
+    if batch_predictor:
+        await batch_predictor.stop()
+    if predictor:
+        await predictor.stop()
     if neo4j_client:
         neo4j_client.close()
     if trainer:
@@ -153,6 +169,25 @@ async def health_check():
         services=services
     )
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 until warmup has completed (a degraded warmup is retried in the background)."""
+    if not predictor or not predictor.is_warm():
+        degraded = predictor is not None and predictor.warmup_status['state'] == 'degraded'
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "degraded" if degraded else "warming_up",
+                "warmup": predictor.warmup_status if predictor else None
+            }
+        )
+    
+    return {
+        "status": "ready",
+        "warmup": predictor.warmup_status,
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.post("/predict/expertise")
 async def predict_expertise(request: ExpertiseRequest):
     """Predict experts for a given topic using knowledge-first approach."""
@@ -242,27 +277,34 @@ async def predict_link(request: LinkPredictionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/predict/batch")
-async def predict_batch(request: BatchPredictionRequest, background_tasks: BackgroundTasks):
+async def predict_batch(request: BatchPredictionRequest):
     """Submit a batch prediction job."""
     try:
         if not batch_predictor:
             raise HTTPException(status_code=503, detail="Batch predictor service not available")
         
+        # Queued on the batch executor, which starts it when a slot frees up
         job_id = await batch_predictor.submit_job(
             prediction_type=request.prediction_type,
             entities=request.entities,
-            callback_url=request.callback_url
+            callback_url=request.callback_url,
+            priority=request.priority
         )
         
-        # Start background processing
-        background_tasks.add_task(batch_predictor.process_job, job_id)
-        
         return {
             "job_id": job_id,
             "status": "submitted",
-            "estimated_completion": "5-10 minutes"
+            "estimated_start_seconds": batch_predictor.executor.estimate_wait()
         }
         
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -279,6 +321,32 @@ async def get_batch_status(job_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/batch/{job_id}/results")
+async def get_batch_results(job_id: str, offset: int = 0, limit: int = 1000):
+    """Stream a page of a batch job's results as NDJSON (one result per line)."""
+    if not batch_predictor:
+        raise HTTPException(status_code=503, detail="Batch predictor service not available")
+    
+    try:
+        page = await batch_predictor.get_job_results(job_id, offset=offset, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if page is None:
+        raise HTTPException(status_code=404, detail=f"No results for batch job {job_id}")
+    
+    # Pagination metadata travels in headers so the body stays pure NDJSON
+    headers = {
+        "X-Total-Count": str(page['total']),
+        "X-Offset": str(page['offset']),
+        "X-Limit": str(page['limit'])
+    }
+    if page['next_offset'] is not None:
+        headers["X-Next-Offset"] = str(page['next_offset'])
+        headers["Link"] = f"</batch/{job_id}/results?offset={page['next_offset']}&limit={page['limit']}>; rel=\"next\""
+    
+    return StreamingResponse(page['results'], media_type="application/x-ndjson", headers=headers)
+
 @app.get("/model/status")
 async def get_model_status():
     """Get current model status and performance metrics."""
@@ -383,6 +451,77 @@ async def load_model(model_type: str, model_version: Optional[str] = None):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/graph/snapshot")
+async def get_graph_snapshot_status():
+    """Get the status of the in-memory graph snapshot."""
+    try:
+        if not predictor:
+            raise HTTPException(status_code=503, detail="Predictor service not available")
+        
+        return predictor.snapshot_manager.get_status()
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/graph/snapshot/refresh")
+async def refresh_graph_snapshot():
+    """Rebuild the in-memory graph snapshot on demand."""
+    try:
+        if not predictor:
+            raise HTTPException(status_code=503, detail="Predictor service not available")
+        
+        snapshot = await predictor.refresh_graph_snapshot()
+        if snapshot is None:
+            raise HTTPException(status_code=503, detail="Graph snapshot could not be built")
+        
+        return {
+            "status": "refreshed",
+            "snapshot": snapshot.get_info(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/cache")
+async def get_prediction_cache():
+    """Inspect the prediction result cache."""
+    try:
+        if not predictor:
+            raise HTTPException(status_code=503, detail="Predictor service not available")
+        
+        return predictor.prediction_cache.get_status()
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/admin/cache")
+async def flush_prediction_cache(model_type: Optional[str] = None):
+    """Flush the prediction result cache, optionally for one model type."""
+    try:
+        if not predictor:
+            raise HTTPException(status_code=503, detail="Predictor service not available")
+        
+        removed = predictor.clear_cache(model_type)
+        
+        return {
+            "status": "flushed",
+            "model_type": model_type,
+            "entries_removed": removed,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/monitoring/alerts")
 async def get_monitoring_alerts():
     """Get recent monitoring alerts."""
@@ -409,6 +548,15 @@ async def get_prometheus_metrics():
         raise HTTPException(status_code=500, detail=str(e))
 
 # Helper functions
+async def _warmup_predictor():
+    """Warm up the predictor, then start its background refresh."""
+    try:
+        await predictor.warmup_models()
+    except Exception as e:
+        logger.error(f"Predictor warmup failed: {e}")
+    
+    await predictor.start()
+
 async def _store_expertise_predictions(topic: str, experts: List[Dict]):
     """Store expertise predictions in Neo4j."""
     if not neo4j_client:
@@ -457,9 +605,9 @@ async def _retrain_models(model_types: List[str], config_overrides: Optional[Dic
         
         # Update predictor with new models
         for model_type, result in results.items():
-            if result['status'] == 'completed':
-                await predictor.load_latest_model(model_type)
-                logger.info(f"Updated {model_type} model after retraining")
+            if result['status'] == 'completed' and model_type in predictor.SERVED_MODEL_TYPES:
+                if await predictor.load_model(model_type):
+                    logger.info(f"Updated {model_type} model after retraining")
         
         logger.info("Model retraining completed")
         
@@ -118,6 +118,40 @@ class ModelMonitor:
                 'ml_active_models',
                 'Number of active models',
                 registry=self.registry
+            ),
+            'batch_size': Histogram(
+                'ml_inference_batch_size',
+                'Requests per inference micro-batch',
+                ['batcher'],
+                buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+                registry=self.registry
+            ),
+            'batch_queue_depth': Histogram(
+                'ml_inference_batch_queue_depth',
+                'Queued requests when an inference micro-batch starts',
+                ['batcher'],
+                buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+                registry=self.registry
+            ),
+            'batch_job_queue_wait': Histogram(
+                'ml_batch_job_queue_wait_seconds',
+                'Time batch jobs spend queued before starting',
+                ['prediction_type'],
+                buckets=(0.1, 1, 5, 15, 30, 60, 300, 900, 1800, 3600),
+                registry=self.registry
+            ),
+            'batch_job_run_time': Histogram(
+                'ml_batch_job_run_time_seconds',
+                'Batch job run time, including cancelled and timed out jobs',
+                ['prediction_type'],
+                buckets=(1, 5, 15, 30, 60, 300, 900, 1800, 3600, 7200),
+                registry=self.registry
+            ),
+            'batch_jobs_rejected': Counter(
+                'ml_batch_jobs_rejected_total',
+                'Batch jobs rejected because the job queue was full',
+                ['prediction_type'],
+                registry=self.registry
             )
         }
     
@@ -0,0 +1,317 @@
+import asyncio
+import logging
+import os
+import socket
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import torch
+import yaml
+
+from models.quantization import quantized_model_path
+from utils.supabase_client import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_TABLE = 'ml_model_registry'
+
+# Lease files marking the artifact each serving process uses, so cleanup in any process keeps it
+LEASE_DIR = '.leases'
+
+def load_registry_config(config_path: str = "config/model_config.yaml") -> Dict[str, Any]:
+    """Read the model_registry section of the model config."""
+    try:
+        path = Path(config_path)
+        if path.exists():
+            with open(path, 'r') as f:
+                return (yaml.safe_load(f) or {}).get('model_registry', {}) or {}
+    except Exception as e:
+        logger.error(f"Failed to load model registry config: {e}")
+    return {}
+
+def load_weights(model: torch.nn.Module, model_path: str) -> torch.nn.Module:
+    """
+    Load a checkpoint into a model memory-mapped. Parameters alias the file's pages
+    (copy-on-write), so loads do not read the whole file and processes serving the
+    same artifact share one copy in the page cache. Serving variants that build their
+    own weights (traced/ONNX backends, INT8 artifacts) hold a private copy instead.
+    """
+    try:
+        state_dict = torch.load(model_path, map_location='cpu', mmap=True, weights_only=True)
+    except RuntimeError:
+        # Legacy (non-zipfile) checkpoints cannot be mapped
+        state_dict = torch.load(model_path, map_location='cpu')
+    model.load_state_dict(state_dict, assign=True)
+    model.eval()
+    return model
+
+def _pid_alive(pid: int) -> bool:
+    """Check whether a process on this host is still running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class ModelRegistry:
+    """
+    Model versions indexed in the ml_model_registry table, plus an LRU of resident
+    models bounded by cache_size. Falls back to the artifacts in storage_path when
+    the table is unavailable, and deletes artifacts beyond max_versions per model.
+    Each process holds a lease file on the version it serves per model type (taken
+    when the version is resolved, and kept until it is loaded and while evicted, since
+    it loads that version on next use), and cleanup keeps leased artifacts.
+    """
+    
+    def __init__(self, supabase_client: Optional[SupabaseClient], config: Optional[Dict[str, Any]] = None,
+                 cache_size: int = 3):
+        config = config or {}
+        self.supabase = supabase_client
+        self.storage_path = Path(config.get('storage_path', 'models'))
+        self.max_versions = config.get('max_versions', 5)
+        self.auto_cleanup = config.get('auto_cleanup', True)
+        self.cache_size = max(int(cache_size), 1)
+        
+        # model_type -> (version, model), least recently used first
+        self._resident: OrderedDict = OrderedDict()
+        # model_type -> this process's lease file
+        self._leases: Dict[str, Path] = {}
+        self._lease_owner = f"{socket.gethostname()}.{os.getpid()}"
+        self.stats = {'hits': 0, 'misses': 0, 'loads': 0, 'evictions': 0, 'artifacts_removed': 0}
+    
+    @staticmethod
+    def version_from_path(model_type: str, model_path: str) -> str:
+        """Version of a `{model_type}_best_{version}.pt` artifact (the training run id)."""
+        stem = Path(model_path).stem
+        prefix = f"{model_type}_best_"
+        return stem[len(prefix):] if stem.startswith(prefix) else stem
+    
+    async def register_version(self, model_type: str, model_path: str, config: Dict[str, Any],
+                               metrics: Optional[Dict[str, Any]] = None, version: Optional[str] = None,
+                               mlflow_model_uri: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Index a trained artifact as the production version of its model type."""
+        version = version or self.version_from_path(model_type, model_path)
+        record = {
+            'model_name': model_type,
+            'model_type': model_type,
+            'version': version,
+            'model_path': str(model_path),
+            'config': config,
+            'performance_metrics': metrics or {},
+            'status': 'production',
+            'deployed_at': datetime.now().isoformat(),
+            'mlflow_model_uri': mlflow_model_uri
+        }
+        
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._promote, model_type, record)
+        except Exception as e:
+            logger.error(f"Failed to register {model_type} version {version}: {e}")
+            return None
+        
+        logger.info(f"Registered {model_type} version {version}")
+        
+        if self.auto_cleanup:
+            await self.cleanup(model_type)
+        
+        return record
+    
+    def _promote(self, model_type: str, record: Dict[str, Any]):
+        """Upsert a version as production, archiving the previous one. Blocking."""
+        # The newest version serves; the previous production version is archived
+        self.supabase.table(REGISTRY_TABLE)\
+            .update({'status': 'archived'})\
+            .eq('model_type', model_type)\
+            .eq('status', 'production')\
+            .execute()
+        self.supabase.table(REGISTRY_TABLE)\
+            .upsert(record, on_conflict='model_name,version')\
+            .execute()
+    
+    async def list_versions(self, model_type: str) -> List[Dict[str, Any]]:
+        """Versions of a model type, newest first."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._list_versions, model_type)
+    
+    def _list_versions(self, model_type: str) -> List[Dict[str, Any]]:
+        """Versions from the registry table, else from disk. Blocking."""
+        if self.supabase is not None:
+            try:
+                result = self.supabase.table(REGISTRY_TABLE)\
+                    .select('*')\
+                    .eq('model_type', model_type)\
+                    .order('created_at', desc=True)\
+                    .execute()
+                if result.data:
+                    return result.data
+            except Exception as e:
+                logger.error(f"Failed to list {model_type} versions: {e}")
+        
+        return self._local_versions(model_type)
+    
+    def _local_versions(self, model_type: str) -> List[Dict[str, Any]]:
+        """Versions found on disk, newest first; the newest is treated as production."""
+        model_files = sorted(
+            self.storage_path.glob(f"{model_type}_best_*.pt"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        return [
+            {
+                'model_type': model_type,
+                'version': self.version_from_path(model_type, str(path)),
+                'model_path': str(path),
+                'status': 'production' if position == 0 else 'staging',
+                'created_at': datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+            }
+            for position, path in enumerate(model_files)
+        ]
+    
+    async def resolve(self, model_type: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Record for a version, or the serving version (newest production, else newest) when None."""
+        def existing_versions():
+            return [
+                record for record in self._list_versions(model_type)
+                if Path(record['model_path']).exists()
+            ]
+        
+        versions = await asyncio.get_running_loop().run_in_executor(None, existing_versions)
+        
+        if version is not None:
+            # Also accept the artifact stem suffix used by older clients (e.g. "best_<run_id>")
+            return next((
+                record for record in versions
+                if record['version'] == version or Path(record['model_path']).stem == f"{model_type}_{version}"
+            ), None)
+        
+        production = [record for record in versions if record.get('status') == 'production']
+        return (production or versions or [None])[0]
+    
+    async def cleanup(self, model_type: str) -> List[str]:
+        """Delete artifacts beyond the newest max_versions; production and leased versions are kept."""
+        loop = asyncio.get_running_loop()
+        versions = await self.list_versions(model_type)
+        
+        keep = {record['version'] for record in versions[:self.max_versions]}
+        keep.update(record['version'] for record in versions if record.get('status') == 'production')
+        if model_type in self._resident:
+            keep.add(self._resident[model_type][0])
+        
+        removed = await loop.run_in_executor(
+            None, self._remove_versions, model_type,
+            [record for record in versions if record['version'] not in keep]
+        )
+        
+        if removed:
+            self.stats['artifacts_removed'] += len(removed)
+            logger.info(f"Removed {len(removed)} old {model_type} versions: {removed}")
+        
+        return removed
+    
+    def _remove_versions(self, model_type: str, records: List[Dict[str, Any]]) -> List[str]:
+        """Delete the artifacts and rows of versions no process holds a lease on. Blocking."""
+        removed = []
+        for record in records:
+            if self._is_leased(record['model_path']):
+                continue
+            
+            try:
+                for path in (record['model_path'], quantized_model_path(record['model_path'])):
+                    Path(path).unlink(missing_ok=True)
+                
+                if self.supabase is not None and 'id' in record:
+                    self.supabase.table(REGISTRY_TABLE).delete().eq('id', record['id']).execute()
+                
+                removed.append(record['version'])
+            except Exception as e:
+                logger.error(f"Failed to remove {model_type} version {record['version']}: {e}")
+        
+        return removed
+    
+    def _lease_path(self, model_path: str) -> Path:
+        """This process's lease file for an artifact."""
+        return self.storage_path / LEASE_DIR / f"{Path(model_path).name}.{self._lease_owner}"
+    
+    def hold_lease(self, model_type: str, model_path: str):
+        """Lease the artifact this process serves for a model type, releasing its previous one."""
+        lease = self._lease_path(model_path)
+        previous = self._leases.get(model_type)
+        if previous == lease:
+            return
+        
+        try:
+            lease.parent.mkdir(parents=True, exist_ok=True)
+            lease.touch()
+            self._leases[model_type] = lease
+            if previous is not None:
+                previous.unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Failed to lease {model_path}: {e}")
+    
+    def _is_leased(self, model_path: str) -> bool:
+        """Whether any serving process holds a lease on an artifact. Drops leases of dead local processes."""
+        lease_dir = self.storage_path / LEASE_DIR
+        prefix = f"{Path(model_path).name}."
+        hostname = socket.gethostname()
+        
+        leased = False
+        for lease in lease_dir.glob(f"{prefix}*"):
+            host, _, pid = lease.name[len(prefix):].rpartition('.')
+            if host == hostname and pid.isdigit() and not _pid_alive(int(pid)):
+                lease.unlink(missing_ok=True)
+                continue
+            # Leases from other hosts are kept until their owner releases them
+            leased = True
+        return leased
+    
+    def release_leases(self):
+        """Release this process's leases (on shutdown)."""
+        for lease in self._leases.values():
+            lease.unlink(missing_ok=True)
+        self._leases.clear()
+    
+    def get_resident(self, model_type: str) -> Optional[Tuple[str, torch.nn.Module]]:
+        """Resident (version, model) for a type, marking it most recently used."""
+        entry = self._resident.get(model_type)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        
+        self._resident.move_to_end(model_type)
+        self.stats['hits'] += 1
+        return entry
+    
+    def put_resident(self, model_type: str, version: Optional[str], model: torch.nn.Module,
+                     model_path: Optional[str] = None) -> List[str]:
+        """Make a model resident, replacing any other version of its type. Returns evicted model types."""
+        if model_path is not None:
+            self.hold_lease(model_type, model_path)
+        
+        self._resident[model_type] = (version, model)
+        self._resident.move_to_end(model_type)
+        self.stats['loads'] += 1
+        
+        evicted = []
+        while len(self._resident) > self.cache_size:
+            evicted_type, (evicted_version, _) = self._resident.popitem(last=False)
+            self.stats['evictions'] += 1
+            evicted.append(evicted_type)
+            logger.info(f"Evicted {evicted_type} model version {evicted_version} (cache size {self.cache_size})")
+        
+        return evicted
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get registry status."""
+        return {
+            'storage_path': str(self.storage_path),
+            'cache_size': self.cache_size,
+            'max_versions': self.max_versions,
+            'resident': {model_type: version for model_type, (version, _) in self._resident.items()},
+            'leases': {model_type: lease.name for model_type, lease in self._leases.items()},
+            **self.stats
+        }
@@ -1,7 +1,8 @@
 import torch
 import torch.nn.functional as F
-from torch_geometric.nn import GCNConv, GATConv, SAGEConv
+from torch_geometric.nn import GCNConv, GATConv, SAGEConv, TransformerConv
 from torch_geometric.nn import global_mean_pool, global_max_pool
+from torch_geometric.utils import add_self_loops, remove_self_loops
 import torch.nn as nn
 import logging
 
@@ -124,13 +125,35 @@ class ExpertiseRecommendationGNN(LinkPredictionGNN):
         final_scores = similarity * expertise_scores.squeeze()
         return final_scores
     
-    def get_top_experts(self, topic_embedding, person_embeddings, person_names, k=5):
+    def build_expert_cache(self, person_embeddings, eps=1e-8):
+        """Precompute the topic-independent terms of predict_expertise for serving."""
+        with torch.no_grad():
+            return {
+                'normalized': F.normalize(person_embeddings, p=2, dim=1, eps=eps).contiguous(),
+                'scores': self.expertise_scorer(person_embeddings).squeeze(-1).contiguous()
+            }
+    
+    def score_topics(self, topic_embeddings, expert_cache, eps=1e-8):
+        """
+        Score persons against one topic (dim,) -> (persons,) or many (topics, dim) -> (topics, persons).
+        Matches predict_expertise: one GEMV/GEMM plus an elementwise multiply.
+        """
+        topics = F.normalize(topic_embeddings, p=2, dim=-1, eps=eps)
+        similarity = torch.matmul(topics, expert_cache['normalized'].t())
+        return similarity * expert_cache['scores']
+    
+    def get_top_experts(self, topic_embedding, person_embeddings, person_names, k=5,
+                        expert_cache=None):
         """Get top k experts for a given topic."""
-        # Expand topic embedding to match person embeddings
-        topic_expanded = topic_embedding.unsqueeze(0).expand(person_embeddings.size(0), -1)
-        
-        # Predict expertise scores
-        expertise_scores = self.predict_expertise(person_embeddings, topic_expanded)
+        if expert_cache is not None:
+            # Serving path: cached person terms, one matrix-vector product
+            expertise_scores = self.score_topics(topic_embedding, expert_cache)
+        else:
+            # Expand topic embedding to match person embeddings
+            topic_expanded = topic_embedding.unsqueeze(0).expand(person_embeddings.size(0), -1)
+            
+            # Predict expertise scores
+            expertise_scores = self.predict_expertise(person_embeddings, topic_expanded)
         
         # Get top k experts
         top_k_indices = torch.topk(expertise_scores, k=min(k, len(expertise_scores))).indices
@@ -144,6 +167,35 @@ class ExpertiseRecommendationGNN(LinkPredictionGNN):
             })
         
         return experts
+    
+    def get_top_experts_batch(self, topic_embeddings, expert_cache, k=5, chunk_size=256,
+                              exclude=None):
+        """
+        Top k persons for many topics (topics, dim) against one expert cache. Scores are
+        computed chunk_size topics at a time, so memory is bounded by chunk_size x persons.
+        exclude optionally gives, per topic, person positions to drop (e.g. the topic's own node).
+        Returns (scores, indices), each (topics, k).
+        """
+        num_topics = topic_embeddings.size(0)
+        k = min(k, expert_cache['scores'].size(0))
+        top_scores = torch.empty(num_topics, k)
+        top_indices = torch.empty(num_topics, k, dtype=torch.long)
+        
+        with torch.no_grad():
+            for start in range(0, num_topics, chunk_size):
+                end = min(start + chunk_size, num_topics)
+                scores = self.score_topics(topic_embeddings[start:end], expert_cache)
+                
+                if exclude is not None:
+                    for row, positions in enumerate(exclude[start:end]):
+                        if len(positions) > 0:
+                            scores[row, positions] = float('-inf')
+                
+                top = torch.topk(scores, k=k, dim=1)
+                top_scores[start:end] = top.values
+                top_indices[start:end] = top.indices
+        
+        return top_scores, top_indices
 
 class MultiTaskGNN(torch.nn.Module):
     """
@@ -215,9 +267,38 @@ class AttentionPooling(nn.Module):
         # Pool by batch
         return global_mean_pool(weighted_x, batch)
 
+class SparseGraphTransformerLayer(nn.Module):
+    """
+    Transformer encoder block with self-attention restricted to graph neighbourhoods.
+    Attention runs over edges (TransformerConv), so memory grows with the number of
+    edges instead of N^2. Post-norm, like nn.TransformerEncoderLayer's default.
+    """
+    
+    def __init__(self, hidden_dim, num_heads, dropout):
+        super().__init__()
+        self.attention = TransformerConv(
+            hidden_dim, hidden_dim // num_heads, heads=num_heads,
+            dropout=dropout, root_weight=False
+        )
+        self.feed_forward = nn.Sequential(
+            nn.Linear(hidden_dim, hidden_dim * 2),
+            nn.ReLU(),
+            nn.Dropout(dropout),
+            nn.Linear(hidden_dim * 2, hidden_dim)
+        )
+        self.norm1 = nn.LayerNorm(hidden_dim)
+        self.norm2 = nn.LayerNorm(hidden_dim)
+        self.residual_dropout = nn.Dropout(dropout)
+    
+    def forward(self, x, edge_index):
+        x = self.norm1(x + self.residual_dropout(self.attention(x, edge_index)))
+        return self.norm2(x + self.residual_dropout(self.feed_forward(x)))
+
 class GraphTransformerGNN(torch.nn.Module):
     """
     Graph Transformer-based GNN for advanced relationship modeling.
+    attention_mode 'dense' attends over all node pairs (O(N^2) memory); 'sparse'
+    attends over graph neighbourhoods plus an optional global token per graph (O(E + N)).
     """
     
     def __init__(self, config):
@@ -228,20 +309,36 @@ class GraphTransformerGNN(torch.nn.Module):
         self.num_heads = config.get('num_heads', 8)
         self.num_layers = config['num_layers']
         self.dropout = config['dropout']
+        self.attention_mode = config.get('attention_mode', 'dense')
+        self.use_global_token = config.get('global_token', True)
         
         # Input projection
         self.input_proj = nn.Linear(self.input_dim, self.hidden_dim)
         
         # Transformer layers
-        self.transformer_layers = nn.ModuleList([
-            nn.TransformerEncoderLayer(
-                d_model=self.hidden_dim,
-                nhead=self.num_heads,
-                dim_feedforward=self.hidden_dim * 2,
-                dropout=self.dropout,
-                batch_first=True
-            ) for _ in range(self.num_layers)
-        ])
+        if self.attention_mode == 'dense':
+            self.transformer_layers = nn.ModuleList([
+                nn.TransformerEncoderLayer(
+                    d_model=self.hidden_dim,
+                    nhead=self.num_heads,
+                    dim_feedforward=self.hidden_dim * 2,
+                    dropout=self.dropout,
+                    batch_first=True
+                ) for _ in range(self.num_layers)
+            ])
+        elif self.attention_mode == 'sparse':
+            if self.hidden_dim % self.num_heads != 0:
+                raise ValueError(f"hidden_dim {self.hidden_dim} must be divisible by num_heads {self.num_heads}")
+            self.transformer_layers = nn.ModuleList([
+                SparseGraphTransformerLayer(self.hidden_dim, self.num_heads, self.dropout)
+                for _ in range(self.num_layers)
+            ])
+            
+            # Learnable virtual node that every node attends to (and that attends to every node)
+            if self.use_global_token:
+                self.global_token = nn.Parameter(torch.zeros(1, self.hidden_dim))
+        else:
+            raise ValueError(f"Unknown attention mode: {self.attention_mode}")
         
         # Output layers
         self.link_predictor = nn.Sequential(
@@ -251,11 +348,14 @@ class GraphTransformerGNN(torch.nn.Module):
             nn.Linear(self.hidden_dim, 1)
         )
     
-    def forward(self, x, edge_index, edge_label_index, batch=None):
-        """Forward pass using transformer architecture."""
+    def encode(self, x, edge_index, batch=None):
+        """Encode nodes into embeddings."""
         # Project input features
         x = self.input_proj(x)
         
+        if self.attention_mode == 'sparse':
+            return self._encode_sparse(x, edge_index, batch)
+        
         # Add batch dimension if needed
         if x.dim() == 2:
             x = x.unsqueeze(0)
@@ -268,12 +368,49 @@ class GraphTransformerGNN(torch.nn.Module):
         if x.dim() == 3:
             x = x.squeeze(0)
         
-        # Link prediction
-        src_embeddings = x[edge_label_index[0]]
-        dst_embeddings = x[edge_label_index[1]]
+        return x
+    
+    def _encode_sparse(self, x, edge_index, batch=None):
+        """Neighbourhood attention over edge_index, plus one global token per graph if enabled."""
+        num_nodes = x.size(0)
+        
+        # Each node attends to itself and its in-neighbours
+        edge_index, _ = remove_self_loops(edge_index)
+        edge_index, _ = add_self_loops(edge_index, num_nodes=num_nodes)
+        
+        if self.use_global_token:
+            graph_ids = batch if batch is not None else torch.zeros(num_nodes, dtype=torch.long, device=x.device)
+            num_graphs = int(graph_ids.max()) + 1 if num_nodes > 0 else 1
+            nodes = torch.arange(num_nodes, device=x.device)
+            tokens = torch.arange(num_nodes, num_nodes + num_graphs, device=x.device)
+            token_ids = graph_ids + num_nodes
+            
+            # Token <-> node edges in both directions, plus a self-loop per token
+            edge_index = torch.cat([
+                edge_index,
+                torch.stack([token_ids, nodes]),
+                torch.stack([nodes, token_ids]),
+                torch.stack([tokens, tokens])
+            ], dim=1)
+            x = torch.cat([x, self.global_token.expand(num_graphs, -1)], dim=0)
+        
+        for layer in self.transformer_layers:
+            x = layer(x, edge_index)
+        
+        return x[:num_nodes]
+    
+    def decode(self, z, edge_label_index):
+        """Decode edge probabilities from node embeddings."""
+        src_embeddings = z[edge_label_index[0]]
+        dst_embeddings = z[edge_label_index[1]]
         edge_embeddings = torch.cat([src_embeddings, dst_embeddings], dim=1)
         
         return self.link_predictor(edge_embeddings).squeeze()
+    
+    def forward(self, x, edge_index, edge_label_index, batch=None):
+        """Forward pass using transformer architecture."""
+        z = self.encode(x, edge_index, batch)
+        return self.decode(z, edge_label_index)
 
 def create_model(model_type: str, config: dict) -> torch.nn.Module:
     """Factory function to create models based on type."""
@@ -0,0 +1,46 @@
+import io
+import copy
+import logging
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+
+logger = logging.getLogger(__name__)
+
+# Only dense layers are quantized: the MLP heads (link_predictor, expertise_scorer,
+# classifier heads) and GraphTransformerGNN's projections. PyG convs use their own
+# Linear type and stay in fp32.
+QUANTIZABLE_MODULES = {nn.Linear}
+
+def quantize_model(model: torch.nn.Module, dtype: torch.dtype = torch.qint8) -> torch.nn.Module:
+    """Return an INT8 dynamically quantized copy of a model for CPU serving."""
+    quantized = torch.ao.quantization.quantize_dynamic(
+        copy.deepcopy(model).eval(), QUANTIZABLE_MODULES, dtype=dtype
+    )
+    quantized.eval()
+    return quantized
+
+def model_size_bytes(model: torch.nn.Module) -> int:
+    """Serialized state dict size; counts packed INT8 weights that parameters() does not."""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+def quantized_model_path(model_path: str) -> str:
+    """Artifact path of the quantized variant of a checkpoint (`_best_` -> `_quantized_`)."""
+    path = Path(model_path)
+    return str(path.with_name(path.name.replace('_best_', '_quantized_', 1)))
+
+def save_quantized_model(model: torch.nn.Module, model_path: str):
+    """Save a quantized model's state dict as a separate artifact."""
+    torch.save(model.state_dict(), model_path)
+    logger.info(f"Saved quantized model to {model_path}")
+
+def load_quantized_model(model_path: str, model: torch.nn.Module) -> torch.nn.Module:
+    """Load a quantized artifact into the quantized structure of an fp32 model."""
+    quantized = quantize_model(model)
+    quantized.load_state_dict(torch.load(model_path, map_location='cpu'))
+    quantized.eval()
+    logger.info(f"Loaded quantized model from {model_path}")
+    return quantized
@@ -0,0 +1,32 @@
+import logging
+
+import torch
+from torch_geometric.nn import GCNConv, SAGEConv
+from torch_geometric.nn.conv import MessagePassing
+
+logger = logging.getLogger(__name__)
+
+# Conv layers that propagate over a torch.sparse adjacency with results identical to COO
+SPARSE_CONV_TYPES = (GCNConv, SAGEConv)
+
+def supports_sparse_adjacency(model: torch.nn.Module) -> bool:
+    """Check that every message passing layer in a model can take a sparse adj_t."""
+    convs = [module for module in model.modules() if isinstance(module, MessagePassing)]
+    return bool(convs) and all(isinstance(conv, SPARSE_CONV_TYPES) for conv in convs)
+
+def bind_gcn_normalization(model: torch.nn.Module, gcn_adj_t: torch.Tensor) -> int:
+    """
+    Enable layer caching on every GCNConv with a precomputed normalized adjacency, so
+    forward passes skip degree normalization. Inference only: cached layers ignore the
+    structure of whatever graph they are later called with.
+    """
+    if model.training:
+        raise ValueError("GCN normalization can only be bound to a model in eval mode")
+    
+    bound = 0
+    for module in model.modules():
+        if isinstance(module, GCNConv):
+            module.cached = True
+            module._cached_edge_index = (gcn_adj_t, None)
+            bound += 1
+    return bound
@@ -0,0 +1,150 @@
+import json
+import time
+import logging
+import argparse
+import resource
+import multiprocessing as mp
+from typing import Dict, List, Any
+
+import torch
+import torch.nn.functional as F
+
+from models.link_prediction import create_model
+
+logger = logging.getLogger(__name__)
+
+def synthetic_graph(num_nodes: int, avg_degree: int, input_dim: int, num_label_edges: int = 1024,
+                    seed: int = 0) -> Dict[str, torch.Tensor]:
+    """Random features, edges and labelled node pairs for benchmarking."""
+    generator = torch.Generator().manual_seed(seed)
+    return {
+        'x': torch.randn(num_nodes, input_dim, generator=generator),
+        'edge_index': torch.randint(0, num_nodes, (2, num_nodes * avg_degree), generator=generator),
+        'edge_label_index': torch.randint(0, num_nodes, (2, num_label_edges), generator=generator),
+        'edge_label': torch.randint(0, 2, (num_label_edges,), generator=generator).float()
+    }
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _run_benchmark(config: Dict[str, Any], num_nodes: int, avg_degree: int, runs: int) -> Dict[str, Any]:
+    """Time training steps and inference for one attention mode and graph size."""
+    torch.manual_seed(0)
+    graph = synthetic_graph(num_nodes, avg_degree, config['input_dim'])
+    model = create_model('graph_transformer', config)
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    baseline_rss = _peak_rss_mb()
+    
+    # Training steps (forward + backward + update)
+    model.train()
+    train_times = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        optimizer.zero_grad()
+        out = model(graph['x'], graph['edge_index'], graph['edge_label_index'])
+        loss = F.binary_cross_entropy_with_logits(out, graph['edge_label'])
+        loss.backward()
+        optimizer.step()
+        train_times.append(time.perf_counter() - start_time)
+    
+    # Full-graph inference
+    model.eval()
+    inference_times = []
+    with torch.no_grad():
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            model.encode(graph['x'], graph['edge_index'])
+            inference_times.append(time.perf_counter() - start_time)
+    
+    return {
+        'train_step_ms': sorted(train_times)[len(train_times) // 2] * 1000,
+        'inference_ms': sorted(inference_times)[len(inference_times) // 2] * 1000,
+        'peak_memory_mb': _peak_rss_mb() - baseline_rss
+    }
+
+def _worker(config: Dict[str, Any], num_nodes: int, avg_degree: int, runs: int, queue: mp.Queue):
+    """Run one benchmark in a fresh process so peak memory is not shared between runs."""
+    try:
+        queue.put({'status': 'ok', **_run_benchmark(config, num_nodes, avg_degree, runs)})
+    except (RuntimeError, MemoryError) as e:
+        queue.put({'status': 'failed', 'error': str(e)[:200]})
+
+def benchmark_attention(sizes: List[int], avg_degree: int = 10, hidden_dim: int = 128,
+                        num_layers: int = 2, num_heads: int = 4, input_dim: int = 128,
+                        runs: int = 3, max_dense_nodes: int = 10000) -> List[Dict[str, Any]]:
+    """
+    Benchmark dense vs sparse (with and without global token) attention on synthetic graphs.
+    Dense attention is skipped above max_dense_nodes, where its N^2 memory is prohibitive.
+    """
+    base_config = {
+        'input_dim': input_dim,
+        'hidden_dim': hidden_dim,
+        'num_layers': num_layers,
+        'num_heads': num_heads,
+        'dropout': 0.1
+    }
+    variants = {
+        'dense': {'attention_mode': 'dense'},
+        'sparse': {'attention_mode': 'sparse', 'global_token': False},
+        'sparse_global': {'attention_mode': 'sparse', 'global_token': True}
+    }
+    
+    context = mp.get_context('spawn')
+    results = []
+    for num_nodes in sizes:
+        for variant, overrides in variants.items():
+            result = {'variant': variant, 'num_nodes': num_nodes, 'num_edges': num_nodes * avg_degree}
+            
+            if variant == 'dense' and num_nodes > max_dense_nodes:
+                result['status'] = 'skipped'
+            else:
+                queue = context.Queue()
+                process = context.Process(
+                    target=_worker, args=({**base_config, **overrides}, num_nodes, avg_degree, runs, queue)
+                )
+                process.start()
+                process.join()
+                result.update(queue.get() if not queue.empty() else
+                              {'status': 'failed', 'error': f'exit code {process.exitcode}'})
+            
+            results.append(result)
+            logger.info(json.dumps(result))
+    
+    return results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    parser = argparse.ArgumentParser(description="Benchmark dense vs sparse graph transformer attention")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 10000, 50000])
+    parser.add_argument('--avg-degree', type=int, default=10)
+    parser.add_argument('--hidden-dim', type=int, default=128)
+    parser.add_argument('--num-layers', type=int, default=2)
+    parser.add_argument('--num-heads', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--max-dense-nodes', type=int, default=10000)
+    parser.add_argument('--output', type=str, default=None, help="Write results as JSON")
+    args = parser.parse_args()
+    
+    results = benchmark_attention(
+        args.sizes,
+        avg_degree=args.avg_degree,
+        hidden_dim=args.hidden_dim,
+        num_layers=args.num_layers,
+        num_heads=args.num_heads,
+        runs=args.runs,
+        max_dense_nodes=args.max_dense_nodes
+    )
+    
+    print(f"{'variant':<15}{'nodes':>8}{'edges':>10}{'train ms':>12}{'infer ms':>12}{'peak MB':>10}")
+    for result in results:
+        if result['status'] == 'ok':
+            print(f"{result['variant']:<15}{result['num_nodes']:>8}{result['num_edges']:>10}"
+                  f"{result['train_step_ms']:>12.1f}{result['inference_ms']:>12.1f}{result['peak_memory_mb']:>10.1f}")
+        else:
+            print(f"{result['variant']:<15}{result['num_nodes']:>8}{result['num_edges']:>10}  {result['status']}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
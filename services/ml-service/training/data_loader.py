@@ -6,6 +6,7 @@ import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 from utils.neo4j_client import Neo4jClient
 from utils.supabase_client import SupabaseClient
+from utils.graph_conversion import NodeIdIndex, node_features_from_export, edge_index_from_export
 import logging
 from typing import Dict, List, Any, Tuple, Optional
 import asyncio
@@ -288,18 +289,11 @@ class GraphDataLoader:
         
         try:
             # Create node feature matrix from embeddings
-            embeddings = np.stack(nodes_df['embedding'].values)
-            x = torch.tensor(embeddings, dtype=torch.float)
+            x = torch.from_numpy(node_features_from_export(nodes_df))
             
-            # Create node ID mapping
-            node_ids = nodes_df['nodeId'].values
-            id_to_idx = {node_id: idx for idx, node_id in enumerate(node_ids)}
-            
-            # Create edge index with proper mapping
-            edge_sources = [id_to_idx[src] for src in edges_df['sourceNodeId'].values if src in id_to_idx]
-            edge_targets = [id_to_idx[tgt] for tgt in edges_df['targetNodeId'].values if tgt in id_to_idx]
-            
-            edge_index = torch.tensor([edge_sources, edge_targets], dtype=torch.long)
+            # Create edge index with vectorized node ID mapping
+            id_index = NodeIdIndex(nodes_df['nodeId'].values)
+            edge_index = torch.from_numpy(edge_index_from_export(edges_df, id_index))
             
             # Create edge labels for link prediction
             edge_labels = torch.ones(edge_index.size(1), dtype=torch.float)
@@ -335,8 +329,7 @@ class GraphDataLoader:
         
         try:
             # Create node features
-            embeddings = np.stack(nodes_df['embedding'].values)
-            x = torch.tensor(embeddings, dtype=torch.float)
+            x = torch.from_numpy(node_features_from_export(nodes_df))
             
             # Create node labels
             node_ids = nodes_df['nodeId'].values
@@ -349,11 +342,7 @@ class GraphDataLoader:
             y = torch.tensor(labels, dtype=torch.long)
             
             # Create edge index
-            id_to_idx = {node_id: idx for idx, node_id in enumerate(node_ids)}
-            edge_sources = [id_to_idx[src] for src in edges_df['sourceNodeId'].values if src in id_to_idx]
-            edge_targets = [id_to_idx[tgt] for tgt in edges_df['targetNodeId'].values if tgt in id_to_idx]
-            
-            edge_index = torch.tensor([edge_sources, edge_targets], dtype=torch.long)
+            edge_index = torch.from_numpy(edge_index_from_export(edges_df, NodeIdIndex(node_ids)))
             
             return Data(
                 x=x,
@@ -374,17 +363,11 @@ class GraphDataLoader:
         
         try:
             # Create node features
-            embeddings = np.stack(nodes_df['embedding'].values)
-            x = torch.tensor(embeddings, dtype=torch.float)
+            x = torch.from_numpy(node_features_from_export(nodes_df))
             
             # Create edge index
             node_ids = nodes_df['nodeId'].values
-            id_to_idx = {node_id: idx for idx, node_id in enumerate(node_ids)}
-            
-            edge_sources = [id_to_idx[src] for src in edges_df['sourceNodeId'].values if src in id_to_idx]
-            edge_targets = [id_to_idx[tgt] for tgt in edges_df['targetNodeId'].values if tgt in id_to_idx]
-            
-            edge_index = torch.tensor([edge_sources, edge_targets], dtype=torch.long)
+            edge_index = torch.from_numpy(edge_index_from_export(edges_df, NodeIdIndex(node_ids)))
             
             # Create expertise edge labels
             expertise_edges = []
@@ -6,9 +6,12 @@ from sklearn.metrics import (
     accuracy_score, classification_report, confusion_matrix
 )
 from typing import Dict, List, Any, Tuple
+import time
 import logging
 from datetime import datetime
 
+from models.quantization import model_size_bytes
+
 logger = logging.getLogger(__name__)
 
 class ModelEvaluator:
@@ -16,6 +19,14 @@ class ModelEvaluator:
     Comprehensive model evaluation framework for GNN models.
     """
     
+    # Metric the quantization accuracy budget applies to, per model type
+    PRIMARY_METRICS = {
+        'link_prediction': 'auc',
+        'graph_transformer': 'auc',
+        'node_classification': 'accuracy',
+        'expertise_recommendation': 'ndcg'
+    }
+    
     def __init__(self):
         self.evaluation_history = []
         logger.info("ModelEvaluator initialized")
@@ -172,6 +183,81 @@ class ModelEvaluator:
             
             return metrics
     
+    async def evaluate_quantization(self, model_type: str, model: torch.nn.Module,
+                                    quantized_model: torch.nn.Module, data,
+                                    accuracy_budget: float = 0.01, num_runs: int = 10) -> Dict[str, Any]:
+        """Compare a quantized model with its fp32 baseline on accuracy, latency and memory."""
+        
+        evaluators = {
+            'link_prediction': self.evaluate_link_prediction,
+            'graph_transformer': self.evaluate_link_prediction,
+            'node_classification': self.evaluate_node_classification,
+            'expertise_recommendation': self.evaluate_expertise_prediction
+        }
+        primary_metric = self.PRIMARY_METRICS[model_type]
+        
+        # Accuracy on the same evaluation data
+        baseline_metrics = await evaluators[model_type](model, data)
+        quantized_metrics = await evaluators[model_type](quantized_model, data)
+        accuracy_delta = quantized_metrics[primary_metric] - baseline_metrics[primary_metric]
+        
+        # Latency and serialized size
+        baseline_latency = self._measure_latency(model_type, model, data, num_runs)
+        quantized_latency = self._measure_latency(model_type, quantized_model, data, num_runs)
+        baseline_size = model_size_bytes(model)
+        quantized_size = model_size_bytes(quantized_model)
+        
+        metrics = {
+            'primary_metric': primary_metric,
+            'baseline_score': float(baseline_metrics[primary_metric]),
+            'quantized_score': float(quantized_metrics[primary_metric]),
+            'accuracy_delta': float(accuracy_delta),
+            'accuracy_budget': accuracy_budget,
+            'baseline_latency_ms': baseline_latency,
+            'quantized_latency_ms': quantized_latency,
+            'latency_speedup': baseline_latency / quantized_latency if quantized_latency > 0 else 0.0,
+            'baseline_size_mb': baseline_size / 1024 / 1024,
+            'quantized_size_mb': quantized_size / 1024 / 1024,
+            'memory_reduction': 1 - quantized_size / baseline_size if baseline_size > 0 else 0.0,
+            'within_budget': bool(accuracy_delta >= -accuracy_budget)
+        }
+        
+        # Store evaluation
+        self.evaluation_history.append({
+            'model_type': f'{model_type}_quantization',
+            'metrics': metrics,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        return metrics
+    
+    def _measure_latency(self, model_type: str, model: torch.nn.Module, data, num_runs: int = 10) -> float:
+        """Median inference latency in milliseconds over the evaluation data."""
+        
+        model.eval()
+        
+        def run():
+            if model_type == 'node_classification':
+                return model(data.x, data.edge_index)
+            if (model_type == 'expertise_recommendation' and hasattr(data, 'expertise_edge_index')
+                    and data.expertise_edge_index.size(1) > 0):
+                node_embeddings = model.encode(data.x, data.edge_index)
+                return model.predict_expertise(
+                    node_embeddings[data.expertise_edge_index[0]],
+                    node_embeddings[data.expertise_edge_index[1]]
+                )
+            return model(data.x, data.edge_index, data.edge_label_index)
+        
+        timings = []
+        with torch.no_grad():
+            run()  # Warm-up
+            for _ in range(max(num_runs, 1)):
+                start_time = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start_time) * 1000)
+        
+        return float(np.median(timings))
+    
     def _calculate_ndcg(self, y_true: np.ndarray, y_pred: np.ndarray, k: int = 10) -> float:
         """Calculate Normalized Discounted Cumulative Gain."""
         
@@ -1,11 +1,14 @@
 import torch
 import torch.nn.functional as F
-from torch_geometric.loader import DataLoader
+from torch_geometric.loader import DataLoader, LinkNeighborLoader
+from torch_geometric.data import Data
 import mlflow
 import mlflow.pytorch
 from datetime import datetime
 import yaml
 import os
+import copy
+import time
 import asyncio
 import logging
 from typing import Dict, Any, Tuple, Optional
@@ -14,8 +17,10 @@ from pathlib import Path
 
 from models.link_prediction import LinkPredictionGNN, ExpertiseRecommendationGNN, create_model
 from models.node_classification import create_classification_model
+from models.quantization import quantize_model, quantized_model_path, save_quantized_model
 from training.data_loader import GraphDataLoader
 from training.evaluation import ModelEvaluator
+from mlops.model_registry import ModelRegistry, load_registry_config
 from utils.neo4j_client import Neo4jClient
 from utils.supabase_client import SupabaseClient
 
@@ -50,25 +55,31 @@ class MLTrainingOrchestrator:
         self.model_dir = Path("models")
         self.model_dir.mkdir(exist_ok=True)
         
+        # Trained versions are indexed in ml_model_registry; old artifacts are cleaned up there
+        self.registry = ModelRegistry(self.supabase_client, load_registry_config())
+        
         logger.info("MLTrainingOrchestrator initialized successfully")
     
-    async def train_link_prediction_model(self) -> Tuple[torch.nn.Module, Dict[str, float]]:
-        """Train a link prediction model with full MLflow tracking."""
+    async def train_link_prediction_model(self, model_type: str = 'link_prediction') -> Tuple[torch.nn.Module, Dict[str, float]]:
+        """Train a link prediction model (GNN or graph transformer) with full MLflow tracking."""
+        
+        run_name = f"{model_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        run_name = f"link_prediction_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Architecture-specific settings (e.g. graph_transformer) override the shared model config
+        model_config = {**self.config.get('model', {}), **self.config.get(model_type, {})}
         
         with mlflow.start_run(run_name=run_name):
             try:
                 # Log hyperparameters
-                mlflow.log_params(self.config['model'])
+                mlflow.log_params(model_config)
                 mlflow.log_params(self.config['training'])
                 
                 # Store training run in Supabase
                 run_id = mlflow.active_run().info.run_id
                 await self.supabase_client.store_ml_training_run({
                     'run_id': run_id,
-                    'model_type': 'link_prediction',
-                    'hyperparameters': {**self.config['model'], **self.config['training']},
+                    'model_type': model_type,
+                    'hyperparameters': {**model_config, **self.config['training']},
                     'metrics': {},
                     'status': 'running',
                     'started_at': datetime.now().isoformat()
@@ -86,10 +97,15 @@ class MLTrainingOrchestrator:
                 )
                 
                 # Initialize model
-                model = create_model('link_prediction', self.config['model'])
+                model = create_model(model_type, model_config)
                 optimizer = self._create_optimizer(model)
                 scheduler = self._create_scheduler(optimizer)
                 
+                # Neighbor-sampled link batches keep memory bounded by batch size and fan-out
+                train_loader = None
+                if self.config.get('mini_batch', {}).get('enabled', False):
+                    train_loader = self._create_link_loader(train_data, model_config.get('num_layers'))
+                
                 # Training loop
                 best_val_auc = 0
                 patience_counter = 0
@@ -100,7 +116,13 @@ class MLTrainingOrchestrator:
                 for epoch in range(self.config['training']['max_epochs']):
                     # Training
                     model.train()
-                    train_loss = self._train_epoch(model, optimizer, train_data)
+                    epoch_start = time.perf_counter()
+                    if train_loader is not None:
+                        train_loss, train_edges = self._train_mini_batch_epoch(model, optimizer, train_loader)
+                    else:
+                        train_loss = self._train_epoch(model, optimizer, train_data)
+                        train_edges = train_data.edge_label_index.size(1)
+                    edges_per_sec = train_edges / max(time.perf_counter() - epoch_start, 1e-9)
                     
                     # Validation
                     model.eval()
@@ -117,7 +139,8 @@ class MLTrainingOrchestrator:
                         'train_loss': train_loss,
                         'val_auc': val_metrics['auc'],
                         'val_ap': val_metrics['average_precision'],
-                        'learning_rate': optimizer.param_groups[0]['lr']
+                        'learning_rate': optimizer.param_groups[0]['lr'],
+                        'train_edges_per_sec': edges_per_sec
                     }
                     
                     training_history.append(epoch_metrics)
@@ -126,11 +149,15 @@ class MLTrainingOrchestrator:
                         'train_loss': train_loss,
                         'val_auc': val_metrics['auc'],
                         'val_ap': val_metrics['average_precision'],
-                        'learning_rate': optimizer.param_groups[0]['lr']
+                        'learning_rate': optimizer.param_groups[0]['lr'],
+                        'train_edges_per_sec': edges_per_sec
                     }, step=epoch)
                     
                     if epoch % self.config['monitoring']['log_interval'] == 0:
-                        logger.info(f"Epoch {epoch}: Train Loss: {train_loss:.4f}, Val AUC: {val_metrics['auc']:.4f}")
+                        logger.info(
+                            f"Epoch {epoch}: Train Loss: {train_loss:.4f}, Val AUC: {val_metrics['auc']:.4f}, "
+                            f"Throughput: {edges_per_sec:.0f} edges/sec"
+                        )
                     
                     # Early stopping and model saving
                     if val_metrics['auc'] > best_val_auc:
@@ -138,7 +165,7 @@ class MLTrainingOrchestrator:
                         patience_counter = 0
                         
                         # Save best model
-                        model_path = self.model_dir / f"link_prediction_best_{run_id}.pt"
+                        model_path = self.model_dir / f"{model_type}_best_{run_id}.pt"
                         torch.save(model.state_dict(), model_path)
                         mlflow.log_artifact(str(model_path))
                         
@@ -175,6 +202,14 @@ class MLTrainingOrchestrator:
                 
                 logger.info(f"Training completed. Test AUC: {test_metrics['auc']:.4f}")
                 
+                # Quantized serving variant, promoted only within the accuracy budget
+                await self._promote_quantized_model(
+                    model_type, model, self.model_dir / f"{model_type}_best_{run_id}.pt", test_data
+                )
+                await self._register_model_version(
+                    model_type, self.model_dir / f"{model_type}_best_{run_id}.pt", model_config, final_metrics
+                )
+                
                 return model, test_metrics
                 
             except Exception as e:
@@ -265,6 +300,16 @@ class MLTrainingOrchestrator:
                 
                 logger.info(f"Node classification training completed. Test Accuracy: {test_metrics['accuracy']:.4f}")
                 
+                await self._promote_quantized_model(
+                    'node_classification', model,
+                    self.model_dir / f"node_classification_best_{mlflow.active_run().info.run_id}.pt", test_data
+                )
+                await self._register_model_version(
+                    'node_classification',
+                    self.model_dir / f"node_classification_best_{mlflow.active_run().info.run_id}.pt",
+                    classification_config, test_metrics
+                )
+                
                 return model, test_metrics
                 
             except Exception as e:
@@ -349,12 +394,84 @@ class MLTrainingOrchestrator:
                 
                 logger.info(f"Expertise recommendation training completed. Test NDCG: {test_metrics['ndcg']:.4f}")
                 
+                await self._promote_quantized_model(
+                    'expertise_recommendation', model,
+                    self.model_dir / f"expertise_recommendation_best_{mlflow.active_run().info.run_id}.pt", test_data
+                )
+                await self._register_model_version(
+                    'expertise_recommendation',
+                    self.model_dir / f"expertise_recommendation_best_{mlflow.active_run().info.run_id}.pt",
+                    self.config['model'], test_metrics
+                )
+                
                 return model, test_metrics
                 
             except Exception as e:
                 logger.error(f"Expertise recommendation training failed: {e}")
                 raise
     
+    async def _promote_quantized_model(self, model_type: str, model: torch.nn.Module,
+                                       best_model_path: Path, test_data) -> Optional[Dict[str, Any]]:
+        """Quantize the best checkpoint and save it as a serving artifact if it stays within the accuracy budget."""
+        
+        quantization_config = self.config.get('quantization', {})
+        if not quantization_config.get('enabled', False) or not best_model_path.exists():
+            return None
+        
+        try:
+            baseline = copy.deepcopy(model)
+            baseline.load_state_dict(torch.load(best_model_path, map_location='cpu'))
+            baseline.eval()
+            quantized = quantize_model(baseline)
+            
+            metrics = await self.evaluator.evaluate_quantization(
+                model_type, baseline, quantized, test_data,
+                accuracy_budget=quantization_config.get('accuracy_budget', 0.01),
+                num_runs=quantization_config.get('latency_runs', 10)
+            )
+            
+            mlflow.log_metrics({
+                f'quantized_{name}': float(value)
+                for name, value in metrics.items() if isinstance(value, (int, float))
+            })
+            
+            if metrics['within_budget']:
+                artifact_path = quantized_model_path(str(best_model_path))
+                save_quantized_model(quantized, artifact_path)
+                mlflow.log_artifact(artifact_path)
+                logger.info(
+                    f"Promoted quantized {model_type} model: {metrics['primary_metric']} delta "
+                    f"{metrics['accuracy_delta']:+.4f}, {metrics['latency_speedup']:.2f}x latency, "
+                    f"{metrics['memory_reduction']:.0%} smaller"
+                )
+            else:
+                logger.warning(
+                    f"Quantized {model_type} model not promoted: {metrics['primary_metric']} delta "
+                    f"{metrics['accuracy_delta']:+.4f} exceeds budget {metrics['accuracy_budget']}"
+                )
+            
+            return metrics
+        
+        except Exception as e:
+            logger.error(f"Failed to quantize {model_type} model: {e}")
+            return None
+    
+    async def _register_model_version(self, model_type: str, best_model_path: Path,
+                                      model_config: Dict[str, Any], metrics: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Index the best checkpoint of the active run in the model registry."""
+        if not best_model_path.exists():
+            return None
+        
+        run_id = mlflow.active_run().info.run_id
+        return await self.registry.register_version(
+            model_type,
+            str(best_model_path),
+            model_config,
+            metrics={name: float(value) for name, value in metrics.items() if isinstance(value, (int, float))},
+            version=run_id,
+            mlflow_model_uri=f"runs:/{run_id}/best_model"
+        )
+    
     def _create_optimizer(self, model: torch.nn.Module) -> torch.optim.Optimizer:
         """Create optimizer based on configuration."""
         
@@ -423,6 +540,75 @@ class MLTrainingOrchestrator:
         
         return loss.item()
     
+    def _create_link_loader(self, data, num_layers: Optional[int] = None) -> LinkNeighborLoader:
+        """Build a neighbor-sampled loader over the training supervision edges."""
+        
+        mini_batch_config = self.config.get('mini_batch', {})
+        num_neighbors = list(mini_batch_config.get('num_neighbors', [10, 10, 10]))
+        num_layers = num_layers or len(num_neighbors)
+        
+        # One fan-out per message passing layer
+        if len(num_neighbors) != num_layers:
+            logger.warning(
+                f"num_neighbors has {len(num_neighbors)} entries for a {num_layers}-layer model; "
+                f"padding/truncating to {num_layers}"
+            )
+            num_neighbors = (num_neighbors + [num_neighbors[-1]] * num_layers)[:num_layers]
+        
+        batch_size = mini_batch_config.get('batch_size', 1024)
+        num_workers = mini_batch_config.get('num_workers', 0)
+        mlflow.log_params({
+            'mini_batch_size': batch_size,
+            'num_neighbors': str(num_neighbors),
+            'num_workers': num_workers
+        })
+        
+        # Negatives are already in edge_label, so no extra negative sampling
+        return LinkNeighborLoader(
+            Data(x=data.x, edge_index=data.edge_index, num_nodes=data.num_nodes),
+            num_neighbors=num_neighbors,
+            edge_label_index=data.edge_label_index,
+            edge_label=data.edge_label,
+            batch_size=batch_size,
+            shuffle=True,
+            num_workers=num_workers,
+            persistent_workers=num_workers > 0
+        )
+    
+    def _train_mini_batch_epoch(self, model: torch.nn.Module,
+                                optimizer: torch.optim.Optimizer,
+                                loader: LinkNeighborLoader) -> Tuple[float, int]:
+        """Train for one epoch over sampled link batches (link prediction). Returns (loss, edges)."""
+        
+        model.train()
+        total_loss = 0.0
+        total_edges = 0
+        
+        for batch in loader:
+            optimizer.zero_grad()
+            
+            # Forward pass on the sampled subgraph; edge_label_index is already relabelled
+            out = model(batch.x, batch.edge_index, batch.edge_label_index).reshape(-1)
+            loss = F.binary_cross_entropy_with_logits(out, batch.edge_label)
+            
+            # Backward pass
+            loss.backward()
+            
+            # Gradient clipping
+            if self.config['training'].get('gradient_clip'):
+                torch.nn.utils.clip_grad_norm_(
+                    model.parameters(),
+                    self.config['training']['gradient_clip']
+                )
+            
+            optimizer.step()
+            
+            num_edges = batch.edge_label_index.size(1)
+            total_loss += loss.item() * num_edges
+            total_edges += num_edges
+        
+        return total_loss / max(total_edges, 1), total_edges
+    
     def _train_classification_epoch(self, model: torch.nn.Module, 
                                   optimizer: torch.optim.Optimizer, 
                                   data) -> float:
@@ -506,8 +692,8 @@ class MLTrainingOrchestrator:
             try:
                 logger.info(f"Starting training for {model_type}")
                 
-                if model_type == 'link_prediction':
-                    model, metrics = await self.train_link_prediction_model()
+                if model_type in ('link_prediction', 'graph_transformer'):
+                    model, metrics = await self.train_link_prediction_model(model_type)
                 elif model_type == 'node_classification':
                     model, metrics = await self.train_node_classification_model()
                 elif model_type == 'expertise_recommendation':
@@ -0,0 +1,90 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class NodeIdIndex:
+    """
+    Vectorized mapping from external node ids (e.g. GDS nodeId) to dense row indices.
+    Uses a dense lookup table for compact non-negative integer ids and
+    searchsorted over the sorted ids otherwise.
+    """
+    
+    # Use a dense table when max id <= DENSE_TABLE_FACTOR * num_nodes + DENSE_TABLE_SLACK
+    DENSE_TABLE_FACTOR = 4
+    DENSE_TABLE_SLACK = 1 << 16
+    
+    def __init__(self, node_ids: np.ndarray):
+        self.node_ids = np.asarray(node_ids)
+        self.num_nodes = len(self.node_ids)
+        self._table = None
+        self._sorted_ids = None
+        self._order = None
+        
+        if self.num_nodes and self.node_ids.dtype.kind in 'iu':
+            min_id = int(self.node_ids.min())
+            max_id = int(self.node_ids.max())
+            if min_id >= 0 and max_id <= self.DENSE_TABLE_FACTOR * self.num_nodes + self.DENSE_TABLE_SLACK:
+                self._table = np.full(max_id + 1, -1, dtype=np.int64)
+                # Reverse order so the first occurrence wins for duplicate ids
+                self._table[self.node_ids[::-1]] = np.arange(self.num_nodes - 1, -1, -1, dtype=np.int64)
+    
+    def _sorted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Argsort of the ids and the sorted ids, built on first use."""
+        if self._order is None:
+            self._order = np.argsort(self.node_ids, kind='stable')
+            self._sorted_ids = self.node_ids[self._order]
+        return self._order, self._sorted_ids
+    
+    def lookup(self, query_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Map ids to row indices. Returns (indices, found); indices are -1 where not found."""
+        query_ids = np.asarray(query_ids)
+        indices = np.full(len(query_ids), -1, dtype=np.int64)
+        if self.num_nodes == 0 or len(query_ids) == 0:
+            return indices, indices >= 0
+        
+        if self._table is not None and query_ids.dtype.kind in 'iu':
+            in_range = (query_ids >= 0) & (query_ids < len(self._table))
+            indices[in_range] = self._table[query_ids[in_range]]
+            return indices, indices >= 0
+        
+        order, sorted_ids = self._sorted()
+        positions = np.searchsorted(sorted_ids, query_ids)
+        positions = np.minimum(positions, self.num_nodes - 1)
+        found = sorted_ids[positions] == query_ids
+        indices[found] = order[positions[found]]
+        return indices, found
+    
+    def get(self, node_id) -> int:
+        """Row index for a single id, or -1."""
+        indices, _ = self.lookup(np.asarray([node_id]))
+        return int(indices[0])
+
+def node_features_from_export(nodes_df: pd.DataFrame) -> np.ndarray:
+    """Stack exported node embeddings into a contiguous float32 matrix."""
+    if nodes_df.empty:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(np.stack(nodes_df['embedding'].values), dtype=np.float32)
+
+def edge_index_from_export(edges_df: pd.DataFrame, id_index: NodeIdIndex,
+                           source_column: str = 'sourceNodeId',
+                           target_column: str = 'targetNodeId') -> np.ndarray:
+    """
+    Map exported edges to a (2, num_edges) int64 edge index.
+    Edges are kept only when both endpoints are known, so sources and targets stay aligned.
+    """
+    if edges_df.empty:
+        return np.empty((2, 0), dtype=np.int64)
+    
+    sources, source_found = id_index.lookup(edges_df[source_column].values)
+    targets, target_found = id_index.lookup(edges_df[target_column].values)
+    keep = source_found & target_found
+    
+    dropped = len(keep) - int(keep.sum())
+    if dropped:
+        logger.warning(f"Dropped {dropped} edges with unknown endpoints")
+    
+    return np.ascontiguousarray(np.stack([sources[keep], targets[keep]]), dtype=np.int64)
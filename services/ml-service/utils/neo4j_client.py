@@ -1,6 +1,6 @@
 import os
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 from neo4j import GraphDatabase, AsyncGraphDatabase
 from gds import GraphDataScience
 import logging
@@ -8,6 +8,9 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Labels with a name index (db/neo4j schema), preferred in order when anchoring lookups by name
+NAME_INDEXED_LABELS = ('Person', 'Topic', 'Entity')
+
 class Neo4jClient:
     """
     Neo4j client with Graph Data Science integration for ML pipeline.
@@ -38,6 +41,71 @@ class Neo4jClient:
         """Create a new async session."""
         return self.async_driver.session()
     
+    async def run_query(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run a query on its own async session and return all records as dicts."""
+        async with self.async_driver.session() as session:
+            result = await session.run(query, parameters or {})
+            return await result.data()
+    
+    async def find_existing_relationships(self, pairs: List[Dict[str, Any]],
+                                          chunk_size: int = 2000) -> Dict[Tuple[str, str, str], Any]:
+        """
+        Bulk relationship existence check. Pairs ({source, target, relationship_type} plus
+        optional source_label/target_label) are grouped by type and labels and resolved with
+        one UNWIND query per chunk; labelled endpoints are found through their name index.
+        A label may also be a tuple of labels, e.g. NAME_INDEXED_LABELS for a name whose
+        label is unknown: the endpoint is then looked up through each label's index.
+        Returns a hit map {(source, target, relationship_type): confidence}.
+        """
+        groups = {}
+        for pair in pairs:
+            key = (pair['relationship_type'], pair.get('source_label'), pair.get('target_label'))
+            groups.setdefault(key, []).append({'source': pair['source'], 'target': pair['target']})
+        
+        hits = {}
+        async with self.async_driver.session() as session:
+            for (relationship_type, source_label, target_label), group in groups.items():
+                query = self._existence_query(relationship_type, source_label, target_label)
+                for start in range(0, len(group), chunk_size):
+                    result = await session.run(query, {'pairs': group[start:start + chunk_size]})
+                    for record in await result.data():
+                        # First match wins, as with a single-pair lookup
+                        hits.setdefault((record['source'], record['target'], relationship_type), record['confidence'])
+        
+        return hits
+    
+    @staticmethod
+    def _existence_query(relationship_type: str, source_label: Union[str, Tuple[str, ...], None] = None,
+                         target_label: Union[str, Tuple[str, ...], None] = None) -> str:
+        """UNWIND query matching one relationship type between optionally labelled endpoints."""
+        def quote(identifier: str) -> str:
+            return '`' + identifier.replace('`', '``') + '`'
+        
+        subqueries = []
+        
+        def endpoint(variable: str, key: str, label: Union[str, Tuple[str, ...], None]) -> str:
+            if not isinstance(label, tuple):
+                anchored = f"{variable}:{quote(label)}" if label else variable
+                return f"({anchored} {{name: pair.{key}}})"
+            
+            # A UNION branch per label, each an index seek; a label disjunction in one MATCH is not
+            # planned as index seeks
+            branches = "\n                UNION\n".join(
+                f"                WITH pair MATCH ({variable}:{quote(option)} {{name: pair.{key}}}) RETURN {variable}"
+                for option in label
+            )
+            subqueries.append(f"CALL {{\n{branches}\n            }}")
+            return f"({variable})"
+        
+        source = endpoint('s', 'source', source_label)
+        target = endpoint('t', 'target', target_label)
+        clauses = ''.join(f"\n            {subquery}" for subquery in subqueries)
+        return f"""
+            UNWIND $pairs AS pair{clauses}
+            MATCH {source}-[r:{quote(relationship_type)}]->{target}
+            RETURN pair.source AS source, pair.target AS target, r.confidence AS confidence
+        """
+    
     async def verify_connection(self) -> bool:
         """Verify Neo4j connection."""
         try:
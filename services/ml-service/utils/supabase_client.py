@@ -105,20 +105,32 @@ class SupabaseClient:
     async def store_model_predictions(self, predictions: List[Dict[str, Any]]) -> bool:
         """Store model predictions for monitoring and feedback."""
         try:
-            prediction_records = []
-            for pred in predictions:
-                prediction_records.append({
-                    'model_type': pred['model_type'],
-                    'input_data': pred['input_data'],
-                    'prediction': pred['prediction'],
-                    'confidence': pred['confidence'],
-                    'timestamp': datetime.now().isoformat(),
-                    'model_version': pred.get('model_version'),
-                    'processing_time_ms': pred.get('processing_time_ms')
-                })
+            prediction_records = self.build_prediction_records(predictions)
+        except Exception as e:
+            logger.error(f"Failed to store model predictions: {e}")
+            return False
+        return self.insert_prediction_records(prediction_records)
             
+    def build_prediction_records(self, predictions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert predictions to ml_predictions rows, timestamped now."""
+        prediction_records = []
+        for pred in predictions:
+            prediction_records.append({
+                'model_type': pred['model_type'],
+                'input_data': pred['input_data'],
+                'prediction': pred['prediction'],
+                'confidence': pred['confidence'],
+                'timestamp': datetime.now().isoformat(),
+                'model_version': pred.get('model_version'),
+                'processing_time_ms': pred.get('processing_time_ms')
+            })
+        return prediction_records
+    
+    def insert_prediction_records(self, prediction_records: List[Dict[str, Any]]) -> bool:
+        """Bulk insert prediction rows. Blocking HTTP call."""
+        try:
             result = self.client.table('ml_predictions').insert(prediction_records).execute()
-            return len(result.data) == len(predictions)
+            return len(result.data) == len(prediction_records)
         except Exception as e:
             logger.error(f"Failed to store model predictions: {e}")
             return False
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+# The ML service is not a package; its modules import each other as top-level packages
+ML_SERVICE_DIR = Path(__file__).resolve().parents[2] / "services" / "ml-service"
+if str(ML_SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(ML_SERVICE_DIR))
+
+from fakes import DummyNeo4jClient, DummySupabaseClient, make_export  # noqa: E402
+
+
+@pytest.fixture()
+def ml_service_dir(monkeypatch):
+    """Run from the service directory so its config files are picked up."""
+    monkeypatch.chdir(ML_SERVICE_DIR)
+    return ML_SERVICE_DIR
+
+
+@pytest.fixture()
+def make_predictor(ml_service_dir):
+    """Build a RealTimePredictor over dummy clients with seeded, untrained encoder models."""
+    from inference.real_time_predictor import RealTimePredictor
+    from models.link_prediction import create_model
+
+    def build(export=None, model_types=("link_prediction", "expertise_recommendation"), **serving_config):
+        predictor = RealTimePredictor(DummyNeo4jClient(export), DummySupabaseClient())
+        for key, value in serving_config.items():
+            predictor.serving_config.setdefault(key, {}).update(value)
+
+        for model_type in model_types:
+            torch.manual_seed(0)
+            model = create_model(model_type, predictor.model_configs[model_type]).eval()
+            predictor._register_model(model_type, model, {})
+        return predictor
+
+    return build
+
+
+@pytest.fixture()
+def graph_export():
+    """Factory for GDS-style exports; see fakes.make_export."""
+    return make_export
+
+
+@pytest.fixture()
+def neo4j_client(graph_export):
+    """A dummy Neo4j client over the default export."""
+    return DummyNeo4jClient(graph_export())
+
+
+@pytest.fixture()
+def make_batch_predictor(tmp_path):
+    """Build a BatchPredictor sharing a predictor, running chunks in-process with results under tmp_path."""
+    from inference.batch_predictor import BatchPredictor
+
+    def build(predictor):
+        batch_predictor = BatchPredictor(predictor.neo4j, predictor.supabase, real_time_predictor=predictor)
+        batch_predictor.worker_pool = None
+        batch_predictor.chunk_concurrency = 1
+        batch_predictor.result_store.root = tmp_path
+        return batch_predictor
+
+    return build
@@ -0,0 +1,59 @@
+"""Stand-ins for the GDS export and the Neo4j/Supabase clients used by the ML service tests."""
+
+import numpy as np
+import pandas as pd
+
+
+class ExportedNode(dict):
+    """A node as returned by the GDS export: a property map with labels."""
+
+    def __init__(self, name, labels):
+        super().__init__(name=name)
+        self.labels = labels
+
+
+def make_export(num_nodes=600, num_edges=3000, dim=128, seed=0):
+    """A GDS-style export: every third node is a Person, the rest are Topics."""
+    rng = np.random.default_rng(seed)
+    names = [f"person{i}@example.com" if i % 3 == 0 else f"topic {i} graph" for i in range(num_nodes)]
+    nodes = pd.DataFrame({
+        "nodeId": np.arange(num_nodes) * 7,
+        "embedding": list(rng.normal(size=(num_nodes, dim)).astype("float32")),
+        "node": [ExportedNode(name, ["Person"] if i % 3 == 0 else ["Topic"]) for i, name in enumerate(names)],
+    })
+    edges = pd.DataFrame({
+        "sourceNodeId": rng.integers(0, num_nodes, num_edges) * 7,
+        "targetNodeId": rng.integers(0, num_nodes, num_edges) * 7,
+    })
+    return {"nodes": nodes, "edges": edges}
+
+
+class DummyNeo4jClient:
+    def __init__(self, export=None):
+        self.export = export if export is not None else make_export()
+        self.queries = []
+        self.records = []
+        self.existing = {}
+
+    def export_graph_data(self, graph_name):
+        return self.export
+
+    async def run_query(self, query, params=None):
+        self.queries.append((query, params))
+        return self.records
+
+    async def find_existing_relationships(self, pairs, chunk_size=2000, **kwargs):
+        keys = [(pair["source"], pair["target"], pair["relationship_type"]) for pair in pairs]
+        return {key: self.existing[key] for key in keys if key in self.existing}
+
+
+class DummySupabaseClient:
+    def __init__(self):
+        self.records = []
+
+    def build_prediction_records(self, predictions):
+        return predictions
+
+    def insert_prediction_records(self, records):
+        self.records.extend(records)
+        return True
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+
+def run_job(make_batch_predictor, predictor, prediction_type, entities):
+    """Run one batch job to completion; returns its final state and result rows."""
+    async def run():
+        await predictor.refresh_graph_snapshot()
+        batch_predictor = make_batch_predictor(predictor)
+        await batch_predictor.start()
+        job_id = await batch_predictor.submit_job(prediction_type, entities)
+        while job_id in batch_predictor.active_jobs:
+            await asyncio.sleep(0.01)
+        await batch_predictor.stop()
+
+        page = await batch_predictor.get_job_results(job_id)
+        return batch_predictor.job_results[job_id], [json.loads(line) for line in page["results"]]
+
+    return asyncio.run(run())
+
+
+def test_expertise_rows_for_unknown_topics_are_failed(make_predictor, make_batch_predictor):
+    predictor = make_predictor()
+    entities = [
+        {"id": "known", "topic": "topic 1 graph", "confidence_threshold": -1},
+        {"id": "unknown", "topic": "no such topic", "confidence_threshold": -1},
+    ]
+
+    job, rows = run_job(make_batch_predictor, predictor, "expertise_batch", entities)
+
+    assert (job["processed_entities"], job["failed_entities"]) == (1, 1)
+    statuses = {row["entity_id"]: row["status"] for row in rows}
+    assert statuses == {"known": "success", "unknown": "failed"}
+    assert rows[0]["experts"] and "error" in rows[1]
+
+
+def test_expertise_rows_fail_without_a_model(make_predictor, make_batch_predictor):
+    predictor = make_predictor(model_types=("link_prediction",))
+
+    job, rows = run_job(make_batch_predictor, predictor, "expertise_batch", [{"id": "1", "topic": "topic 1 graph"}])
+
+    assert (job["processed_entities"], job["failed_entities"]) == (0, 1)
+    assert rows[0]["status"] == "failed"
+    assert "not available" in rows[0]["error"]
+
+
+def test_link_rows_fail_without_a_model(make_predictor, make_batch_predictor):
+    predictor = make_predictor(model_types=("expertise_recommendation",))
+    entities = [{"id": "1", "source": "topic 1 graph", "target": "topic 2 graph"}]
+
+    job, rows = run_job(make_batch_predictor, predictor, "link_prediction_batch", entities)
+
+    assert (job["processed_entities"], job["failed_entities"]) == (0, 1)
+    assert rows[0]["status"] == "failed"
+    assert rows[0]["prediction"]["source"] == "default_fallback"
+
+
+def test_link_rows_fail_when_the_pass_errors(make_predictor, make_batch_predictor, monkeypatch):
+    predictor = make_predictor()
+
+    async def broken_embeddings(*args, **kwargs):
+        raise RuntimeError("encode failed")
+
+    monkeypatch.setattr(predictor, "_get_node_embeddings", broken_embeddings)
+    predictor.neo4j.existing = {("topic 1 graph", "topic 2 graph", "RELATED_TO"): 0.9}
+    entities = [
+        {"id": "existing", "source": "topic 1 graph", "target": "topic 2 graph"},
+        {"id": "scored", "source": "topic 4 graph", "target": "topic 5 graph"},
+    ]
+
+    job, rows = run_job(make_batch_predictor, predictor, "link_prediction_batch", entities)
+
+    assert (job["processed_entities"], job["failed_entities"]) == (0, 2)
+    assert {row["status"] for row in rows} == {"failed"}
+    assert rows[1]["error"] == "encode failed"
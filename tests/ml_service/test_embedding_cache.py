@@ -0,0 +1,91 @@
+import asyncio
+
+import torch
+
+from fakes import make_export
+from inference.embedding_cache import EmbeddingCache
+from inference.graph_snapshot import GraphSnapshot
+
+
+def snapshot(version):
+    return GraphSnapshot.from_export(make_export(num_nodes=30, num_edges=60, dim=8), version)
+
+
+def counting_encoder():
+    calls = []
+
+    def encode(x, edge_index):
+        calls.append(x.shape[0])
+        return x * 2
+
+    return encode, calls
+
+
+def test_entries_are_keyed_by_model_generation_and_snapshot_version():
+    cache = EmbeddingCache()
+    first, second = snapshot(1), snapshot(2)
+    encode, calls = counting_encoder()
+
+    built = cache.build("link_prediction", encode, 1, first)
+
+    assert cache.get("link_prediction", 1, first) is built
+    assert cache.get("link_prediction", 2, first) is None
+    assert cache.get("link_prediction", 1, second) is None
+    assert cache.get("expertise_recommendation", 1, first) is None
+    assert calls == [30]
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 3
+
+
+def test_only_the_newest_versions_per_model_are_kept():
+    cache = EmbeddingCache(max_versions=2)
+    snapshots = [snapshot(version) for version in (1, 2, 3)]
+    encode, _ = counting_encoder()
+
+    for version in snapshots:
+        cache.build("link_prediction", encode, 1, version)
+    cache.build("expertise_recommendation", encode, 1, snapshots[0])
+
+    assert cache.get("link_prediction", 1, snapshots[0]) is None
+    assert cache.get("link_prediction", 1, snapshots[1]) is not None
+    assert cache.get("link_prediction", 1, snapshots[2]) is not None
+    # Other model types keep their own versions
+    assert cache.get("expertise_recommendation", 1, snapshots[0]) is not None
+
+
+def test_invalidate_drops_one_model_type_or_all():
+    cache = EmbeddingCache()
+    current = snapshot(1)
+    encode, _ = counting_encoder()
+    cache.build("link_prediction", encode, 1, current)
+    cache.build("expertise_recommendation", encode, 1, current)
+
+    cache.invalidate("link_prediction")
+    assert cache.get("link_prediction", 1, current) is None
+    assert cache.get("expertise_recommendation", 1, current) is not None
+
+    cache.invalidate()
+    assert cache.get("expertise_recommendation", 1, current) is None
+
+
+def test_predictor_encodes_once_per_snapshot_and_again_after_a_model_swap(make_predictor):
+    predictor = make_predictor(model_types=("link_prediction",))
+
+    async def run():
+        snapshot = await predictor.refresh_graph_snapshot()
+        builds = predictor.embedding_cache.stats["builds"]
+        first = await predictor._get_node_embeddings("link_prediction", snapshot)
+        again = await predictor._get_node_embeddings("link_prediction", snapshot)
+        unchanged = predictor.embedding_cache.stats["builds"] == builds
+
+        predictor._register_model("link_prediction", predictor.models["link_prediction"], {})
+        rebuilt = await predictor._get_node_embeddings("link_prediction", snapshot)
+        return snapshot, first, again, unchanged, rebuilt
+
+    snapshot, first, again, unchanged, rebuilt = asyncio.run(run())
+
+    assert again is first
+    assert unchanged
+    assert rebuilt is not first
+    with torch.no_grad():
+        expected = predictor.models["link_prediction"].encode(snapshot.x, snapshot.edge_index_tensor)
+    torch.testing.assert_close(rebuilt, expected, rtol=1e-4, atol=1e-5)
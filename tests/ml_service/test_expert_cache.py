@@ -0,0 +1,59 @@
+import asyncio
+
+import torch
+
+from models.link_prediction import ExpertiseRecommendationGNN
+
+CONFIG = {"gnn_type": "sage", "input_dim": 16, "hidden_dim": 32, "num_layers": 2, "dropout": 0.25}
+
+
+def expertise_model():
+    torch.manual_seed(0)
+    return ExpertiseRecommendationGNN(CONFIG).eval()
+
+
+def test_cached_terms_reproduce_predict_expertise():
+    model = expertise_model()
+    persons = torch.randn(200, 32)
+    topic = torch.randn(32)
+
+    with torch.no_grad():
+        expected = model.predict_expertise(persons, topic.expand(200, -1))
+        scores = model.score_topics(topic, model.build_expert_cache(persons))
+
+    torch.testing.assert_close(scores, expected, rtol=1e-5, atol=1e-6)
+
+
+def test_top_experts_with_and_without_the_cache_agree():
+    model = expertise_model()
+    persons = torch.randn(200, 32)
+    names = [f"person{i}" for i in range(200)]
+    topic = torch.randn(32)
+
+    with torch.no_grad():
+        uncached = model.get_top_experts(topic, persons, names, k=10)
+        cached = model.get_top_experts(topic, persons, names, k=10, expert_cache=model.build_expert_cache(persons))
+
+    assert [e["name"] for e in cached] == [e["name"] for e in uncached]
+    torch.testing.assert_close(
+        torch.tensor([e["confidence"] for e in cached]), torch.tensor([e["confidence"] for e in uncached])
+    )
+
+
+def test_predictor_expert_state_holds_the_person_rows_terms(make_predictor):
+    predictor = make_predictor(model_types=("expertise_recommendation",), expert_retrieval={"mode": "exact"})
+
+    async def run():
+        snapshot = await predictor.refresh_graph_snapshot()
+        embeddings = await predictor._get_node_embeddings("expertise_recommendation", snapshot)
+        return snapshot, embeddings, predictor._get_expert_state(snapshot)
+
+    snapshot, embeddings, state = asyncio.run(run())
+
+    assert state["index"] is None
+    assert state["person_nodes"].tolist() == snapshot.person_indices.tolist()
+    expected = predictor.models["expertise_recommendation"].build_expert_cache(
+        embeddings[torch.from_numpy(snapshot.person_indices)]
+    )
+    for key, value in expected.items():
+        torch.testing.assert_close(state["expert_cache"][key], value)
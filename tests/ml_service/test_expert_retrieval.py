@@ -0,0 +1,84 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from inference.vector_index import IVFIndex
+
+
+def clustered(num_vectors, dim, num_clusters, rng, spread=0.3):
+    centers = rng.normal(size=(num_clusters, dim))
+    return (centers[rng.integers(0, num_clusters, num_vectors)] + spread * rng.normal(size=(num_vectors, dim))).astype(
+        "float32"
+    )
+
+
+def recall(index, vectors, queries, k, nprobe):
+    hits = 0
+    for query in queries:
+        ids, _ = index.search(query, k, nprobe=nprobe)
+        exact = np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:k]
+        hits += len(set(ids.tolist()) & set(exact.tolist()))
+    return hits / (k * len(queries))
+
+
+def test_inner_product_index_ranks_by_weighted_score():
+    rng = np.random.default_rng(0)
+    # Scorer-weighted person vectors: direction times a per-person weight
+    directions = clustered(4000, 32, 40, rng)
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    vectors = directions * rng.uniform(0.05, 1.0, size=(4000, 1)).astype("float32")
+    queries = clustered(50, 32, 40, rng)
+    index = IVFIndex(vectors, num_lists=40, metric="inner_product")
+
+    assert recall(index, vectors, queries, k=10, nprobe=index.num_lists) == 1.0
+    assert recall(index, vectors, queries, k=10, nprobe=8) >= 0.9
+
+    ids, scores = index.search(queries[0], 5, nprobe=index.num_lists)
+    np.testing.assert_allclose(scores, vectors[ids] @ (queries[0] / np.linalg.norm(queries[0])), rtol=1e-4, atol=1e-5)
+
+
+def test_cosine_index_is_unchanged_by_vector_norms():
+    rng = np.random.default_rng(1)
+    vectors = clustered(1000, 16, 10, rng)
+    index = IVFIndex(vectors * rng.uniform(0.1, 10, size=(1000, 1)).astype("float32"), num_lists=10)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    assert recall(index, normalized, vectors[:20], k=5, nprobe=10) == 1.0
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError):
+        IVFIndex(np.ones((4, 2), dtype="float32"), metric="l2")
+
+
+def test_ann_shortlist_with_full_probing_matches_exact_predict_expertise(make_predictor):
+    exact = make_predictor(model_types=("expertise_recommendation",), expert_retrieval={"mode": "exact"})
+    ann = make_predictor(
+        model_types=("expertise_recommendation",),
+        expert_retrieval={"mode": "ann", "min_persons": 50, "nprobe": 10 ** 6, "min_candidates": 20},
+    )
+
+    async def run():
+        await exact.refresh_graph_snapshot()
+        await ann.refresh_graph_snapshot()
+        snapshot = ann.snapshot_manager.current
+        topics = [name for name in snapshot.node_names if name.startswith("topic")][:40]
+
+        pairs = []
+        for topic in topics:
+            pairs.append((
+                await exact.predict_expertise(topic, max_experts=5, confidence_threshold=-1),
+                await ann.predict_expertise(topic, max_experts=5, confidence_threshold=-1),
+            ))
+        return pairs, ann._get_expert_state(snapshot)
+
+    pairs, expert_state = asyncio.run(run())
+
+    assert expert_state["index"] is not None
+    assert expert_state["index"].metric == "inner_product"
+    for exact_experts, ann_experts in pairs:
+        assert [e["name"] for e in ann_experts] == [e["name"] for e in exact_experts]
+        np.testing.assert_allclose(
+            [e["confidence"] for e in ann_experts], [e["confidence"] for e in exact_experts], rtol=1e-5
+        )
@@ -0,0 +1,90 @@
+import asyncio
+
+
+def topics_of(predictor, count):
+    names = predictor.snapshot_manager.current.node_names
+    return [name for name in names if name.startswith("topic")][:count]
+
+
+def test_batched_scoring_matches_single_topic_predictions(make_predictor):
+    predictor = make_predictor(expert_retrieval={"mode": "exact"}, expertise_batch={"chunk_size": 7})
+
+    async def run():
+        await predictor.refresh_graph_snapshot()
+        topics = topics_of(predictor, 20)
+        batched = await predictor.predict_expertise_batch(topics, max_experts=5, confidence_threshold=-1)
+        predictor.clear_cache()
+        single = [
+            await predictor.predict_expertise(topic, max_experts=5, confidence_threshold=-1)
+            for topic in topics
+        ]
+        return batched, single
+
+    batched, single = asyncio.run(run())
+
+    assert all(len(experts) == 5 for experts in batched)
+    for batch_experts, single_experts in zip(batched, single):
+        assert [e["name"] for e in batch_experts] == [e["name"] for e in single_experts]
+        for b, s in zip(batch_experts, single_experts):
+            assert abs(b["confidence"] - s["confidence"]) < 1e-5
+
+
+def test_expertise_jobs_are_chunked_by_the_gemm_size(make_predictor, make_batch_predictor, monkeypatch):
+    predictor = make_predictor(expertise_batch={"chunk_size": 64})
+    calls = []
+    predict = predictor.predict_expertise_batch
+
+    async def recording_predict(topics, **kwargs):
+        calls.append(len(topics))
+        return await predict(topics, **kwargs)
+
+    monkeypatch.setattr(predictor, "predict_expertise_batch", recording_predict)
+
+    async def run():
+        await predictor.refresh_graph_snapshot()
+        batch_predictor = make_batch_predictor(predictor)
+        await batch_predictor.start()
+
+        topics = topics_of(predictor, 150)
+        job_id = await batch_predictor.submit_job(
+            "expertise_batch", [{"id": str(i), "topic": topic} for i, topic in enumerate(topics)]
+        )
+        while job_id in batch_predictor.active_jobs:
+            await asyncio.sleep(0.01)
+        await batch_predictor.stop()
+        return batch_predictor.job_results[job_id]
+
+    job = asyncio.run(run())
+
+    assert job["status"] == "completed"
+    assert job["processed_entities"] == 150
+    assert calls == [64, 64, 22]
+
+
+
+def batch_cache_hits_after_single_topic_calls(predictor):
+    async def run():
+        await predictor.refresh_graph_snapshot()
+        topics = topics_of(predictor, 5)
+        for topic in topics:
+            await predictor.predict_expertise(topic, max_experts=5, confidence_threshold=-1)
+        hits = predictor.performance_metrics["cache_hits"]
+        await predictor.predict_expertise_batch(topics, max_experts=5, confidence_threshold=-1)
+        return predictor.performance_metrics["cache_hits"] - hits
+
+    return asyncio.run(run())
+
+
+def test_batch_reuses_exact_single_topic_results(make_predictor):
+    predictor = make_predictor(expert_retrieval={"mode": "exact"})
+
+    assert batch_cache_hits_after_single_topic_calls(predictor) == 5
+
+
+def test_batch_never_serves_ann_shortlisted_results(make_predictor):
+    predictor = make_predictor(expert_retrieval={"mode": "ann", "min_persons": 50, "nprobe": 1, "min_candidates": 5})
+
+    hits = batch_cache_hits_after_single_topic_calls(predictor)
+
+    assert predictor._expert_retrieval_mode(predictor.snapshot_manager.current) == "ann"
+    assert hits == 0
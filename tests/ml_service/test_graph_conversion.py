@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.graph_conversion import NodeIdIndex, edge_index_from_export
+
+
+def reference_index(node_ids):
+    """Plain dict mapping; the first occurrence of a duplicate id wins."""
+    mapping = {}
+    for row, node_id in enumerate(node_ids):
+        mapping.setdefault(node_id, row)
+    return mapping
+
+
+def reference_edges(node_ids, sources, targets):
+    mapping = reference_index(node_ids)
+    kept = [(mapping[s], mapping[t]) for s, t in zip(sources, targets) if s in mapping and t in mapping]
+    return np.asarray(kept, dtype=np.int64).reshape(-1, 2).T
+
+
+def id_sets():
+    rng = np.random.default_rng(0)
+    compact = rng.permutation(500) * 3
+    sparse = rng.choice(10 ** 12, size=500, replace=False)
+    negative = np.concatenate([compact[:250], -compact[250:] - 1])
+    duplicated = np.concatenate([compact[:400], compact[:100]])
+    return {
+        "dense_compact": (compact, True),
+        "dense_with_duplicates": (duplicated, True),
+        "searchsorted_sparse": (sparse, False),
+        "searchsorted_negative": (negative, False),
+        "searchsorted_strings": (np.asarray([f"n{i}" for i in compact]), False),
+    }
+
+
+@pytest.mark.parametrize("case", list(id_sets()))
+def test_lookup_matches_a_dict(case):
+    node_ids, dense = id_sets()[case]
+    index = NodeIdIndex(node_ids)
+    assert (index._table is not None) == dense
+
+    rng = np.random.default_rng(1)
+    # Known ids in shuffled order plus ids that are not in the index, including out-of-range ones
+    unknown = np.asarray(["missing", "n-1"]) if node_ids.dtype.kind == "U" else np.asarray(
+        [-7, 1, 2, 10 ** 13, int(np.max(node_ids)) + 1], dtype=np.int64
+    )
+    queries = np.concatenate([rng.permutation(node_ids), unknown])
+    mapping = reference_index(node_ids.tolist())
+
+    indices, found = index.lookup(queries)
+
+    expected = [mapping.get(query, -1) for query in queries.tolist()]
+    assert indices.tolist() == expected
+    assert found.tolist() == [value >= 0 for value in expected]
+    assert index.get(queries[0]) == expected[0]
+
+
+@pytest.mark.parametrize("case", list(id_sets()))
+def test_edges_with_unknown_endpoints_are_dropped_in_pairs(case):
+    node_ids, _ = id_sets()[case]
+    rng = np.random.default_rng(2)
+    known = node_ids[rng.integers(0, len(node_ids), 2000)]
+    unknown = np.asarray(["missing"] * 2000) if node_ids.dtype.kind == "U" else np.full(2000, -99, dtype=np.int64)
+    # Unknown sources and unknown targets at different rows, so a per-column filter would misalign them
+    sources = np.where(rng.random(2000) < 0.1, unknown, known)
+    targets = np.where(rng.random(2000) < 0.1, unknown, node_ids[rng.integers(0, len(node_ids), 2000)])
+    edges = pd.DataFrame({"sourceNodeId": sources, "targetNodeId": targets})
+
+    edge_index = edge_index_from_export(edges, NodeIdIndex(node_ids))
+
+    assert edge_index.dtype == np.int64
+    assert edge_index.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(edge_index, reference_edges(node_ids.tolist(), sources.tolist(), targets.tolist()))
+
+
+def test_empty_inputs():
+    assert edge_index_from_export(pd.DataFrame(), NodeIdIndex(np.arange(3))).shape == (2, 0)
+
+    indices, found = NodeIdIndex(np.empty(0, dtype=np.int64)).lookup(np.asarray([1, 2]))
+    assert indices.tolist() == [-1, -1]
+    assert not found.any()
@@ -0,0 +1,94 @@
+import asyncio
+
+from inference.graph_snapshot import GraphSnapshotManager
+
+
+def test_snapshot_is_published_after_preparers_and_before_listeners(neo4j_client):
+    manager = GraphSnapshotManager(neo4j_client)
+    seen = []
+
+    async def preparer(snapshot):
+        seen.append(("prepare", snapshot.version, manager.current.version if manager.current else None))
+
+    async def listener(snapshot):
+        seen.append(("listen", snapshot.version, manager.current.version))
+
+    manager.add_preparer(preparer)
+    manager.add_listener(listener)
+
+    async def run():
+        await manager.refresh()
+        await manager.refresh()
+
+    asyncio.run(run())
+
+    assert seen == [("prepare", 1, None), ("listen", 1, 1), ("prepare", 2, 1), ("listen", 2, 2)]
+
+
+def test_failed_preparer_still_publishes(neo4j_client):
+    manager = GraphSnapshotManager(neo4j_client)
+
+    async def preparer(snapshot):
+        raise RuntimeError("boom")
+
+    manager.add_preparer(preparer)
+    snapshot = asyncio.run(manager.refresh())
+
+    assert manager.current is snapshot
+    assert manager.last_refresh_error is None
+
+
+def test_predictor_swaps_snapshot_with_its_embeddings_and_expert_state(make_predictor, graph_export):
+    predictor = make_predictor(expert_retrieval={"mode": "exact"})
+    model_types = ("link_prediction", "expertise_recommendation")
+    observed = {}
+
+    async def check_prepared(snapshot):
+        old = predictor.snapshot_manager.current
+        generation = predictor.model_generations
+        observed["old_version"] = old.version
+        observed["new_ready"] = all(
+            predictor.embedding_cache.get(model_type, generation[model_type], snapshot) is not None
+            for model_type in model_types
+        ) and predictor._get_expert_state(snapshot) is not None
+        # The previous pair keeps serving until the swap
+        observed["old_ready"] = all(
+            predictor.embedding_cache.get(model_type, generation[model_type], old) is not None
+            for model_type in model_types
+        ) and predictor._get_expert_state(old) is not None
+
+    async def run():
+        await predictor.refresh_graph_snapshot()
+        predictor.snapshot_manager.neo4j.export = graph_export(seed=1)
+        predictor.snapshot_manager.add_preparer(check_prepared)
+        await predictor.refresh_graph_snapshot()
+
+        builds = predictor.embedding_cache.stats["builds"]
+        snapshot = predictor.snapshot_manager.current
+        topic = next(name for name in snapshot.node_names if name.startswith("topic"))
+        experts = await predictor.predict_expertise(topic, max_experts=3, confidence_threshold=-1)
+        return snapshot, builds, experts
+
+    snapshot, builds, experts = asyncio.run(run())
+
+    assert snapshot.version == 2
+    assert observed == {"old_version": 1, "new_ready": True, "old_ready": True}
+    # Requests on the new snapshot are served from what was prepared
+    assert predictor.embedding_cache.stats["builds"] == builds == 4
+    assert len(experts) == 3
+
+
+def test_refresh_endpoint_reports_a_failed_build_as_503(ml_service_dir, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    class FailingPredictor:
+        async def refresh_graph_snapshot(self):
+            return None
+
+    monkeypatch.setattr(main, "predictor", FailingPredictor())
+    response = TestClient(main.app).post("/graph/snapshot/refresh")
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Graph snapshot could not be built"
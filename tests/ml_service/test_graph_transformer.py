@@ -0,0 +1,114 @@
+import pytest
+import torch
+import torch.nn.functional as F
+
+from models.link_prediction import create_model
+from training.benchmark_attention import _run_benchmark
+
+CONFIG = {"input_dim": 8, "hidden_dim": 16, "num_layers": 2, "num_heads": 4, "dropout": 0.0}
+
+
+def transformer(**overrides):
+    torch.manual_seed(0)
+    return create_model("graph_transformer", {**CONFIG, **overrides}).eval()
+
+
+def path_graph(num_nodes):
+    """Undirected path 0 - 1 - ... - (n-1)."""
+    forward = torch.stack([torch.arange(num_nodes - 1), torch.arange(1, num_nodes)])
+    return torch.cat([forward, forward.flip(0)], dim=1)
+
+
+def encode_with_perturbed_node(model, x, edge_index, node, batch=None):
+    perturbed = x.clone()
+    perturbed[node] += 5.0
+    with torch.no_grad():
+        return model.encode(x, edge_index, batch), model.encode(perturbed, edge_index, batch)
+
+
+def test_sparse_attention_only_reaches_nodes_within_num_layers_hops():
+    model = transformer(attention_mode="sparse", global_token=False)
+    x = torch.randn(10, CONFIG["input_dim"], generator=torch.Generator().manual_seed(1))
+
+    before, after = encode_with_perturbed_node(model, x, path_graph(10), node=0)
+
+    changed = (after - before).abs().amax(dim=1) > 1e-6
+    # Two layers: node 0 reaches nodes 0-2 and nothing further
+    assert changed.tolist() == [True] * 3 + [False] * 7
+
+
+def test_global_token_carries_context_across_the_whole_graph():
+    model = transformer(attention_mode="sparse", global_token=True)
+    x = torch.randn(10, CONFIG["input_dim"], generator=torch.Generator().manual_seed(1))
+
+    before, after = encode_with_perturbed_node(model, x, path_graph(10), node=0)
+
+    assert ((after - before).abs().amax(dim=1) > 1e-6).all()
+
+
+def test_each_graph_in_a_batch_gets_its_own_global_token():
+    model = transformer(attention_mode="sparse", global_token=True)
+    x = torch.randn(12, CONFIG["input_dim"], generator=torch.Generator().manual_seed(2))
+    edge_index = torch.cat([path_graph(6), path_graph(6) + 6], dim=1)
+    batch = torch.tensor([0] * 6 + [1] * 6)
+
+    with torch.no_grad():
+        batched = model.encode(x, edge_index, batch)
+        first_alone = model.encode(x[:6], path_graph(6))
+    torch.testing.assert_close(batched[:6], first_alone)
+
+    before, after = encode_with_perturbed_node(model, x, edge_index, node=0, batch=batch)
+    torch.testing.assert_close(after[6:], before[6:])
+
+
+def test_sparse_mode_handles_graphs_without_edges():
+    model = transformer(attention_mode="sparse")
+
+    with torch.no_grad():
+        z = model.encode(torch.randn(5, CONFIG["input_dim"]), torch.empty(2, 0, dtype=torch.long))
+
+    assert z.shape == (5, CONFIG["hidden_dim"])
+    assert torch.isfinite(z).all()
+
+
+def test_dense_mode_keeps_its_original_parameters():
+    dense = transformer()
+
+    assert dense.attention_mode == "dense"
+    assert not any(name.startswith("global_token") for name, _ in dense.named_parameters())
+    assert isinstance(dense.transformer_layers[0], torch.nn.TransformerEncoderLayer)
+
+
+@pytest.mark.parametrize("overrides", [{"attention_mode": "linear"}, {"attention_mode": "sparse", "num_heads": 3}])
+def test_invalid_configs_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        transformer(**overrides)
+
+
+def test_sparse_mode_trains_end_to_end():
+    model = transformer(attention_mode="sparse", global_token=True).train()
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-2)
+    generator = torch.Generator().manual_seed(3)
+    x = torch.randn(50, CONFIG["input_dim"], generator=generator)
+    edge_index = torch.randint(0, 50, (2, 200), generator=generator)
+    edge_label_index = torch.randint(0, 50, (2, 64), generator=generator)
+    edge_label = torch.randint(0, 2, (64,), generator=generator).float()
+
+    losses = []
+    for _ in range(30):
+        optimizer.zero_grad()
+        loss = F.binary_cross_entropy_with_logits(model(x, edge_index, edge_label_index), edge_label)
+        loss.backward()
+        losses.append(loss.item())
+        optimizer.step()
+
+    assert model.global_token.grad is not None and model.global_token.grad.abs().sum() > 0
+    assert losses[-1] < losses[0]
+
+
+@pytest.mark.parametrize("attention_mode", ["dense", "sparse"])
+def test_benchmark_runs_each_mode(attention_mode):
+    result = _run_benchmark({**CONFIG, "attention_mode": attention_mode}, num_nodes=200, avg_degree=4, runs=1)
+
+    assert set(result) == {"train_step_ms", "inference_ms", "peak_memory_mb"}
+    assert result["train_step_ms"] > 0 and result["inference_ms"] > 0
@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+from inference.job_executor import JobExecutor, JobQueueFull
+
+
+class ControlledJobs:
+    """run_job for an executor: each job waits until released, recording start order."""
+
+    def __init__(self):
+        self.started = []
+        self.releases = {}
+
+    async def run(self, job_id):
+        self.started.append(job_id)
+        release = self.releases.setdefault(job_id, asyncio.Event())
+        await release.wait()
+        if job_id.startswith("fail"):
+            raise RuntimeError("job failed")
+
+    def release(self, job_id):
+        self.releases.setdefault(job_id, asyncio.Event()).set()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_higher_priority_jobs_start_first_then_fifo():
+    async def run():
+        jobs = ControlledJobs()
+        executor = JobExecutor(jobs.run, max_concurrent_jobs=1)
+        executor.submit("blocker", "expertise_batch")
+        for job_id, priority in (("low", 0), ("high", 5), ("low-2", 0), ("high-2", 5)):
+            executor.submit(job_id, "expertise_batch", priority)
+        await settle()
+        assert executor.queued_count() == 4
+
+        for job_id in ("blocker", "high", "high-2", "low", "low-2"):
+            jobs.release(job_id)
+            await settle()
+        return jobs.started, executor.stats
+
+    started, stats = asyncio.run(run())
+
+    assert started == ["blocker", "high", "high-2", "low", "low-2"]
+    assert stats["completed"] == 5
+
+
+def test_per_type_limits_let_other_types_run():
+    async def run():
+        jobs = ControlledJobs()
+        executor = JobExecutor(jobs.run, max_concurrent_jobs=3, type_limits={"link_prediction_batch": 1})
+        executor.submit("link-1", "link_prediction_batch")
+        executor.submit("link-2", "link_prediction_batch", priority=10)
+        executor.submit("expertise", "expertise_batch")
+        await settle()
+        running_before = set(executor.get_status()["running"])
+
+        jobs.release("link-1")
+        await settle()
+        running_after = set(executor.get_status()["running"])
+
+        for job_id in ("link-2", "expertise"):
+            jobs.release(job_id)
+        await settle()
+        return running_before, running_after
+
+    running_before, running_after = asyncio.run(run())
+
+    assert running_before == {"link-1", "expertise"}
+    assert running_after == {"link-2", "expertise"}
+
+
+def test_jobs_over_the_timeout_are_cancelled_and_reported():
+    timed_out = []
+
+    async def on_timeout(job_id):
+        timed_out.append(job_id)
+
+    async def run():
+        jobs = ControlledJobs()
+        executor = JobExecutor(jobs.run, on_timeout=on_timeout, job_timeout=0.05)
+        executor.submit("slow", "expertise_batch")
+        await asyncio.sleep(0.2)
+        return executor.stats, executor.get_status()["running"]
+
+    stats, running = asyncio.run(run())
+
+    assert timed_out == ["slow"]
+    assert stats["timed_out"] == 1 and stats["completed"] == 0
+    assert running == {}
+
+
+def test_failed_jobs_are_not_counted_as_completed():
+    async def run():
+        jobs = ControlledJobs()
+        executor = JobExecutor(jobs.run)
+        executor.submit("fail-1", "expertise_batch")
+        executor.submit("ok", "expertise_batch")
+        jobs.release("fail-1")
+        jobs.release("ok")
+        await settle()
+        return executor.stats
+
+    stats = asyncio.run(run())
+
+    assert (stats["completed"], stats["failed"]) == (1, 1)
+
+
+def test_submissions_beyond_the_queue_bound_are_rejected_with_a_wait_estimate():
+    async def run():
+        jobs = ControlledJobs()
+        executor = JobExecutor(jobs.run, max_queue_size=1, max_concurrent_jobs=1, default_run_time=30)
+        executor.submit("running", "expertise_batch")
+        executor.submit("queued", "expertise_batch")
+        with pytest.raises(JobQueueFull) as rejected:
+            executor.submit("rejected", "expertise_batch")
+        await executor.stop()
+        return rejected.value, executor.stats
+
+    rejected, stats = asyncio.run(run())
+
+    # One running and one queued job ahead, one slot: two waves of the default run time
+    assert rejected.retry_after == 60
+    assert stats["rejected"] == 1 and stats["submitted"] == 2
+
+
+def test_batch_jobs_that_fail_are_counted_as_failed(make_predictor, make_batch_predictor):
+    async def run():
+        batch_predictor = make_batch_predictor(make_predictor())
+        await batch_predictor.start()
+        job_id = await batch_predictor.submit_job("unknown_batch", [{"id": "1"}])
+        while job_id in batch_predictor.active_jobs:
+            await asyncio.sleep(0.01)
+        status = batch_predictor.get_system_status()
+        await batch_predictor.stop()
+        return batch_predictor.job_results[job_id], status
+
+    job, status = asyncio.run(run())
+
+    assert job["status"] == "failed"
+    assert "Unknown prediction type" in job["error"]
+    assert (status["executor"]["completed"], status["executor"]["failed"]) == (0, 1)
+    assert status["system_healthy"]
+
+
+@pytest.fixture()
+def batch_client(ml_service_dir, monkeypatch):
+    """POST /predict/batch against a given batch predictor."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    def post(batch_predictor):
+        monkeypatch.setattr(main, "batch_predictor", batch_predictor)
+        return TestClient(main.app).post(
+            "/predict/batch", json={"prediction_type": "expertise_batch", "entities": [{"topic": "graphs"}]}
+        )
+
+    return post
+
+
+def test_full_queue_returns_429_with_retry_after(batch_client):
+    class FullBatchPredictor:
+        async def submit_job(self, **kwargs):
+            raise JobQueueFull("Batch queue is full (100 jobs queued)", retry_after=42)
+
+    response = batch_client(FullBatchPredictor())
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "42"
+
+
+def test_missing_batch_predictor_returns_503(batch_client):
+    assert batch_client(None).status_code == 503
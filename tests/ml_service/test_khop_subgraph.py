@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+import torch
+from torch_geometric.utils import k_hop_subgraph
+
+from fakes import make_export
+from inference.graph_snapshot import GraphSnapshot
+from models.link_prediction import create_model
+
+CONFIG = {"input_dim": 16, "hidden_dim": 32, "num_layers": 3, "dropout": 0.2}
+
+
+@pytest.fixture()
+def snapshot():
+    # Sparse enough that 3-4 hops stay well short of the whole graph
+    return GraphSnapshot.from_export(make_export(num_nodes=2000, num_edges=2400, dim=16, seed=3), version=1)
+
+
+def link_predictor(make_predictor, gnn_type):
+    predictor = make_predictor(model_types=())
+    config = {**CONFIG, "gnn_type": gnn_type}
+    predictor.model_configs["link_prediction"] = config
+    torch.manual_seed(0)
+    predictor._register_model("link_prediction", create_model("link_prediction", config).eval(), {})
+    return predictor
+
+
+def full_graph_probability(model, snapshot, source, target):
+    with torch.no_grad():
+        z = model.encode(snapshot.x, snapshot.edge_index_tensor)
+        return float(torch.sigmoid(model.decode(z, torch.tensor([[source], [target]]))).reshape(-1)[0])
+
+
+def sample_pairs(snapshot, count=20):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, snapshot.num_nodes, size=(count, 2)).tolist()
+
+
+def test_subset_matches_pyg_k_hop_subgraph(snapshot):
+    for seeds in ([0, 1], [5], [17, 900, 1500]):
+        for num_hops in (1, 2, 4):
+            subset, edge_index = snapshot.k_hop_subgraph(seeds, num_hops)
+            expected, _, _, _ = k_hop_subgraph(
+                seeds, num_hops, snapshot.edge_index_tensor, num_nodes=snapshot.num_nodes
+            )
+
+            assert subset.tolist() == sorted(expected.tolist())
+            assert edge_index.max(initial=-1) < len(subset)
+
+
+@pytest.mark.parametrize("gnn_type", ["gcn", "sage", "gat"])
+def test_subgraph_scores_equal_full_graph_scores(make_predictor, snapshot, gnn_type):
+    predictor = link_predictor(make_predictor, gnn_type)
+    model = predictor.models["link_prediction"]
+
+    subgraph_sizes = []
+    for source, target in sample_pairs(snapshot):
+        expected = full_graph_probability(model, snapshot, source, target)
+        actual = predictor._predict_link_subgraph(model, snapshot, source, target)
+        assert actual == pytest.approx(expected, rel=1e-4, abs=1e-5)
+        subgraph_sizes.append(len(snapshot.k_hop_subgraph([source, target], predictor._receptive_hops(model))[0]))
+
+    # The parity is not trivial: the subgraphs are a fraction of the graph
+    assert max(subgraph_sizes) < snapshot.num_nodes // 2
+
+
+@pytest.mark.parametrize("gnn_type, hops", [("gcn", 4), ("sage", 3), ("gat", 3)])
+def test_receptive_hops_per_architecture(make_predictor, gnn_type, hops):
+    predictor = link_predictor(make_predictor, gnn_type)
+
+    assert predictor._receptive_hops(predictor.models["link_prediction"]) == hops
+
+
+def test_gcn_needs_the_extra_hop_for_its_degree_normalization(make_predictor, snapshot):
+    predictor = link_predictor(make_predictor, "gcn")
+    model = predictor.models["link_prediction"]
+
+    def subgraph_probability(source, target, num_hops):
+        subset, edge_index = snapshot.k_hop_subgraph([source, target], num_hops)
+        positions = torch.from_numpy(np.searchsorted(subset, [source, target]).astype(np.int64)).reshape(2, 1)
+        with torch.no_grad():
+            z = model.encode(snapshot.x[torch.from_numpy(subset)], torch.from_numpy(edge_index))
+            return float(torch.sigmoid(model.decode(z, positions)).reshape(-1)[0])
+
+    differences = [
+        abs(subgraph_probability(source, target, len(model.convs))
+            - full_graph_probability(model, snapshot, source, target))
+        for source, target in sample_pairs(snapshot)
+    ]
+
+    assert max(differences) > 1e-4
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from utils.neo4j_client import Neo4jClient
+
+
+class BarrierNeo4jClient:
+    """Answers both expert queries only once both are in flight, so a sequential caller times out."""
+
+    def __init__(self, direct, indirect):
+        self.direct = direct
+        self.indirect = indirect
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.both_started = None
+
+    async def run_query(self, query, params=None):
+        if self.both_started is None:
+            self.both_started = asyncio.Event()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.in_flight == 2:
+            self.both_started.set()
+        await asyncio.wait_for(self.both_started.wait(), timeout=5)
+        self.in_flight -= 1
+        return self.direct if "HAS_EXPERTISE" in query else self.indirect
+
+
+class ThreadRecordingSupabase:
+    """Mimics the sync supabase-py query builder and records which thread executes the query."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.threads = []
+        self.client = self
+
+    def table(self, name):
+        return self
+
+    def select(self, *args):
+        return self
+
+    def ilike(self, *args):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    def execute(self):
+        self.threads.append(threading.get_ident())
+        return SimpleNamespace(data=self.rows)
+
+
+def expert(name, confidence):
+    return {"name": name, "email": f"{name}@example.com", "confidence": confidence,
+            "source": "manual", "topic_name": "graphs"}
+
+
+def test_lookups_run_concurrently_and_supabase_runs_off_the_loop(make_predictor):
+    predictor = make_predictor(model_types=())
+    predictor.neo4j = BarrierNeo4jClient(
+        direct=[expert("ada", 0.9), expert("bob", 0.5)],
+        indirect=[{**expert("cy", 0.4), "document_count": 4}],
+    )
+    predictor.supabase = ThreadRecordingSupabase([{"content": "dee wrote about graphs", "source_metadata": {}}])
+
+    async def run():
+        return await predictor.search_knowledge_for_experts("graphs", max_experts=4), threading.get_ident()
+
+    experts, loop_thread = asyncio.run(run())
+
+    assert predictor.neo4j.max_in_flight == 2
+    assert predictor.supabase.threads and predictor.supabase.threads[0] != loop_thread
+    # Direct matches first, then indirect, then Supabase, trimmed to max_experts
+    assert [(e["name"], e.get("method", e["source"])) for e in experts] == [
+        ("ada", "direct_expertise"),
+        ("bob", "direct_expertise"),
+        ("cy", "indirect_expertise"),
+        ("dee", "knowledge_substrate"),
+    ]
+
+
+def test_enough_confident_direct_matches_skip_the_rest(make_predictor):
+    predictor = make_predictor(model_types=())
+    predictor.neo4j = BarrierNeo4jClient(
+        direct=[expert("ada", 0.95), expert("bob", 0.9)],
+        indirect=[{**expert("cy", 0.4), "document_count": 4}],
+    )
+    predictor.supabase = ThreadRecordingSupabase([])
+
+    experts = asyncio.run(predictor.search_knowledge_for_experts("graphs", max_experts=2))
+
+    assert [e["name"] for e in experts] == ["ada", "bob"]
+
+
+def test_run_query_uses_its_own_async_session_per_call():
+    sessions = []
+
+    class Result:
+        async def data(self):
+            await asyncio.sleep(0)
+            return [{"ok": 1}]
+
+    class Session:
+        def __init__(self):
+            self.open = False
+            sessions.append(self)
+
+        async def __aenter__(self):
+            self.open = True
+            return self
+
+        async def __aexit__(self, *exc):
+            self.open = False
+
+        async def run(self, query, params):
+            await asyncio.sleep(0)
+            return Result()
+
+    client = Neo4jClient.__new__(Neo4jClient)
+    client.async_driver = SimpleNamespace(session=Session)
+
+    async def run():
+        return await asyncio.gather(client.run_query("RETURN 1"), client.run_query("RETURN 2"))
+
+    try:
+        assert asyncio.run(run()) == [[{"ok": 1}], [{"ok": 1}]]
+        assert len(sessions) == 2
+        assert not any(session.open for session in sessions)
+    finally:
+        # Nothing to close on the fake driver
+        del client.async_driver
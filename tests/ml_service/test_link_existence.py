@@ -0,0 +1,110 @@
+import asyncio
+
+from fakes import DummyNeo4jClient, ExportedNode, make_export
+from utils.neo4j_client import NAME_INDEXED_LABELS, Neo4jClient
+
+
+class LabelledNeo4jClient(DummyNeo4jClient):
+    """Matches relationships like the UNWIND query: labelled endpoints must carry the label."""
+
+    def __init__(self, export=None):
+        super().__init__(export)
+        self.node_labels = {}
+        self.calls = []
+
+    def _matches(self, name, label):
+        if not label:
+            return True
+        options = label if isinstance(label, tuple) else (label,)
+        return any(option in self.node_labels.get(name, ()) for option in options)
+
+    async def find_existing_relationships(self, pairs, chunk_size=2000, **kwargs):
+        self.calls.append(pairs)
+        hits = {}
+        for pair in pairs:
+            key = (pair["source"], pair["target"], pair["relationship_type"])
+            if key not in self.existing:
+                continue
+            if self._matches(pair["source"], pair.get("source_label")) and self._matches(
+                pair["target"], pair.get("target_label")
+            ):
+                hits[key] = self.existing[key]
+        return hits
+
+
+def test_existence_query_quotes_identifiers():
+    query = Neo4jClient._existence_query("KNOWS]->(x) DETACH DELETE x //", "Per`son", None)
+
+    assert "[r:`KNOWS]->(x) DETACH DELETE x //`]" in query
+    assert "(s:`Per``son` {name: pair.source})" in query
+    assert "(t {name: pair.target})" in query
+
+
+def test_single_link_check_goes_through_the_quoted_bulk_resolver(make_predictor):
+    predictor = make_predictor()
+    predictor.neo4j = LabelledNeo4jClient(predictor.neo4j.export)
+    predictor.neo4j.node_labels = {"a": {"Person"}, "b": {"Topic"}}
+    predictor.neo4j.existing[("a", "b", "KNOWS]->() DETACH DELETE s //")] = 0.9
+
+    result = asyncio.run(predictor.predict_link("a", "b", "KNOWS]->() DETACH DELETE s //"))
+
+    assert result["source"] == "knowledge_substrate"
+    assert result["probability"] == 0.9
+    assert predictor.neo4j.queries == []
+
+
+def test_unknown_names_are_looked_up_through_every_name_index():
+    query = Neo4jClient._existence_query("KNOWS", NAME_INDEXED_LABELS, "Topic")
+
+    for label in NAME_INDEXED_LABELS:
+        assert f"WITH pair MATCH (s:`{label}` {{name: pair.source}}) RETURN s" in query
+    assert query.count("UNION") == len(NAME_INDEXED_LABELS) - 1
+    assert "MATCH (s)-[r:`KNOWS`]->(t:`Topic` {name: pair.target})" in query
+
+
+def test_endpoints_are_anchored_on_snapshot_labels_without_retrying_misses(make_predictor):
+    export = make_export()
+    # A name the snapshot only has on a label without a name index
+    export["nodes"].at[2, "node"] = ExportedNode("report", ["Document"])
+    predictor = make_predictor(export)
+    neo4j = LabelledNeo4jClient(export)
+    predictor.neo4j = neo4j
+
+    async def run():
+        snapshot = await predictor.refresh_graph_snapshot()
+        person, topic = snapshot.node_names[0], snapshot.node_names[1]
+        # The snapshot still says Person, but the node has since been relabelled
+        neo4j.node_labels = {
+            person: {"Expert"}, topic: {"Topic"}, "report": {"Document"}, "new person": {"Person"}
+        }
+        neo4j.existing.update({
+            (person, topic, "HAS_EXPERTISE"): 0.8,
+            ("new person", topic, "HAS_EXPERTISE"): 0.7,
+            ("report", topic, "MENTIONS"): 0.6,
+        })
+        hits = await predictor._find_existing_links(
+            [(person, topic, "HAS_EXPERTISE"), ("new person", topic, "HAS_EXPERTISE"), ("report", topic, "MENTIONS")],
+            snapshot,
+        )
+        return topic, hits
+
+    topic, hits = asyncio.run(run())
+
+    # The relabelled node is picked up by the next snapshot, not by an unanchored retry
+    assert hits == {("new person", topic, "HAS_EXPERTISE"): 0.7, ("report", topic, "MENTIONS"): 0.6}
+    (requests,) = neo4j.calls
+    assert [(r["source_label"], r["target_label"]) for r in requests] == [
+        ("Person", "Topic"), (NAME_INDEXED_LABELS, "Topic"), (None, "Topic")
+    ]
+
+
+def test_without_a_snapshot_every_name_uses_the_name_indexes(make_predictor):
+    predictor = make_predictor()
+    neo4j = LabelledNeo4jClient(predictor.neo4j.export)
+    predictor.neo4j = neo4j
+
+    asyncio.run(predictor._find_existing_links([("a", "b", "KNOWS")], None))
+
+    assert [(r["source_label"], r["target_label"]) for r in neo4j.calls[0]] == [
+        (NAME_INDEXED_LABELS, NAME_INDEXED_LABELS)
+    ]
@@ -0,0 +1,102 @@
+import importlib.util
+
+import pytest
+import torch
+from torch_geometric.data import Data
+
+from models.link_prediction import create_model
+from training import trainer as trainer_module
+from training.trainer import MLTrainingOrchestrator
+
+MODEL_CONFIG = {"gnn_type": "sage", "input_dim": 8, "hidden_dim": 16, "num_layers": 3, "dropout": 0.0}
+
+requires_sampler = pytest.mark.skipif(
+    importlib.util.find_spec("pyg_lib") is None and importlib.util.find_spec("torch_sparse") is None,
+    reason="neighbor sampling needs pyg-lib or torch-sparse",
+)
+
+
+@pytest.fixture()
+def orchestrator(monkeypatch):
+    """A trainer with only its config set; no clients or MLflow tracking."""
+    monkeypatch.setattr(trainer_module.mlflow, "log_params", lambda params: None)
+    orchestrator = MLTrainingOrchestrator.__new__(MLTrainingOrchestrator)
+    orchestrator.config = {
+        "training": {"gradient_clip": 1.0},
+        "mini_batch": {"enabled": True, "num_neighbors": [5, 3], "batch_size": 16, "num_workers": 0},
+    }
+    return orchestrator
+
+
+def link_split(num_nodes=120, num_edges=480, num_labels=100, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    return Data(
+        x=torch.randn(num_nodes, MODEL_CONFIG["input_dim"], generator=generator),
+        edge_index=torch.randint(0, num_nodes, (2, num_edges), generator=generator),
+        edge_label_index=torch.randint(0, num_nodes, (2, num_labels), generator=generator),
+        edge_label=(torch.rand(num_labels, generator=generator) > 0.5).float(),
+        num_nodes=num_nodes,
+    )
+
+
+def model_and_optimizer():
+    torch.manual_seed(0)
+    model = create_model("link_prediction", MODEL_CONFIG)
+    return model, torch.optim.SGD(model.parameters(), lr=0.1)
+
+
+@pytest.mark.parametrize("num_neighbors, expected", [([5, 3], [5, 3, 3]), ([5, 3, 2, 1], [5, 3, 2])])
+def test_fan_out_is_padded_or_truncated_to_the_model_depth(orchestrator, num_neighbors, expected):
+    orchestrator.config["mini_batch"]["num_neighbors"] = num_neighbors
+
+    loader = orchestrator._create_link_loader(link_split(), num_layers=3)
+
+    assert loader.link_sampler.num_neighbors.values == expected
+    assert loader.batch_size == 16
+
+
+def test_one_batch_over_the_whole_graph_matches_a_full_batch_step(orchestrator):
+    data = link_split()
+    full_model, full_optimizer = model_and_optimizer()
+    batch_model, batch_optimizer = model_and_optimizer()
+
+    full_loss = orchestrator._train_epoch(full_model, full_optimizer, data)
+    batch_loss, num_edges = orchestrator._train_mini_batch_epoch(batch_model, batch_optimizer, [data])
+
+    assert num_edges == data.edge_label_index.size(1)
+    assert batch_loss == pytest.approx(full_loss, rel=1e-6)
+    for full_param, batch_param in zip(full_model.parameters(), batch_model.parameters()):
+        torch.testing.assert_close(batch_param, full_param)
+
+
+def test_epoch_loss_is_weighted_by_edges_per_batch(orchestrator):
+    data = link_split()
+    batches = [
+        Data(x=data.x, edge_index=data.edge_index,
+             edge_label_index=data.edge_label_index[:, start:stop], edge_label=data.edge_label[start:stop])
+        for start, stop in ((0, 10), (10, 100))
+    ]
+
+    # Reference: one full-batch step per batch, in order, on an identical model
+    reference_model, reference_optimizer = model_and_optimizer()
+    step_losses = [orchestrator._train_epoch(reference_model, reference_optimizer, batch) for batch in batches]
+
+    model, optimizer = model_and_optimizer()
+    loss, num_edges = orchestrator._train_mini_batch_epoch(model, optimizer, batches)
+
+    assert num_edges == 100
+    assert loss == pytest.approx((step_losses[0] * 10 + step_losses[1] * 90) / 100, rel=1e-6)
+
+
+@requires_sampler
+def test_sampled_epoch_covers_every_supervision_edge(orchestrator):
+    data = link_split()
+    model, optimizer = model_and_optimizer()
+
+    loader = orchestrator._create_link_loader(data, num_layers=MODEL_CONFIG["num_layers"])
+    sizes = [batch.edge_label_index.size(1) for batch in loader]
+    loss, num_edges = orchestrator._train_mini_batch_epoch(model, optimizer, loader)
+
+    assert max(sizes) <= 16
+    assert num_edges == sum(sizes) == data.edge_label_index.size(1)
+    assert loss > 0
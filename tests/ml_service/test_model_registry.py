@@ -0,0 +1,263 @@
+import asyncio
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from mlops.model_registry import LEASE_DIR, ModelRegistry, load_weights
+from models.link_prediction import create_model
+
+requires_proc_maps = pytest.mark.skipif(not Path("/proc/self/maps").exists(), reason="needs /proc/self/maps")
+
+
+class FakeQuery:
+    def __init__(self, table, action):
+        self.table = table
+        self.action = action
+        self.filters = {}
+
+    def select(self, *args):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        self.table.threads.append(threading.current_thread())
+        if self.action == "delete":
+            self.table.rows = [row for row in self.table.rows if row["id"] != self.filters["id"]]
+            return SimpleNamespace(data=[])
+        rows = [row for row in self.table.rows if all(row.get(k) == v for k, v in self.filters.items())]
+        return SimpleNamespace(data=rows)
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.threads = []
+
+    def select(self, *args):
+        return FakeQuery(self, "select")
+
+    def delete(self):
+        return FakeQuery(self, "delete")
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.registry = FakeTable(rows)
+
+    def table(self, name):
+        return self.registry
+
+
+def make_versions(tmp_path, count):
+    rows = []
+    for i in reversed(range(count)):
+        path = tmp_path / f"link_prediction_best_run{i}.pt"
+        torch.save(torch.nn.Linear(2, 2).state_dict(), path)
+        rows.append({
+            "id": i, "model_type": "link_prediction", "version": f"run{i}", "model_path": str(path),
+            "status": "production" if i == count - 1 else "archived",
+        })
+    return rows
+
+
+def mapped_from(tensor, path):
+    """Whether a tensor's data lies in a memory mapping of the file at path."""
+    pointer = tensor.data_ptr()
+    with open("/proc/self/maps") as maps:
+        for line in maps:
+            fields = line.split()
+            if len(fields) >= 6 and fields[5] == str(path):
+                start, end = (int(address, 16) for address in fields[0].split("-"))
+                if start <= pointer < end:
+                    return True
+    return False
+
+
+@pytest.mark.parametrize("zipfile", [True, False])
+def test_load_weights_round_trip(tmp_path, zipfile):
+    source = torch.nn.Linear(3, 2)
+    # Legacy (non-zipfile) checkpoints cannot be mapped and are read normally
+    torch.save(source.state_dict(), tmp_path / "model.pt", _use_new_zipfile_serialization=zipfile)
+
+    model = load_weights(torch.nn.Linear(3, 2), str(tmp_path / "model.pt"))
+
+    assert not model.training
+    for name, value in source.state_dict().items():
+        assert torch.equal(model.state_dict()[name], value)
+
+
+@requires_proc_maps
+def test_load_weights_maps_the_checkpoint(tmp_path):
+    path = tmp_path / "model.pt"
+    torch.save(torch.nn.Linear(300, 200).state_dict(), path)
+
+    model = load_weights(torch.nn.Linear(300, 200), str(path))
+
+    assert mapped_from(model.weight, path)
+
+
+def test_resolve_and_cleanup_query_supabase_off_the_event_loop(tmp_path):
+    supabase = FakeSupabase(make_versions(tmp_path, 4))
+    registry = ModelRegistry(supabase, {"storage_path": str(tmp_path), "max_versions": 2})
+
+    async def run():
+        record = await registry.resolve("link_prediction")
+        removed = await registry.cleanup("link_prediction")
+        return record, removed
+
+    record, removed = asyncio.run(run())
+
+    assert record["version"] == "run3"
+    assert sorted(removed) == ["run0", "run1"]
+    assert supabase.registry.threads
+    assert threading.main_thread() not in supabase.registry.threads
+    assert not (tmp_path / "link_prediction_best_run0.pt").exists()
+
+
+def test_cleanup_keeps_versions_leased_by_other_processes(tmp_path):
+    rows = make_versions(tmp_path, 4)
+    registry = ModelRegistry(FakeSupabase(rows), {"storage_path": str(tmp_path), "max_versions": 1})
+    lease_dir = tmp_path / LEASE_DIR
+    lease_dir.mkdir()
+
+    # run0 is served by a replica on another host; run1 was leased by a local process that exited
+    (lease_dir / "link_prediction_best_run0.pt.other-host.1").touch()
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    stale = lease_dir / f"link_prediction_best_run1.pt.{socket.gethostname()}.{exited.pid}"
+    stale.touch()
+    # This process serves run2, and keeps its lease while the model is evicted
+    registry.cache_size = 1
+    registry.put_resident("link_prediction", "run2", torch.nn.Linear(2, 2), rows[1]["model_path"])
+    registry.put_resident("expertise_recommendation", "run9", torch.nn.Linear(2, 2))
+
+    removed = asyncio.run(registry.cleanup("link_prediction"))
+
+    assert removed == ["run1"]
+    assert not stale.exists()
+    assert (tmp_path / "link_prediction_best_run0.pt").exists()
+    assert (tmp_path / "link_prediction_best_run2.pt").exists()
+
+    registry.release_leases()
+    assert asyncio.run(registry.cleanup("link_prediction")) == ["run2"]
+
+
+def test_resident_models_are_evicted_least_recently_used_first(tmp_path):
+    registry = ModelRegistry(None, {"storage_path": str(tmp_path)}, cache_size=2)
+    model = torch.nn.Linear(2, 2)
+
+    assert registry.put_resident("a", "1", model) == []
+    assert registry.put_resident("b", "1", model) == []
+    assert registry.get_resident("a") == ("1", model)
+    assert registry.put_resident("c", "1", model) == ["b"]
+    assert registry.get_resident("b") is None
+    assert registry.get_status()["resident"] == {"a": "1", "c": "1"}
+
+
+ENCODER_CONFIG = {"gnn_type": "sage", "input_dim": 128, "hidden_dim": 32, "num_layers": 2, "dropout": 0.0}
+
+
+@pytest.fixture()
+def registry_predictor(make_predictor, tmp_path):
+    """A predictor whose registry holds one saved checkpoint per encoder model type."""
+    predictor = make_predictor(model_types=())
+    predictor.registry = ModelRegistry(None, {"storage_path": str(tmp_path)}, cache_size=3)
+    for model_type in predictor.ENCODER_MODEL_TYPES:
+        predictor.model_configs[model_type] = dict(ENCODER_CONFIG)
+        torch.manual_seed(0)
+        torch.save(create_model(model_type, ENCODER_CONFIG).state_dict(), tmp_path / f"{model_type}_best_run1.pt")
+    return predictor
+
+
+def test_latest_models_are_resolved_but_loaded_on_first_use(registry_predictor, tmp_path):
+    predictor = registry_predictor
+
+    async def run():
+        await predictor.load_latest_models()
+        unloaded = dict(predictor.models)
+        model = await predictor._get_model("link_prediction")
+        return unloaded, model
+
+    unloaded, model = asyncio.run(run())
+
+    assert unloaded == {}
+    assert predictor.is_ready()
+    assert set(predictor.models) == {"link_prediction"}
+    assert predictor.model_metadata["link_prediction"]["resident"]
+    assert predictor.model_metadata["expertise_recommendation"] == {
+        "path": str(tmp_path / "expertise_recommendation_best_run1.pt"),
+        "version": "run1",
+        "status": "production",
+        "resident": False,
+    }
+    # Both artifacts are leased from the start, so cleanup cannot remove them before first use
+    assert set(predictor.registry.get_status()["leases"]) == set(predictor.ENCODER_MODEL_TYPES)
+
+    torch.manual_seed(0)
+    expected = create_model("link_prediction", ENCODER_CONFIG).state_dict()
+    for name, value in model.state_dict().items():
+        assert torch.equal(value, expected[name])
+
+
+def test_warmup_loads_the_encoders_it_warms(registry_predictor):
+    predictor = registry_predictor
+
+    async def run():
+        await predictor.load_latest_models()
+        return await predictor.warmup_models(sample_size=4)
+
+    status = asyncio.run(run())
+
+    assert status["state"] == "completed"
+    assert set(predictor.models) == set(predictor.ENCODER_MODEL_TYPES)
+
+
+def test_evicted_models_reload_their_version_on_next_use(registry_predictor):
+    predictor = registry_predictor
+    predictor.registry.cache_size = 1
+
+    async def run():
+        await predictor.load_latest_models()
+        await predictor._get_model("link_prediction")
+        await predictor._get_model("expertise_recommendation")
+        evicted = set(predictor.models)
+        reloaded = await predictor._get_model("link_prediction")
+        return evicted, reloaded
+
+    evicted, reloaded = asyncio.run(run())
+
+    assert evicted == {"expertise_recommendation"}
+    assert reloaded is predictor.models["link_prediction"]
+    assert predictor.model_metadata["link_prediction"]["version"] == "run1"
+    assert not predictor.model_metadata["expertise_recommendation"]["resident"]
+
+
+@requires_proc_maps
+def test_eager_and_sparse_serving_keep_the_weights_mapped(registry_predictor, tmp_path):
+    predictor = registry_predictor
+
+    async def run():
+        await predictor.load_latest_models()
+        await predictor.refresh_graph_snapshot()
+        return await predictor._get_model("link_prediction")
+
+    model = asyncio.run(run())
+    backend = predictor._full_graph_backend("link_prediction", predictor.snapshot_manager.current)
+
+    path = tmp_path / "link_prediction_best_run1.pt"
+    assert predictor.serving_backends["link_prediction"].name == "eager"
+    assert all(mapped_from(param, path) for param in model.parameters())
+    assert backend.name == "sparse"
+    assert all(mapped_from(param, path) for param in backend.module.parameters())
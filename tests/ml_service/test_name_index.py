@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from inference.name_index import NodeNameIndex
+
+NAMES = [
+    "Graph Neural Networks",
+    "graph graph graph",
+    "aaaaaa",
+    "aaa",
+    "banana bandana",
+    "Zoë Ångström",
+    "zoë ångström",
+    "ΣΊΣΥΦΟΣ",
+    "東京大学 machine learning",
+    "İstanbul",
+    "ab",
+    "",
+    "person1@example.com",
+    "Machine Learning",
+    "learning to learn",
+] * 3
+
+QUERIES = [
+    "graph", "GRAPH GRAPH", "aaaa", "aa", "a", "", "ana", "anaban", "nab",
+    "zoë", "ÅNGSTRÖM", "σίσυφος", "東京", "東", "İst", "i̇", "@example",
+    "learn", "ing to", "not there", "ab", "ba", "hine l",
+]
+
+
+def brute_force(query):
+    return [idx for idx, name in enumerate(NAMES) if query.lower() in name.lower()]
+
+
+@pytest.fixture(params=[2, 3, 4], ids=lambda n: f"ngram{n}")
+def index(request):
+    return NodeNameIndex(NAMES, ngram_size=request.param)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_contains_matches_a_substring_scan(index, query):
+    assert index.contains(query).tolist() == brute_force(query)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_limited_contains_returns_the_first_matches(index, query, monkeypatch):
+    # Tiny chunks make the early exit cross several chunk boundaries
+    monkeypatch.setattr(NodeNameIndex, "CANDIDATE_CHUNK", 2)
+    expected = brute_force(query)
+
+    for limit in (1, 2, 5):
+        assert index.contains(query, limit=limit).tolist() == expected[:limit]
+
+    assert index.first_containing(query) == (expected[0] if expected else None)
+
+
+@pytest.mark.parametrize("query", QUERIES + NAMES[:15])
+def test_exact_matches_a_normalized_equality_scan(index, query):
+    expected = [idx for idx, name in enumerate(NAMES) if name.lower() == query.lower()]
+
+    assert index.exact(query).tolist() == expected
+
+
+def test_random_names_and_queries_agree_with_a_scan():
+    rng = np.random.default_rng(0)
+    alphabet = list("abcab é") + ["ß", "Σ"]
+    names = ["".join(rng.choice(alphabet, size=rng.integers(0, 12))) for _ in range(500)]
+    index = NodeNameIndex(names)
+
+    for name in names[:200]:
+        start = rng.integers(0, len(name) + 1)
+        query = name[start:start + rng.integers(0, 6)]
+        expected = [idx for idx, candidate in enumerate(names) if query.lower() in candidate.lower()]
+        assert index.contains(query).tolist() == expected
+        assert index.first_containing(query) == (expected[0] if expected else None)
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+import torch
+
+from models.node_classification import create_classification_model
+
+
+@pytest.fixture()
+def classifier_predictor(make_predictor):
+    """A predictor serving a seeded, untrained classifier as its node_classification model."""
+    predictor = make_predictor(model_types=())
+    config = {**predictor.model_configs["node_classification"], "num_layers": 2}
+    predictor.model_configs["node_classification"] = config
+    torch.manual_seed(0)
+    predictor._register_model(
+        "node_classification", create_classification_model("document_classification", config).eval(), {}
+    )
+    return predictor
+
+
+def expected_logits(predictor, snapshot):
+    with torch.no_grad():
+        return predictor.models["node_classification"](snapshot.x, snapshot.edge_index_tensor)
+
+
+def test_classification_inputs_resolve_each_name_once_against_cached_logits(classifier_predictor):
+    predictor = classifier_predictor
+
+    async def run():
+        snapshot = await predictor.refresh_graph_snapshot()
+        first = await predictor.get_classification_inputs(["topic 1 graph", "missing", "topic 1 graph"])
+        second = await predictor.get_classification_inputs(["topic 1 graph"])
+        return snapshot, first, second
+
+    snapshot, first, second = asyncio.run(run())
+
+    assert first["snapshot"] is snapshot
+    assert first["node_indices"] == {"topic 1 graph": 1, "missing": None}
+    assert first["generation"] == predictor.model_generations["node_classification"]
+    torch.testing.assert_close(first["logits"], expected_logits(predictor, snapshot), rtol=1e-4, atol=1e-5)
+    assert second["logits"] is first["logits"]
+
+
+def test_classification_inputs_need_a_model(make_predictor):
+    predictor = make_predictor(model_types=())
+
+    async def run():
+        await predictor.refresh_graph_snapshot()
+        await predictor.get_classification_inputs(["topic 1 graph"])
+
+    with pytest.raises(ValueError, match="not available"):
+        asyncio.run(run())
+
+
+def test_classification_job_matches_the_full_graph_forward_pass(classifier_predictor, make_batch_predictor):
+    predictor = classifier_predictor
+    entities = [
+        {"id": "a", "node_name": "topic 1 graph"},
+        {"id": "b", "node_name": "missing"},
+        {"id": "c", "node_name": "person3@example.com"},
+    ]
+
+    async def run():
+        snapshot = await predictor.refresh_graph_snapshot()
+        batch_predictor = make_batch_predictor(predictor)
+        await batch_predictor.start()
+        job_id = await batch_predictor.submit_job("node_classification_batch", entities)
+        while job_id in batch_predictor.active_jobs:
+            await asyncio.sleep(0.01)
+        await batch_predictor.stop()
+        page = await batch_predictor.get_job_results(job_id)
+        return snapshot, batch_predictor.job_results[job_id], [json.loads(line) for line in page["results"]]
+
+    snapshot, job, rows = asyncio.run(run())
+
+    assert job["status"] == "completed"
+    assert (job["processed_entities"], job["failed_entities"]) == (2, 1)
+    assert [row["status"] for row in rows] == ["success", "failed", "success"]
+
+    probabilities = torch.softmax(expected_logits(predictor, snapshot), dim=1)
+    for row, node_idx in ((rows[0], 1), (rows[2], 3)):
+        expected = probabilities[node_idx]
+        assert row["classification"]["predicted_class"] == int(expected.argmax())
+        assert row["classification"]["class_probabilities"] == pytest.approx(expected.tolist(), abs=1e-5)
@@ -0,0 +1,97 @@
+import pytest
+
+from inference import prediction_cache
+from inference.prediction_cache import PredictionCache
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    """Controllable time.monotonic for the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def key(name, model_type="link_prediction", generation=1, version=1):
+    return PredictionCache.make_key(model_type, {"source": name}, generation, version)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = PredictionCache(max_entries=3)
+    for name in ("a", "b", "c"):
+        cache.put(key(name), {"name": name})
+
+    # Reading "a" makes "b" the least recently used
+    assert cache.get(key("a")) == {"name": "a"}
+    cache.put(key("d"), {"name": "d"})
+
+    assert cache.get(key("b")) is None
+    assert [cache.get(key(name))["name"] for name in ("a", "c", "d")] == ["a", "c", "d"]
+    assert cache.model_stats["link_prediction"]["evictions"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = PredictionCache(ttl_seconds=10)
+    cache.put(key("a"), 0.9)
+
+    clock[0] += 9.9
+    assert cache.get(key("a")) == 0.9
+
+    # Reads do not extend the lifetime
+    clock[0] += 0.2
+    assert cache.get(key("a")) is None
+    assert len(cache) == 0
+    assert cache.memory_bytes == 0
+    assert cache.model_stats["link_prediction"]["expirations"] == 1
+
+
+def test_memory_bound_evicts_until_entries_fit():
+    cache = PredictionCache(max_entries=1000, max_memory_mb=2 / 1024)
+    value = {"payload": "x" * 500}
+    for name in "abcdefgh":
+        cache.put(key(name), value)
+
+    assert 0 < cache.memory_bytes <= cache.max_memory_bytes
+    assert len(cache) < 8
+    # The survivors are the most recently written
+    assert cache.get(key("h")) == value
+    assert cache.get(key("a")) is None
+
+
+def test_value_larger_than_the_memory_bound_is_not_cached():
+    cache = PredictionCache(max_memory_mb=1 / 1024)
+    cache.put(key("small"), 1.0)
+    cache.put(key("huge"), "x" * 4096)
+
+    assert cache.get(key("huge")) is None
+    assert cache.get(key("small")) == 1.0
+
+
+def test_get_and_put_copy_values():
+    cache = PredictionCache()
+    experts = [{"name": "ada", "confidence": 0.9}]
+    cache.put(key("topic"), experts)
+
+    # predict_expertise tags the returned experts in place; the cached list must not change
+    experts[0]["source"] = "written after put"
+    returned = cache.get(key("topic"))
+    returned[0]["source"] = "ml_prediction"
+
+    assert cache.get(key("topic")) == [{"name": "ada", "confidence": 0.9}]
+
+
+def test_keys_normalize_whitespace_and_separate_versions():
+    assert key("graph  neural\tnets") == key("graph neural nets")
+    assert key("a", generation=1) != key("a", generation=2)
+    assert key("a", version=1) != key("a", version=2)
+
+
+def test_clear_by_model_type_releases_its_memory():
+    cache = PredictionCache()
+    cache.put(key("a"), 0.5)
+    cache.put(key("b", model_type="expertise_recommendation"), [])
+
+    assert cache.clear("link_prediction") == 1
+    assert len(cache) == 1
+    assert cache.clear() == 1
+    assert cache.memory_bytes == 0
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+from fakes import DummySupabaseClient
+from inference.prediction_logger import PredictionLogBuffer
+
+
+class RecordingSupabaseClient(DummySupabaseClient):
+    def __init__(self, succeed=True):
+        super().__init__()
+        self.succeed = succeed
+        self.batches = []
+        self.threads = []
+
+    def insert_prediction_records(self, records):
+        self.batches.append(len(records))
+        self.threads.append(threading.get_ident())
+        return super().insert_prediction_records(records) and self.succeed
+
+
+def predictions(count, start=0):
+    return [{"model_type": "link_prediction", "id": start + i} for i in range(count)]
+
+
+def test_log_only_queues_and_flush_inserts_in_bulk_off_the_loop():
+    supabase = RecordingSupabaseClient()
+    buffer = PredictionLogBuffer(supabase, flush_size=4, flush_interval=60)
+
+    async def run():
+        assert buffer.log(predictions(10))
+        queued_before_flush = list(supabase.batches)
+        flushed = await buffer.flush()
+        return queued_before_flush, flushed, threading.get_ident()
+
+    queued_before_flush, flushed, loop_thread = asyncio.run(run())
+
+    assert queued_before_flush == []
+    assert flushed == 10
+    assert supabase.batches == [4, 4, 2]
+    assert [record["id"] for record in supabase.records] == list(range(10))
+    assert loop_thread not in supabase.threads
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking():
+    supabase = RecordingSupabaseClient()
+    buffer = PredictionLogBuffer(supabase, max_queue_size=5, flush_size=100)
+
+    assert not buffer.log(predictions(8))
+    status = buffer.get_status()
+
+    assert status["queue_depth"] == 5
+    assert status["enqueued"] == 5
+    assert status["dropped"] == 3
+
+
+def test_a_full_batch_triggers_an_early_flush():
+    supabase = RecordingSupabaseClient()
+    buffer = PredictionLogBuffer(supabase, flush_size=3, flush_interval=60)
+
+    async def run():
+        await buffer.start()
+        buffer.log(predictions(3))
+        for _ in range(100):
+            if supabase.records:
+                break
+            await asyncio.sleep(0.01)
+        await buffer.stop()
+
+    asyncio.run(run())
+
+    assert supabase.batches == [3]
+
+
+def test_stop_drains_everything_queued():
+    supabase = RecordingSupabaseClient()
+    buffer = PredictionLogBuffer(supabase, flush_size=100, flush_interval=60)
+
+    async def run():
+        await buffer.start()
+        buffer.log(predictions(7))
+        await buffer.stop()
+
+    asyncio.run(run())
+
+    assert len(supabase.records) == 7
+    assert buffer.get_status()["running"] is False
+
+
+def test_failed_inserts_are_counted():
+    buffer = PredictionLogBuffer(RecordingSupabaseClient(succeed=False), flush_size=2)
+
+    async def run():
+        buffer.log(predictions(3))
+        return await buffer.flush()
+
+    assert asyncio.run(run()) == 0
+    assert buffer.stats["failed"] == 3
+    assert buffer.stats["flushed"] == 0
@@ -0,0 +1,98 @@
+import torch
+import torch.nn as nn
+from torch_geometric.nn import SAGEConv
+
+from models.link_prediction import create_model
+from models.quantization import (
+    load_quantized_model,
+    model_size_bytes,
+    quantize_model,
+    quantized_model_path,
+    save_quantized_model,
+)
+
+CONFIG = {"gnn_type": "sage", "input_dim": 16, "hidden_dim": 64, "num_layers": 2, "dropout": 0.25}
+
+
+def expertise_model():
+    torch.manual_seed(0)
+    return create_model("expertise_recommendation", CONFIG).eval()
+
+
+def scores(model, x, edge_index):
+    with torch.no_grad():
+        z = model.encode(x, edge_index)
+        return torch.sigmoid(model.decode(z, edge_index[:, :50])), model.expertise_scorer(z).squeeze(-1)
+
+
+def graph():
+    generator = torch.Generator().manual_seed(1)
+    return torch.randn(300, 16, generator=generator), torch.randint(0, 300, (2, 1200), generator=generator)
+
+
+def test_only_dense_heads_are_quantized_on_a_copy():
+    model = expertise_model()
+    quantized = quantize_model(model)
+
+    dynamic_linear = torch.ao.nn.quantized.dynamic.Linear
+    assert isinstance(quantized.link_predictor[0], dynamic_linear)
+    assert isinstance(quantized.expertise_scorer[0], dynamic_linear)
+    assert all(isinstance(conv, SAGEConv) for conv in quantized.convs)
+    # The fp32 model is left as it was
+    assert type(model.link_predictor[0]) is nn.Linear
+    assert model_size_bytes(quantized) < model_size_bytes(model)
+
+
+def test_quantized_outputs_stay_close_to_fp32():
+    model = expertise_model()
+    x, edge_index = graph()
+
+    for expected, actual in zip(scores(model, x, edge_index), scores(quantize_model(model), x, edge_index)):
+        assert (actual - expected).abs().max() < 0.05
+
+
+def test_artifact_round_trip(tmp_path):
+    model = expertise_model()
+    quantized = quantize_model(model)
+    path = quantized_model_path(str(tmp_path / "expertise_recommendation_best_run1.pt"))
+    save_quantized_model(quantized, path)
+
+    torch.manual_seed(123)
+    loaded = load_quantized_model(path, create_model("expertise_recommendation", CONFIG).eval())
+
+    assert path.endswith("expertise_recommendation_quantized_run1.pt")
+    x, edge_index = graph()
+    for expected, actual in zip(scores(quantized, x, edge_index), scores(loaded, x, edge_index)):
+        torch.testing.assert_close(actual, expected)
+
+
+def test_predictor_serves_the_artifact_only_when_enabled_and_present(make_predictor, tmp_path):
+    predictor = make_predictor(model_types=())
+    model = expertise_model()
+    checkpoint = str(tmp_path / "expertise_recommendation_best_run1.pt")
+    predictor.model_configs["expertise_recommendation"] = {**CONFIG, "serving": {"quantized": False}}
+
+    served, quantized = predictor._load_serving_variant("expertise_recommendation", model, checkpoint)
+    assert served is model and not quantized
+
+    predictor.model_configs["expertise_recommendation"]["serving"]["quantized"] = True
+    served, quantized = predictor._load_serving_variant("expertise_recommendation", model, checkpoint)
+    assert served is model and not quantized
+
+    save_quantized_model(quantize_model(model), quantized_model_path(checkpoint))
+    served, quantized = predictor._load_serving_variant("expertise_recommendation", model, checkpoint)
+    assert quantized
+    assert isinstance(served.link_predictor[0], torch.ao.nn.quantized.dynamic.Linear)
+
+
+def test_predictor_falls_back_to_fp32_on_an_unreadable_artifact(make_predictor, tmp_path):
+    predictor = make_predictor(model_types=())
+    model = expertise_model()
+    checkpoint = str(tmp_path / "expertise_recommendation_best_run1.pt")
+    predictor.model_configs["expertise_recommendation"] = {**CONFIG, "serving": {"quantized": True}}
+    with open(quantized_model_path(checkpoint), "wb") as f:
+        f.write(b"not a checkpoint")
+
+    served, quantized = predictor._load_serving_variant("expertise_recommendation", model, checkpoint)
+
+    assert served is model and not quantized
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from inference.request_batcher import RequestBatcher
+
+
+def double_all(items):
+    return [item * 2 for item in items]
+
+
+def test_concurrent_requests_are_batched_and_fanned_out():
+    async def run():
+        batcher = RequestBatcher("test", double_all, batch_size=8, max_batch_delay=100)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(20)])
+        status = batcher.get_status()
+        await batcher.stop()
+        return results, status
+
+    results, status = asyncio.run(run())
+
+    assert results == [i * 2 for i in range(20)]
+    assert status["requests"] == 20
+    assert status["batches"] == 3
+
+
+def test_lone_request_does_not_wait_for_batch_delay():
+    async def run():
+        batcher = RequestBatcher("test", double_all, batch_size=32, max_batch_delay=2000)
+        await batcher.submit(0)  # starts the worker
+        start = time.monotonic()
+        result = await batcher.submit(21)
+        elapsed = time.monotonic() - start
+        await batcher.stop()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(run())
+
+    assert result == 42
+    assert elapsed < 0.5
+
+
+def test_failed_batch_propagates_to_callers():
+    def fail(items):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = RequestBatcher("test", fail)
+        with pytest.raises(ValueError):
+            await batcher.submit(1)
+        status = batcher.get_status()
+        await batcher.stop()
+        return status
+
+    assert asyncio.run(run())["failed_batches"] == 1
+
+
+def test_stop_fails_in_flight_and_queued_requests():
+    def slow(items):
+        time.sleep(0.2)
+        return items
+
+    async def run():
+        batcher = RequestBatcher("test", slow, batch_size=1)
+        tasks = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.05)  # first item is now in flight, the rest queued
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=1)
+
+    results = asyncio.run(run())
+
+    assert len(results) == 3
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+
+from inference.result_store import EncodedResults, ResultStore
+
+
+def rows(start, stop):
+    return [{"entity_id": str(i), "score": np.float32(i) / 2} for i in range(start, stop)]
+
+
+def write_chunks(store, job_id, chunk_sizes):
+    async def run():
+        position = 0
+        for size in chunk_sizes:
+            await store.append(job_id, rows(position, position + size))
+            position += size
+    asyncio.run(run())
+
+
+def page(store, job_id, offset, limit):
+    return [json.loads(line)["entity_id"] for line in store.iter_results(job_id, offset, limit)]
+
+
+def test_pages_match_the_written_order(tmp_path):
+    store = ResultStore(str(tmp_path), index_interval=7)
+    job_id = str(uuid.uuid4())
+    write_chunks(store, job_id, [5, 13, 1, 30, 2])
+
+    assert asyncio.run(store.count(job_id)) == 51
+    for offset in [0, 6, 7, 8, 20, 49, 50]:
+        for limit in [1, 7, 10]:
+            expected = [str(i) for i in range(offset, min(offset + limit, 51))]
+            assert page(store, job_id, offset, limit) == expected
+    assert page(store, job_id, 51, 10) == []
+    assert page(store, job_id, 100, 10) == []
+
+
+def test_index_holds_every_nth_line_offset(tmp_path):
+    store = ResultStore(str(tmp_path), index_interval=10)
+    job_id = str(uuid.uuid4())
+    write_chunks(store, job_id, [4, 25, 6])
+
+    path = store.path(job_id)
+    index = np.fromfile(path.with_suffix(".idx"), dtype="<i8")
+    with open(path, "rb") as f:
+        line_starts = []
+        position = 0
+        for line in f:
+            line_starts.append(position)
+            position += len(line)
+
+    assert index.tolist() == line_starts[::10]
+
+
+def test_page_seeks_past_the_lines_before_it(tmp_path):
+    store = ResultStore(str(tmp_path), index_interval=100)
+    job_id = str(uuid.uuid4())
+    write_chunks(store, job_id, [1000, 1000, 500])
+
+    # Blank out everything before the indexed line 2300; a page at 2345 must never read it
+    path = store.path(job_id)
+    boundary = int(store._read_index(path)[23])
+    with open(path, "r+b") as f:
+        f.write(b"x" * boundary)
+
+    assert page(store, job_id, 2345, 3) == ["2345", "2346", "2347"]
+
+
+def test_store_reopened_after_restart_keeps_indexing(tmp_path):
+    job_id = str(uuid.uuid4())
+    write_chunks(ResultStore(str(tmp_path), index_interval=4), job_id, [6])
+
+    store = ResultStore(str(tmp_path), index_interval=4)
+    asyncio.run(store.append(job_id, EncodedResults(ResultStore.encode(rows(6, 15)), 9)))
+
+    assert asyncio.run(store.count(job_id)) == 15
+    assert page(store, job_id, 9, 3) == ["9", "10", "11"]
+    assert len(store._read_index(store.path(job_id))) == 4
+
+
+def test_delete_and_cleanup_remove_index_files(tmp_path):
+    store = ResultStore(str(tmp_path), index_interval=2)
+    kept, expired, deleted = (str(uuid.uuid4()) for _ in range(3))
+    for job_id in (kept, expired, deleted):
+        write_chunks(store, job_id, [3])
+
+    old = time.time() - 10 * 86400
+    os.utime(store.path(expired), (old, old))
+
+    assert store.delete(deleted)
+    assert asyncio.run(store.cleanup(max_age_days=1)) == [expired]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([f"{kept}.ndjson", f"{kept}.idx"])
+
+
+def test_job_ids_never_resolve_outside_root(tmp_path):
+    store = ResultStore(str(tmp_path))
+
+    assert store.path("../../etc/passwd") is None
+    assert not store.exists("not-a-job")
+    assert list(store.iter_results("not-a-job")) == []
@@ -0,0 +1,97 @@
+import pytest
+import torch
+
+from inference import serving_backend
+from inference.serving_backend import EagerBackend, build_serving_backend
+from models.link_prediction import create_model
+from models.node_classification import create_classification_model
+
+ENCODER_CONFIG = {"input_dim": 16, "hidden_dim": 32, "num_layers": 3, "dropout": 0.2}
+
+
+def encoder(gnn_type):
+    torch.manual_seed(0)
+    return create_model("link_prediction", {**ENCODER_CONFIG, "gnn_type": gnn_type}).eval()
+
+
+def graph(num_nodes, num_edges, seed):
+    generator = torch.Generator().manual_seed(seed)
+    return (
+        torch.randn(num_nodes, ENCODER_CONFIG["input_dim"], generator=generator),
+        torch.randint(0, num_nodes, (2, num_edges), generator=generator),
+    )
+
+
+@pytest.mark.parametrize("backend_name", ["torchscript", "onnx"])
+@pytest.mark.parametrize("gnn_type", ["gcn", "sage", "gat"])
+def test_compiled_encoders_match_eager_on_unseen_graph_sizes(gnn_type, backend_name):
+    model = encoder(gnn_type)
+    config = {**ENCODER_CONFIG, "gnn_type": gnn_type, "serving": {"backend": backend_name}}
+
+    backend = build_serving_backend(model, "link_prediction", config)
+
+    assert backend.name == backend_name
+    assert backend.parity["max_abs_diff"] < 1e-4
+    for num_nodes, num_edges, seed in ((5, 0, 3), (1500, 9000, 4)):
+        x, edge_index = graph(num_nodes, num_edges, seed)
+        with torch.no_grad():
+            expected = model.encode(x, edge_index)
+        torch.testing.assert_close(backend(x, edge_index), expected, rtol=1e-3, atol=1e-4)
+
+
+@pytest.mark.parametrize("backend_name", ["torchscript", "onnx"])
+def test_classifiers_are_served_through_forward(backend_name):
+    torch.manual_seed(0)
+    config = {**ENCODER_CONFIG, "num_classes": 5, "serving": {"backend": backend_name}}
+    model = create_classification_model("document_classification", config).eval()
+
+    backend = build_serving_backend(model, "node_classification", config)
+
+    x, edge_index = graph(200, 800, 5)
+    with torch.no_grad():
+        expected = model(x, edge_index)
+    assert backend.name == backend_name
+    torch.testing.assert_close(backend(x, edge_index), expected, rtol=1e-3, atol=1e-4)
+
+
+def test_eager_is_the_default():
+    backend = build_serving_backend(encoder("sage"), "link_prediction", ENCODER_CONFIG)
+
+    assert isinstance(backend, EagerBackend)
+
+
+def test_failed_parity_check_falls_back_to_eager(monkeypatch):
+    monkeypatch.setattr(serving_backend, "check_parity", lambda *args, **kwargs: (False, 1.0))
+    config = {**ENCODER_CONFIG, "gnn_type": "sage", "serving": {"backend": "torchscript"}}
+
+    backend = build_serving_backend(encoder("sage"), "link_prediction", config)
+
+    assert isinstance(backend, EagerBackend)
+
+
+def test_parity_check_rejects_a_backend_with_different_outputs():
+    model = encoder("sage")
+    eager = EagerBackend(model, "encode")
+
+    passed, max_diff = serving_backend.check_parity(eager, lambda x, edge_index: eager(x, edge_index) + 1e-2, 16)
+    assert not passed and max_diff > 1e-3
+
+    passed, _ = serving_backend.check_parity(eager, lambda x, edge_index: eager(x, edge_index)[:-1], 16)
+    assert not passed
+
+
+def test_unknown_backend_and_build_errors_fall_back_to_eager(monkeypatch):
+    config = {**ENCODER_CONFIG, "gnn_type": "sage"}
+    assert isinstance(
+        build_serving_backend(encoder("sage"), "link_prediction", {**config, "serving": {"backend": "tensorrt"}}),
+        EagerBackend,
+    )
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("trace failed")
+
+    monkeypatch.setattr(serving_backend, "TorchScriptBackend", fail)
+    assert isinstance(
+        build_serving_backend(encoder("sage"), "link_prediction", {**config, "serving": {"backend": "torchscript"}}),
+        EagerBackend,
+    )
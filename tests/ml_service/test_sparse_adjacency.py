@@ -0,0 +1,82 @@
+import pytest
+import torch
+from torch_geometric.nn import GCNConv
+
+from fakes import make_export
+from inference.graph_snapshot import GraphSnapshot
+from inference.serving_backend import SparseAdjacencyBackend
+from models.link_prediction import create_model
+from models.sparse_adjacency import bind_gcn_normalization, supports_sparse_adjacency
+
+CONFIG = {"input_dim": 16, "hidden_dim": 32, "num_layers": 3, "dropout": 0.2}
+
+
+def snapshot(version=1, seed=0):
+    return GraphSnapshot.from_export(make_export(num_nodes=400, num_edges=2000, dim=16, seed=seed), version=version)
+
+
+def encoder(gnn_type):
+    torch.manual_seed(0)
+    return create_model("link_prediction", {**CONFIG, "gnn_type": gnn_type}).eval()
+
+
+def gcn_layers(module):
+    return [layer for layer in module.modules() if isinstance(layer, GCNConv)]
+
+
+@pytest.mark.parametrize("gnn_type", ["gcn", "sage"])
+def test_sparse_backend_matches_coo(gnn_type):
+    graph = snapshot()
+    model = encoder(gnn_type)
+
+    backend = SparseAdjacencyBackend(model, "encode", graph)
+
+    with torch.no_grad():
+        expected = model.encode(graph.x, graph.edge_index_tensor)
+    torch.testing.assert_close(backend(graph.x), expected, rtol=1e-4, atol=1e-5)
+
+
+def test_only_gcn_and_sage_models_are_supported():
+    assert supports_sparse_adjacency(encoder("gcn"))
+    assert supports_sparse_adjacency(encoder("sage"))
+    assert not supports_sparse_adjacency(encoder("gat"))
+
+
+def test_normalization_is_bound_to_a_copy_and_only_in_eval_mode():
+    graph = snapshot()
+    model = encoder("gcn")
+
+    backend = SparseAdjacencyBackend(model, "encode", graph)
+
+    assert all(layer.cached for layer in gcn_layers(backend.module))
+    assert not any(layer.cached for layer in gcn_layers(model))
+    with pytest.raises(ValueError):
+        bind_gcn_normalization(model.train(), graph.gcn_adj_t)
+
+
+def test_predictor_rebuilds_per_snapshot_and_drops_the_backend_with_the_model(make_predictor):
+    predictor = make_predictor(model_types=())
+    predictor.model_configs["link_prediction"] = {**CONFIG, "gnn_type": "gcn"}
+    predictor._register_model("link_prediction", encoder("gcn"), {})
+
+    first = predictor._full_graph_backend("link_prediction", snapshot(version=1))
+    assert isinstance(first, SparseAdjacencyBackend)
+    assert predictor._full_graph_backend("link_prediction", snapshot(version=1)) is first
+
+    second = predictor._full_graph_backend("link_prediction", snapshot(version=2))
+    assert second is not first
+    # The superseded backend keeps its own binding, so a pass still running on it is unaffected
+    assert all(layer.cached for layer in gcn_layers(first.module))
+    torch.testing.assert_close(first(snapshot(version=1).x), second(snapshot(version=2).x))
+
+    predictor._release_model("link_prediction")
+    assert "link_prediction" not in predictor._sparse_backends
+
+
+def test_predictor_uses_the_compiled_backend_when_sparse_adjacency_is_off(make_predictor):
+    predictor = make_predictor(model_types=("link_prediction",))
+    predictor.serving_config["sparse_adjacency"] = False
+
+    backend = predictor._full_graph_backend("link_prediction", snapshot())
+
+    assert backend is predictor.serving_backends["link_prediction"]
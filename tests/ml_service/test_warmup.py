@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture()
+def ready_client(ml_service_dir, monkeypatch):
+    """GET /ready against a given predictor."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    def get(predictor):
+        monkeypatch.setattr(main, "predictor", predictor)
+        return TestClient(main.app).get("/ready")
+
+    return get
+
+
+def test_completed_warmup_builds_everything_and_reports_ready(make_predictor, ready_client):
+    predictor = make_predictor(expert_retrieval={"mode": "exact"})
+    assert ready_client(predictor).status_code == 503
+
+    status = asyncio.run(predictor.warmup_models(sample_size=4))
+
+    assert status["state"] == "completed"
+    assert status["errors"] == {}
+    assert set(status["phases"]) == {"graph_snapshot", "embeddings", "forward_passes", "memory_prefault"}
+    snapshot = predictor.snapshot_manager.current
+    assert predictor._get_expert_state(snapshot) is not None
+    assert predictor.is_warm()
+
+    response = ready_client(predictor)
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_failed_warmup_stays_unready_and_retries_on_the_next_snapshot(make_predictor, ready_client, graph_export):
+    predictor = make_predictor(expert_retrieval={"mode": "exact"})
+    predictor.neo4j.export = {}
+
+    status = dict(asyncio.run(predictor.warmup_models(sample_size=4)))
+
+    assert status["state"] == "degraded"
+    assert "graph_snapshot" in status["errors"]
+    assert predictor.snapshot_manager._retry_requested
+    response = ready_client(predictor)
+    assert response.status_code == 503
+    assert response.json()["detail"]["status"] == "degraded"
+
+    # The background refresh publishes a snapshot, and its listener retries warmup
+    predictor.neo4j.export = graph_export()
+    asyncio.run(predictor.refresh_graph_snapshot())
+
+    assert predictor.warmup_status["state"] == "completed"
+    assert ready_client(predictor).status_code == 200
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from multiprocessing import shared_memory
+
+import pytest
+import torch
+
+from inference import worker_pool
+from inference.result_store import ResultStore
+from inference.worker_pool import BatchWorkerPool, build_classification_results
+
+
+def attachable(handle):
+    """Whether every segment of a published handle can still be attached by name."""
+    try:
+        for segment_name, _, _ in handle["tensors"].values():
+            shared_memory.SharedMemory(name=segment_name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+@pytest.fixture()
+def copy_threads(monkeypatch):
+    """Threads the shared-memory copies ran on."""
+    threads = []
+    copy = worker_pool._copy_to_shared_memory
+
+    def recording_copy(*args):
+        threads.append(threading.current_thread())
+        return copy(*args)
+
+    monkeypatch.setattr(worker_pool, "_copy_to_shared_memory", recording_copy)
+    return threads
+
+
+def test_tensors_are_copied_once_per_key_off_the_event_loop(copy_threads):
+    pool = BatchWorkerPool()
+    logits = torch.randn(6, 3)
+
+    async def run():
+        published = await asyncio.gather(*(pool.share("logits", (1, 1), {"logits": logits}) for _ in range(4)))
+        return published, threading.current_thread()
+
+    published, loop_thread = asyncio.run(run())
+
+    assert all(version is published[0] for version in published)
+    assert len(copy_threads) == 1 and copy_threads[0] is not loop_thread
+    assert pool.stats["shared_bytes"] == logits.numel() * 4
+    assert pool.get_status()["shared"] == {"logits": [1, 1]}
+    worker_pool._unlink_segments(published[0].segments)
+
+
+def test_replaced_versions_stay_linked_until_their_tasks_finish():
+    pool = BatchWorkerPool()
+    logits = torch.randn(6, 3)
+
+    async def run():
+        async with pool._holding("logits", (1, 1), {"logits": logits}) as held:
+            async with pool._holding("logits", (1, 1), {"logits": logits}) as queued:
+                replacement = await pool.share("logits", (1, 2), {"logits": logits})
+                assert attachable(held) and pool.get_status()["retired_versions"] == 1
+            # One task still holds the old version
+            assert attachable(queued)
+        assert not attachable(held) and pool.get_status()["retired_versions"] == 0
+
+        # Nothing holds the current version, so replacing it unlinks it straight away
+        await pool.share("logits", (1, 3), {"logits": logits})
+        assert not attachable(replacement.handle)
+        return pool._shared["logits"]
+
+    current = asyncio.run(run())
+
+    assert pool.stats["shared_bytes"] == current.nbytes
+    worker_pool._unlink_segments(current.segments)
+
+
+def test_workers_classify_from_shared_logits_across_snapshot_versions():
+    logits = torch.randn(8, 4, generator=torch.Generator().manual_seed(0))
+    rows = [("a", "node 1", 1, "node 1"), ("b", "missing", None, None), ("c", "node 5", 5, "node 5")]
+    pool = BatchWorkerPool(max_workers=1)
+
+    async def run():
+        pool.start()
+        try:
+            # Chunks of two snapshot versions in flight at once; the first stays linked until it is done
+            first, second = await asyncio.gather(
+                pool.classify(None, 1, 1, logits, rows),
+                pool.classify(None, 1, 2, logits * 2, rows)
+            )
+        finally:
+            handle = pool._shared["node_classification"].handle
+            await pool.stop()
+        return first, second, handle
+
+    first, second, handle = asyncio.run(run())
+
+    for (encoded, processed, failed), scale in ((first, 1), (second, 2)):
+        expected, _, _ = build_classification_results(rows, logits * scale)
+        assert (processed, failed, encoded.count) == (2, 1, 3)
+        assert encoded.payload == ResultStore.encode(expected)
+    assert pool.stats["shared_bytes"] == 0
+    assert not attachable(handle)